@@ -1,16 +1,226 @@
-# This is a sample Python script.
+"""
+Command-line entry point for the test plan and test case generators.
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+    python main.py plan [STORY.docx ... | --text "As a ..."] [--output test_plan.docx] [--processes N]
+    python main.py nlp-plan [STORY.docx] [--streaming]
+    python main.py generate [STORY.docx] [--incremental | --watch | --enqueue | --workers N | --export | --report]
+                            [--budget-tokens N] [--budget-seconds S] [--combinatorial [--strength T]]
+    python main.py ask ["question" | --questions FILE] [--output answers.jsonl]
+    python main.py trace STORY.docx CASES.txt... [--threshold 0.2] [--output traceability.csv]
+    python main.py compare MODEL... [--concurrency N] [--rpm N] [--specs N] [--output comparison.csv]
+    python main.py cases {ingest FILE... | search QUERY | export OUTPUT | stats} [--type TYPE] [--story STORY]
 
+spaCy, google.generativeai, python-docx and dotenv are only imported inside the subcommand that
+needs them, so --help and argument errors return immediately.
+"""
+import argparse
+import importlib
+import os
+import sys
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_USER_STORY = os.path.join(PROJECT_ROOT, "Login and Logout Functionality Validation Across Multiple Browsers.docx")
 
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
+def load_workflow(module_name):
+    """Imports one of the workflow scripts under tests/ on first use."""
+    tests_dir = os.path.join(PROJECT_ROOT, "tests")
+    if tests_dir not in sys.path:
+        sys.path.insert(0, tests_dir)
+    return importlib.import_module(module_name)
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+
+def run_plan(args):
+    workflow = load_workflow("test_ai_nlp_model_1")
+    if args.text:
+        workflow.generate_test_plan_docx(user_story_text=args.text, output_file=args.output)
+    elif len(args.stories) > 1:
+        workflow.render_test_plans(args.stories, processes=args.processes)
+    else:
+        workflow.generate_test_plan_docx(user_story_file=(args.stories or [DEFAULT_USER_STORY])[0],
+                                         output_file=args.output)
+
+
+def run_nlp_plan(args):
+    workflow = load_workflow("test_ai_nlp_model")
+    workflow.extract_test_plan_nlp_docx(args.story, output_file=args.output, streaming=args.streaming)
+
+
+def run_generate(args):
+    workflow = load_workflow("test_ai_nlp_llm_model")
+    if args.enqueue or args.workers or args.export or args.report:
+        if args.enqueue:
+            workflow.enqueue_story(args.story)
+        if args.workers:
+            workflow.run_generation_workers(args.workers)
+        if args.export:
+            workflow.export_queued_test_cases(args.story)
+        if args.report:
+            workflow.print_queue_report()
+    elif args.combinatorial:
+        workflow.generate_combinatorial_test_cases(args.story, args.strength)
+    elif args.budget_tokens or args.budget_seconds:
+        workflow.generate_test_cases_by_priority(args.story, args.budget_tokens, args.budget_seconds)
+    elif args.watch:
+        workflow.watch_stories()
+    elif args.incremental:
+        workflow.generate_test_cases_incremental(args.story)
+    else:
+        workflow.generate_test_cases_in_batches(args.story)
+
+
+def run_ask(args):
+    workflow = load_workflow("test_ai_nlp_llm_model_withtext")
+    if args.questions:
+        workflow.answer_question_file(args.questions, args.output, args.n_process, args.group_size)
+    else:
+        workflow.summarize_text(args.question or workflow.text)
+
+
+def run_trace(args):
+    from utils.case_store import split_test_cases
+    from utils.section_repair import parse_sections
+    from utils.retrieval import chunk_story
+    from utils.traceability import print_uncovered, save_traceability_csv, traceability_matrix
+    story = load_workflow("test_ai_nlp_model_1").parse_user_story(args.story)
+    # Criteria written as "Header:" blocks instead of a numbered list come back as one item; split them
+    criteria = chunk_story("\n".join(story["acceptance_criteria"]), max_chars=400)
+    test_cases = []
+    for path in args.cases:
+        with open(path, encoding="utf-8", errors="replace") as file:
+            test_cases.extend(split_test_cases(file.read()))
+    case_ids = []
+    for number, test_case in enumerate(test_cases, start=1):
+        sections = parse_sections(test_case)
+        case_id = sections["Test Case ID"][2].splitlines()[0].strip(" *") if "Test Case ID" in sections else ""
+        case_ids.append(case_id or f"Test Case {number}")
+    result = traceability_matrix(criteria, test_cases, threshold=args.threshold)
+    save_traceability_csv(result, criteria, case_ids, args.output)
+    print_uncovered(result, criteria, case_ids)
+
+
+def run_compare(args):
+    from utils.model_eval import compare_models, load_backend, print_comparison_table, save_comparison_csv
+    from utils.test_case_specs import LOGIN_TEST_CASE_SPECS
+    workflow = load_workflow("test_ai_nlp_llm_model")  # Configures Gemini and provides the prompt builder
+    specs = LOGIN_TEST_CASE_SPECS[:args.specs] if args.specs else LOGIN_TEST_CASE_SPECS
+    backends = {name: load_backend(name) for name in args.models}
+    results = compare_models(backends, specs, workflow.build_test_case_prompt, args.concurrency, args.rpm,
+                             args.repeats)
+    print_comparison_table(results, args.min_completeness)
+    if args.output:
+        save_comparison_csv(results, args.output)
+
+
+def run_cases(args):
+    from utils.case_store import CaseStore
+    store = CaseStore(args.db)
+    try:
+        if args.action == "ingest":
+            for path in args.files:
+                store.ingest_file(path, story=args.story)
+        elif args.action == "search":
+            for row in store.search(args.query, limit=args.limit, spec_type=args.type, story=args.story):
+                print(f"[{row['id']}] {row['case_id'] or '-'} ({row['spec_type'] or 'Unknown'}, {row['story']})")
+                print(f"    {' '.join(row['snippet'].split())}")
+        elif args.action == "export":
+            store.export(args.output, args.query, spec_type=args.type, story=args.story)
+        else:
+            for spec_type, count in store.counts().items():
+                print(f"{count:>8}  {spec_type}")
+    finally:
+        store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate test plans and test cases from user stories.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write cProfile stats and tracemalloc snapshots to logs/ (same as PROFILE=1)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan = subparsers.add_parser("plan", help="Build a structured .docx test plan")
+    plan.add_argument("stories", nargs="*", metavar="story",
+                      help="User story .docx file(s); several are rendered in parallel into documents/test_plans/")
+    plan.add_argument("--text", help="User story text to use instead of a file")
+    plan.add_argument("--output", default="test_plan.docx", help="File name under documents/ for a single plan")
+    plan.add_argument("--processes", type=int, help="Worker processes for several stories (default: CPU count)")
+    plan.set_defaults(handler=run_plan)
+
+    nlp_plan = subparsers.add_parser("nlp-plan", help="Draft a Markdown test plan from spaCy analysis")
+    nlp_plan.add_argument("story", nargs="?", default=DEFAULT_USER_STORY, help="User story .docx file")
+    nlp_plan.add_argument("--output", default="auto_test_plan_nlp.docx", help="File name under documents/")
+    nlp_plan.add_argument("--streaming", action="store_true", help="Analyze very large stories section by section")
+    nlp_plan.set_defaults(handler=run_nlp_plan)
+
+    generate = subparsers.add_parser("generate", help="Generate test cases with spaCy and Gemini")
+    generate.add_argument("story", nargs="?", default=DEFAULT_USER_STORY, help="User story .docx file")
+    generate.add_argument("--incremental", action="store_true",
+                          help="Only regenerate test cases whose story paragraphs changed since the last run")
+    generate.add_argument("--watch", action="store_true", help="Regenerate incrementally whenever a story is saved")
+    generate.add_argument("--enqueue", action="store_true", help="Queue one job per spec in the job queue")
+    generate.add_argument("--workers", type=int, help="Run N worker processes against the job queue")
+    generate.add_argument("--export", action="store_true", help="Write finished queued test cases to the output file")
+    generate.add_argument("--report", action="store_true", help="Print job counts and per-worker throughput")
+    generate.add_argument("--budget-tokens", type=int, help="Generate the highest-priority specs within this many tokens")
+    generate.add_argument("--budget-seconds", type=float, help="Generate the highest-priority specs within this time")
+    generate.add_argument("--combinatorial", action="store_true",
+                          help="Cover browser/user/input/locale combinations with one LLM call per input class")
+    generate.add_argument("--strength", type=int, default=2, help="Cover all t-way combinations (default: pairs)")
+    generate.set_defaults(handler=run_generate)
+
+    ask = subparsers.add_parser("ask", help="Answer questions using spaCy entities and Gemini")
+    ask.add_argument("question", nargs="?", help="A single question (default: the bundled sample)")
+    ask.add_argument("--questions", help="File with one question per line ('-' for stdin) to run in batch mode")
+    ask.add_argument("--output", default="-", help="Where to stream JSON-lines answers (default: stdout)")
+    ask.add_argument("--n-process", type=int, default=1, help="spaCy worker processes for entity extraction")
+    ask.add_argument("--group-size", type=int, default=10, help="Max questions sharing one LLM call")
+    ask.set_defaults(handler=run_ask)
+
+    trace = subparsers.add_parser("trace", help="Link acceptance criteria to generated test cases")
+    trace.add_argument("story", help="User story .docx file with the acceptance criteria")
+    trace.add_argument("cases", nargs="+", help="Generated test case files")
+    trace.add_argument("--threshold", type=float, default=0.2, help="Minimum TF-IDF cosine similarity for a link")
+    trace.add_argument("--output", default=os.path.join("documents", "traceability_matrix.csv"))
+    trace.set_defaults(handler=run_trace)
+
+    compare = subparsers.add_parser("compare", help="Compare model backends on the same specs")
+    compare.add_argument("models", nargs="+", help="Gemini model names or ollama:<model> for a local model")
+    compare.add_argument("--concurrency", type=int, default=2, help="Concurrent requests per backend")
+    compare.add_argument("--rpm", type=int, help="Requests per minute per backend (default: unlimited)")
+    compare.add_argument("--specs", type=int, help="Only the first N specs")
+    compare.add_argument("--repeats", type=int, default=1, help="Run each spec this many times")
+    compare.add_argument("--min-completeness", type=float, default=0.9,
+                         help="Section completeness a backend needs to be recommended")
+    compare.add_argument("--output", default=os.path.join("documents", "model_comparison.csv"))
+    compare.set_defaults(handler=run_compare)
+
+    cases = subparsers.add_parser("cases", help="Index, search and export generated test cases")
+    cases.add_argument("--db", default=os.getenv("CASE_STORE_PATH") or os.path.join("documents", "test_cases.db"),
+                       help="Case store database")
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--type", help="Only cases of this test case type, e.g. 'Security - SQL Injection'")
+    filters.add_argument("--story", help="Story file name to filter by (or to record, when ingesting)")
+    actions = cases.add_subparsers(dest="action")
+    ingest = actions.add_parser("ingest", help="Add the cases in generated output files", parents=[filters])
+    ingest.add_argument("files", nargs="+")
+    search = actions.add_parser("search", help="Ranked full-text search", parents=[filters])
+    search.add_argument("query", help='Words to match, or FTS5 syntax such as "sql injection" OR "brute force"')
+    search.add_argument("--limit", type=int, default=20)
+    export = actions.add_parser("export", help="Write matching cases to a .jsonl or text file", parents=[filters])
+    export.add_argument("output")
+    export.add_argument("--query", help="Optional full-text filter")
+    actions.add_parser("stats", help="Count stored cases per type")
+    cases.set_defaults(handler=run_cases, type=None, story=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from utils.profiling import enable_profiling
+        enable_profiling()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ Standardize test case documentation for compliance and reporting.
 # pytest -s -v tests/test_ai_llm_driven_login_userstory_cases_gemini.py
 
 import os
+import sys
 
 import genai as genai
 import pytest
@@ -26,6 +27,11 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 import docx
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.profiling import profiled
+from utils.context_cache import SharedContext
+from utils.retrieval import BM25Index, chunk_story, estimate_tokens
+
 # Load API Key from .env
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY")
@@ -38,6 +44,30 @@ model = genai.GenerativeModel('gemini-1.5-pro-latest')
 # File path to the user story document
 USER_STORY_PATH = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_ML_Model_Framework\Login and Logout Functionality Validation Across Multiple Browsers.docx"
 
+# Set RETRIEVAL_TOP_K in .env to send each coverage area only its k most relevant story sections
+# instead of the whole story (0 keeps the single whole-story prompt).
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "0"))
+
+# Set CONTEXT_CACHE=1 to generate one coverage area per request against a story cached once per run
+# (Gemini cached content needs an explicit model version; stories too small to cache use the single prompt)
+CONTEXT_CACHE = os.getenv("CONTEXT_CACHE") == "1"
+CONTEXT_CACHE_MODEL = os.getenv("CONTEXT_CACHE_MODEL", "models/gemini-1.5-pro-002")
+
+# Coverage areas requested from the model, used as retrieval queries in per-area mode
+COVERAGE_AREAS = [
+    "**Functional scenarios**",
+    "**Positive scenarios**",
+    "**Negative scenarios**",
+    "**Edge cases** (e.g., very long usernames, special characters)",
+    "**Cross-browser testing** (e.g., Chrome, Firefox, Edge)",
+    "**Security testing** (e.g., SQL injection, brute force attack)",
+    "**Performance testing** (e.g., response time, concurrent users)",
+    "**Accessibility scenarios** covering **ALL** 13 **WCAG 2.1 guidelines**: **Perceivable** (text alternatives, "
+    "adaptable content, distinguishable elements), **Operable** (keyboard accessibility, enough time, seizure "
+    "prevention, navigability), **Understandable** (readable text, input assistance), **Robust** (compatibility "
+    "with assistive technologies)",
+]
+
 
 def read_user_story(file_path):
     """
@@ -52,12 +82,11 @@ def read_user_story(file_path):
         return None
 
 
-def generate_test_cases_from_story(user_story):
+def build_story_prompt(user_story):
     """
-    Uses Gemini API to generate diverse test cases based on a user story.
-    Returns the generated test cases as a string.
+    Builds the single whole-story prompt covering every coverage area.
     """
-    prompt = f"""
+    return f"""
     You are a QA engineer. Generate test cases based on the following user story:
 
     {user_story}
@@ -79,14 +108,95 @@ def generate_test_cases_from_story(user_story):
     Return the test cases in a structured numbered list format.
     """
 
+
+def generate_test_cases_from_story(user_story):
+    """
+    Uses Gemini API to generate diverse test cases based on a user story.
+    Returns the generated test cases as a string.
+    """
     try:
-        response = model.generate_content(prompt)
+        response = model.generate_content(build_story_prompt(user_story))
         return response.text.strip()
     except Exception as e:
         print(f"Error generating test cases: {e}")
         return None
 
 
+def generate_test_cases_with_retrieval(user_story, top_k=3):
+    """
+    Generates test cases one coverage area at a time, sending only the story sections
+    most relevant to each area.  Returns the combined test cases and the prompt tokens
+    compared with the single whole-story prompt.
+    """
+    index = BM25Index(chunk_story(user_story))
+    baseline_tokens = estimate_tokens(build_story_prompt(user_story))
+    if len(index.chunks) <= top_k:
+        # Every area would get the whole story, so per-area calls only add requests
+        print(f"Story has {len(index.chunks)} sections (top_k={top_k}); using the single whole-story prompt.")
+        test_cases = generate_test_cases_from_story(user_story)
+        return test_cases, {"baseline_tokens": baseline_tokens, "sent_tokens": baseline_tokens, "saved_tokens": 0}
+
+    sent_tokens = 0
+    sections = []
+    for area in COVERAGE_AREAS:
+        context = index.context_for(area, top_k)
+        prompt = f"""
+    You are a QA engineer. Generate test cases based on the following excerpts from a user story:
+
+    {context}
+
+    The test cases should cover:
+    - {area}
+
+    Return the test cases in a structured numbered list format.
+    """
+        sent_tokens += estimate_tokens(prompt)
+        try:
+            response = model.generate_content(prompt)
+            sections.append(response.text.strip())
+        except Exception as e:
+            print(f"Error generating test cases: {e}")
+            return None, None
+
+    # The baseline sends the story once, in one call
+    savings = {"baseline_tokens": baseline_tokens, "sent_tokens": sent_tokens,
+               "saved_tokens": baseline_tokens - sent_tokens}
+    if savings["saved_tokens"] > 0:
+        print(f"Prompt tokens: sent ~{sent_tokens} in {len(COVERAGE_AREAS)} calls instead of ~{baseline_tokens} "
+              f"in 1 call ({savings['saved_tokens'] / baseline_tokens:.0%} saved)")
+    else:
+        print(f"Prompt tokens: retrieval sent ~{sent_tokens} in {len(COVERAGE_AREAS)} calls, "
+              f"~{-savings['saved_tokens']} more than the single whole-story prompt (~{baseline_tokens} in 1 call)")
+    return "\n\n".join(sections), savings
+
+
+def generate_test_cases_with_shared_context(user_story):
+    """
+    Generates test cases one coverage area at a time, registering the instructions and the
+    whole story once and sending only the coverage area with each request.  Without a Gemini
+    cache every request would re-send the story, so the single whole-story prompt is used.
+    """
+    instructions = """
+    You are a QA engineer. Generate test cases based on the user story that follows.
+    Each request names the coverage area to write test cases for.
+    Return the test cases in a structured numbered list format.
+    """
+    sections = []
+    with SharedContext(model, instructions, f"User story:\n\n{user_story}", CONTEXT_CACHE_MODEL) as context:
+        if not context.cached:
+            print("Story context was not cached; using the single whole-story prompt.")
+            return generate_test_cases_from_story(user_story), context.metrics()
+        for area in COVERAGE_AREAS:
+            try:
+                response = context.generate_content(f"The test cases should cover:\n- {area}")
+                sections.append(response.text.strip())
+            except Exception as e:
+                print(f"Error generating test cases: {e}")
+                return None, None
+        metrics = context.log_metrics()
+    return "\n\n".join(sections), metrics
+
+
 def save_test_cases(test_cases, filename="generated_test_cases.txt"):
     """
     Saves the generated test cases to a file.
@@ -102,6 +212,7 @@ def save_test_cases(test_cases, filename="generated_test_cases.txt"):
 
 
 @pytest.mark.parametrize("file_path", [USER_STORY_PATH])
+@profiled()
 def test_generate_and_save_test_cases_from_story(file_path):
     """
     Test function to generate and save test cases from a user story.
@@ -111,7 +222,12 @@ def test_generate_and_save_test_cases_from_story(file_path):
 
     # Generate test cases using AI
     if user_story:
-        test_cases = generate_test_cases_from_story(user_story)
+        if CONTEXT_CACHE:
+            test_cases, _ = generate_test_cases_with_shared_context(user_story)
+        elif RETRIEVAL_TOP_K > 0:
+            test_cases, _ = generate_test_cases_with_retrieval(user_story, RETRIEVAL_TOP_K)
+        else:
+            test_cases = generate_test_cases_from_story(user_story)
 
         # Save the test cases to a file
         if test_cases:
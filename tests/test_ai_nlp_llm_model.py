@@ -6,14 +6,38 @@ and cross-browser testing scenarios. The script handles API rate limits and save
 to a specified directory.
 """
 # python tests/test_ai_nlp_llm_model.py
+import argparse
 import os
+import sys
 import time
 import logging
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 import spacy
 import google.generativeai as genai
 from dotenv import load_dotenv
 import docx
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.adaptive_batching import AdaptiveBatchController
+from utils.case_store import CaseStore
+from utils.combinatorial import covering_array, fill_template, group_by_class, print_plan, template_spec
+from utils.context_cache import SharedContext
+from utils.hedging import HedgedModel
+from utils.job_queue import JobQueue, run_worker
+from utils.key_pool import KeyPool, PooledModel
+from utils.model_names import answered_by, model_name
+from utils.model_router import ModelRouter
+from utils.output_sink import TestCaseSink
+from utils.profiling import enable_profiling, profiled, stage_timer
+from utils.rate_limiter import RateLimiter, split_budget
+from utils.section_repair import SectionRepairer
+from utils.spec_scheduler import SpecScheduler
+from utils.story_diff import StoryManifest, StoryWatcher, plan_regeneration
+from utils.story_stream import analyze_story_streaming, iter_docx_paragraphs, iter_sections
+from utils.test_case_specs import (LOGIN_CLASS_DIMENSIONS, LOGIN_COMBINATORIAL_BASE_SPEC, LOGIN_INPUT_CLASSES,
+                                   LOGIN_SPEC_DIMENSIONS, LOGIN_TEST_CASE_SPECS)
+
 # Load API Key from .env
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY")
@@ -23,6 +47,42 @@ api_key = os.getenv("GEMINI_API_KEY")
 genai.configure(api_key="")
 model = genai.GenerativeModel('gemini-1.5-pro-latest')
 
+# Optional key/model pool: list several keys in GEMINI_API_KEYS (and models in GEMINI_MODELS) to spread
+# requests over their combined quota instead of the single configured key
+key_pool = KeyPool.from_env()
+if key_pool:
+    model = PooledModel(key_pool)
+
+# Requests allowed per minute across all calls, including hedged duplicates
+REQUESTS_PER_MINUTE = key_pool.requests_per_minute if key_pool else int(os.getenv("GEMINI_RPM", "1"))
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+# Optional request hedging: set HEDGE_REQUESTS=1 in .env to duplicate requests that run longer
+# than the HEDGE_PERCENTILE of recent latencies, optionally to an alternate HEDGE_MODEL.
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS") == "1"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MODEL = os.getenv("HEDGE_MODEL")
+if HEDGE_REQUESTS:
+    alternate_model = genai.GenerativeModel(HEDGE_MODEL) if HEDGE_MODEL else None
+    model = HedgedModel(model, alternate_model, rate_limiter, percentile=HEDGE_PERCENTILE)
+
+# Optional complexity routing: set MODEL_ROUTING=1 in .env to send simple specs (cross-browser, positive
+# functional) to FAST_MODEL and complex ones to the model above; weak fast answers are escalated.
+# The fast tier uses the same keys (its own per-model quota) and the same hedging as the strong one.
+MODEL_ROUTING = os.getenv("MODEL_ROUTING") == "1"
+FAST_MODEL = os.getenv("FAST_MODEL", "gemini-1.5-flash")
+fast_key_pool = KeyPool.from_env(model_names=[FAST_MODEL]) if MODEL_ROUTING else None
+router = None
+if MODEL_ROUTING:
+    fast_model = PooledModel(fast_key_pool) if fast_key_pool else genai.GenerativeModel(FAST_MODEL)
+    if HEDGE_REQUESTS:
+        fast_model = HedgedModel(fast_model, None, rate_limiter, percentile=HEDGE_PERCENTILE)
+    router = ModelRouter(fast_model, model, threshold=float(os.getenv("ROUTING_THRESHOLD", "0.5")),
+                         rate_limiter=rate_limiter)
+
+# Optional daily request quota; the batch loop stops cleanly once it is spent
+DAILY_QUOTA = int(os.getenv("GEMINI_DAILY_QUOTA")) if os.getenv("GEMINI_DAILY_QUOTA") else None
+
 # Load a spaCy model (you might need to download one)
 # python -m spacy download en_core_web_sm
 nlp = spacy.load("en_core_web_sm")
@@ -33,6 +93,36 @@ USER_STORY_PATH = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_ML_Model
 # Directory to store test case files
 OUTPUT_DIR = "documents"  # Changed to relative path
 
+# Set STREAMING_ANALYSIS=1 for very large stories: analyze section by section with bounded memory
+# instead of building one spaCy Doc for the whole document
+STREAMING_ANALYSIS = os.getenv("STREAMING_ANALYSIS") == "1"
+STREAMING_SECTION_CHARS = int(os.getenv("STREAMING_SECTION_CHARS", "100000"))
+
+# Set CONTEXT_CACHE=1 to cache the whole story once per incremental run, so each stale spec sends only
+# its own prompt instead of story excerpts.  Gemini only caches stories of MIN_CACHE_TOKENS (32768) or
+# more; smaller stories keep the excerpts, which are already the cheaper request.
+CONTEXT_CACHE = os.getenv("CONTEXT_CACHE") == "1"
+CONTEXT_CACHE_MODEL = os.getenv("CONTEXT_CACHE_MODEL", "models/gemini-1.5-pro-002")
+STORY_CACHE_INSTRUCTIONS = ("You are a QA engineer.  Ground every test case you are asked for in the user story "
+                            "that follows.")
+
+# Directory watched for saved .docx user stories in --watch mode
+STORIES_DIR = os.getenv("STORIES_DIR", "stories")
+
+# Job store shared by distributed workers; point JOB_QUEUE_PATH at a shared filesystem to span machines
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(OUTPUT_DIR, "generation_queue.db"))
+
+# Check every generated case for the eleven prompt sections and request only the missing ones
+# (set REPAIR_SECTIONS=0 to keep responses as returned)
+REPAIR_SECTIONS = os.getenv("REPAIR_SECTIONS", "1") == "1"
+section_repairer = SectionRepairer()
+
+# Searchable store that every finished output file is indexed into (set CASE_STORE_PATH= to disable)
+CASE_STORE_PATH = os.getenv("CASE_STORE_PATH", os.path.join(OUTPUT_DIR, "test_cases.db"))
+
+# When to fsync the output file: "never", "close" (default) or after every "batch"
+OUTPUT_FSYNC = os.getenv("OUTPUT_FSYNC", "close")
+
 # Directory to store logs
 LOGS_DIR = "logs"
 
@@ -48,8 +138,9 @@ logging.basicConfig(level=logging.INFO,  # Set the desired logging level
 def read_user_story(file_path):
     """Reads text content from a .docx file."""
     try:
-        doc = docx.Document(file_path)
-        content = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        with stage_timer("read docx"):
+            doc = docx.Document(file_path)
+            content = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
         return content
     except Exception as e:
         print(f"Error reading user story file: {e}")
@@ -58,159 +149,36 @@ def read_user_story(file_path):
 
 def analyze_user_story(user_story):
     """Performs NLP analysis on the user story using spaCy.  Currently just returns the doc."""
-    doc = nlp(user_story)
+    with stage_timer("spaCy analysis"):
+        doc = nlp(user_story)
     return doc
 
 
+def analyze_user_story_streaming(file_path, max_chars=STREAMING_SECTION_CHARS):
+    """
+    Analyzes a .docx user story section by section through nlp.pipe and returns a merged summary
+    (entities, sentence count, acceptance criteria, scenarios).  Memory is bounded by max_chars.
+    """
+    try:
+        with stage_timer("read docx + spaCy"):  # Reading and analysis are interleaved section by section
+            return analyze_story_streaming(nlp, iter_sections(iter_docx_paragraphs(file_path), max_chars))
+    except Exception as e:
+        print(f"Error reading user story file: {e}")
+        return None
+
+
 def generate_test_case_specifications(nlp_doc, start_index=0, num_specs=2):
-    """Generates test case specifications covering various testing aspects."""
-    test_case_specs = []
-
-    # Functional - Positive
-    test_case_specs.append({
-        "type": "Functional - Positive",
-        "description": "Verify successful login with valid credentials.",
-        "preconditions": "User account exists.",
-        "steps": "Enter valid username and password. Click login button.",
-        "expected_result": "User is logged in successfully."
-    })
-
-    # Functional - Negative
-    test_case_specs.append({
-        "type": "Functional - Negative",
-        "description": "Verify login failure with invalid credentials.",
-        "preconditions": "None.",
-        "steps": "Enter invalid username and password. Click login button.",
-        "expected_result": "Error message is displayed."
-    })
-
-    # Edge Case - Long Username
-    test_case_specs.append({
-        "type": "Edge Case",
-        "description": "Verify login with a very long username.",
-        "preconditions": "None.",
-        "steps": "Enter a username exceeding maximum length. Enter valid password. Click login button.",
-        "expected_result": "Appropriate error message is displayed or username is truncated."
-    })
-
-    # Edge Case - Special Characters in Username
-    test_case_specs.append({
-        "type": "Edge Case",
-        "description": "Verify login with special characters in the username.",
-        "preconditions": "None.",
-        "steps": "Enter a username containing special characters. Enter valid password. Click login button.",
-        "expected_result": "Login is successful or appropriate error message is displayed."
-    })
-
-    # Cross-Browser - Chrome
-    test_case_specs.append({
-        "type": "Cross-Browser - Chrome",
-        "description": "Verify login functionality on Chrome browser.",
-        "preconditions": "Chrome browser is installed.",
-        "steps": "Open application in Chrome. Enter valid username and password. Click login button.",
-        "expected_result": "User is logged in successfully in Chrome."
-    })
-
-    # Cross-Browser - Firefox
-    test_case_specs.append({
-        "type": "Cross-Browser - Firefox",
-        "description": "Verify login functionality on Firefox browser.",
-        "preconditions": "Firefox browser is installed.",
-        "steps": "Open application in Firefox. Enter valid username and password. Click login button.",
-        "expected_result": "User is logged in successfully in Firefox."
-    })
-
-    # Cross-Browser - Edge
-    test_case_specs.append({
-        "type": "Cross-Browser - Edge",
-        "description": "Verify login functionality on Edge browser.",
-        "preconditions": "Edge browser is installed.",
-        "steps": "Open application in Edge. Enter valid username and password. Click login button.",
-        "expected_result": "User is logged in successfully in Edge."
-    })
-
-    # Security - SQL Injection
-    test_case_specs.append({
-        "type": "Security - SQL Injection",
-        "description": "Attempt SQL injection in username field.",
-        "preconditions": "None.",
-        "steps": "Enter SQL injection string in username field. Enter valid password. Click login.",
-        "expected_result": "Application is not vulnerable to SQL injection. Error message or secure handling."
-    })
-
-    # Security - Brute Force
-    test_case_specs.append({
-        "type": "Security - Brute Force",
-        "description": "Attempt to brute force the login.",
-        "preconditions": "None.",
-        "steps": "Simulate multiple login attempts with incorrect passwords.",
-        "expected_result": "Account lockout mechanism or rate limiting is in place."
-    })
-
-    # Performance - Response Time
-    test_case_specs.append({
-        "type": "Performance - Response Time",
-        "description": "Measure login response time.",
-        "preconditions": "Stable network connection.",
-        "steps": "Enter valid credentials and click login. Measure time taken for login to complete.",
-        "expected_result": "Login response time is within acceptable limits (e.g., < 2 seconds)."
-    })
-
-    # Performance - Concurrent Users
-    test_case_specs.append({
-        "type": "Performance - Concurrent Users",
-        "description": "Verify login performance with concurrent users.",
-        "preconditions": "Test environment that supports concurrent users.",
-        "steps": "Simulate multiple users logging in simultaneously.",
-        "expected_result": "Application handles concurrent logins without significant performance degradation."
-    })
-
-    # Accessibility - WCAG 2.1 Perceivable - Text Alternatives
-    test_case_specs.append({
-        "type": "Accessibility - Perceivable",
-        "description": "Verify that all non-text content has text alternatives.",
-        "preconditions": "Login page is displayed.",
-        "steps": "Check if all images and icons on the login page have appropriate alt text.",
-        "expected_result": "All non-text content has text alternatives."
-    })
-
-    # Accessibility - WCAG 2.1 Operable - Keyboard Accessibility
-    test_case_specs.append({
-        "type": "Accessibility - Operable",
-        "description": "Verify that all functionality is available from a keyboard.",
-        "preconditions": "Login page is displayed.",
-        "steps": "Navigate the login page using only the keyboard (Tab, Shift+Tab, Enter).",
-        "expected_result": "All elements, including the login form and buttons, are accessible and operable via keyboard."
-    })
-
-    # Accessibility - WCAG 2.1 Understandable - Readable Text
-    test_case_specs.append({
-        "type": "Accessibility - Understandable",
-        "description": "Verify that the login page text is readable.",
-        "preconditions": "Login page is displayed.",
-        "steps": "Check the contrast ratio between text and background.  Check font size and readability.",
-        "expected_result": "Text is easily readable with sufficient contrast and appropriate font size."
-    })
-
-    # Accessibility - WCAG 2.1 Robust - Compatibility
-    test_case_specs.append({
-        "type": "Accessibility - Robust",
-        "description": "Verify that the login page is compatible with assistive technologies.",
-        "preconditions": "Login page is displayed.  Screen reader software is installed and running.",
-        "steps": "Use a screen reader to navigate the login page.",
-        "expected_result": "Screen reader can correctly interpret and announce all elements on the page, including labels, form fields, and buttons."
-    })
-
-    return test_case_specs[start_index:start_index + num_specs]  # Return a slice of the specs
-
-
-def generate_test_cases_from_specifications(test_case_specs):
-    """Uses Gemini API to generate detailed test cases from specifications."""
-    test_cases = []
-    request_count = 0
-    for i, spec in enumerate(test_case_specs):
-        print(f"Generating test case for specification {i + 1}/{len(test_case_specs)}")  # Track progress
-        prompt = f"""
+    """Generates test case specifications covering various testing aspects.  Pass num_specs=None for all."""
+    test_case_specs = [dict(spec) for spec in LOGIN_TEST_CASE_SPECS]
+
+    end_index = None if num_specs is None else start_index + num_specs
+    return test_case_specs[start_index:end_index]  # Return a slice of the specs
+
+
+def build_test_case_prompt(spec, story_context=None):
+    """Builds the Gemini prompt for a single test case specification, optionally grounded in story excerpts."""
+    context_block = f"Relevant excerpts from the user story:\n\n{story_context}\n" if story_context else ""
+    return f"""
         You are a QA engineer specializing in creating detailed test cases.  Based on the following test case specification, generate a comprehensive test case with the following sections:
 
         *   **Test Case ID:** (A unique ID, e.g., TC_LOGIN_001, TC_SECURITY_005, TC_ACCESSIBILITY_001)
@@ -225,44 +193,95 @@ def generate_test_cases_from_specifications(test_case_specs):
         *   **Pass/Fail Criteria:**
         *   **Notes:** (Any additional information or considerations)
 
+        {context_block}
         Return only the test case in a well-formatted, readable format with clear sections. Do not include any extra conversation or intro/outro text.  Use markdown formatting for headings and tables where appropriate.
-        """
-        retries = 1
-        for attempt in range(retries):
-            try:
-                # Rate limiting: Wait if we've made too many requests recently
-                if request_count >= 1:  # Limit to 1 requests per minute.
-                    print("Rate limit reached.  Sleeping for 60 seconds...")
-                    time.sleep(60)  # Wait for 60 seconds
-                    request_count = 0
-
-                print(f"Attempt {attempt + 1}/{retries} to generate test case...")  # Track retries
-                response = model.generate_content(prompt)
-                test_cases.append(response.text.strip())
-                request_count += 1
-                time.sleep(1)  # Add a delay of 1 second between requests
-                break  # Break out of retry loop if successful
-            except Exception as e:  # Catch the base exception
-                print(f"Error generating test case: {type(e).__name__} - {e}")  # Detailed error
-                if "429 Resource has been exhausted" in str(e):
-                    print(f"Quota exceeded. Retrying in {2**attempt} seconds...")
-                    time.sleep(2**attempt)
+    """
+
+
+# Generated case text -> the model that actually answered, for the case store's metadata
+case_models = {}
+
+
+def generate_test_case(spec, controller=None, story_context=None, shared_context=None):
+    """
+    Uses Gemini API to generate one detailed test case from a specification.  With a cached
+    `shared_context` the request goes to the model bound to the cached story.
+    """
+    with stage_timer("prompt build"):
+        prompt = build_test_case_prompt(spec, story_context)
+    retries = 1
+    for attempt in range(retries):
+        try:
+            # Rate limiting: Wait if we've made too many requests recently
+            with stage_timer("rate limit wait"):
+                rate_limiter.acquire()
+
+            print(f"Attempt {attempt + 1}/{retries} to generate test case...")  # Track retries
+            start = time.monotonic()
+            with stage_timer("generate_content"):
+                if shared_context:
+                    response = shared_context.generate_content(prompt)
                 else:
-                    print(f"Error generating test case: {e}")
-                    return None
-        else:
-            print("Max retries reached. Failed to generate test case.")
-            return None  # Return None if all retries fail
+                    response = router.generate_content(spec, prompt) if router else model.generate_content(prompt)
+            if controller:
+                controller.record(time.monotonic() - start)
+            time.sleep(1)  # Add a delay of 1 second between requests
+            test_case = response.text.strip()
+            section_repairer.record_generation(prompt, test_case)
+            if REPAIR_SECTIONS:
+                test_case = section_repairer.repair(spec, test_case, generate_section_repair)
+            case_models[test_case.strip()] = answered_by(response, model)
+            return test_case
+        except Exception as e:  # Catch the base exception
+            print(f"Error generating test case: {type(e).__name__} - {e}")  # Detailed error
+            if "429 Resource has been exhausted" in str(e):
+                if controller:
+                    controller.record(None, throttled=True)
+                print(f"Quota exceeded. Retrying in {2**attempt} seconds...")
+                time.sleep(2**attempt)
+            else:
+                print(f"Error generating test case: {e}")
+                return None
 
-    return test_cases
+    print("Max retries reached. Failed to generate test case.")
+    return None  # Return None if all retries fail
 
 
-def save_test_cases(test_cases, filename="test_cases_from_user_story_nlp_llm.txt", append=False):
-    """Saves the generated test cases to a file with improved formatting."""
+def generate_section_repair(prompt):
+    """Sends one follow-up request for missing sections; returns None on failure so the case is kept as is."""
+    try:
+        rate_limiter.acquire()
+        return model.generate_content(prompt).text.strip()
+    except Exception as e:
+        print(f"Error repairing test case sections: {type(e).__name__} - {e}")
+        return None
+
+
+def generate_test_cases_from_specifications(test_case_specs, controller=None):
+    """
+    Uses Gemini API to generate detailed test cases from specifications.  Returns one entry
+    per spec, None where generation failed, so one bad spec does not lose the rest.
+    """
+    concurrency = controller.concurrency if controller else 1
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for i, spec in enumerate(test_case_specs):
+            print(f"Generating test case for specification {i + 1}/{len(test_case_specs)}")  # Track progress
+            futures.append(executor.submit(generate_test_case, spec, controller))
+        return [future.result() for future in futures]
+
+
+def save_test_cases(test_cases, filename="test_cases_from_user_story_nlp_llm.txt", append=False, sink=None):
+    """Saves the generated test cases to a file with improved formatting, or hands them to an open sink."""
     if not test_cases:
         print("No test cases generated. Exiting.")
         return
 
+    if sink:
+        sink.write(test_cases)
+        print(f"Queued {len(test_cases)} test cases for {sink.filepath}")
+        return
+
     # Ensure the output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -277,40 +296,356 @@ def save_test_cases(test_cases, filename="test_cases_from_user_story_nlp_llm.txt
     print(f"Test cases saved to {filepath}")
 
 
-def generate_and_save_test_cases_from_story(file_path, start_index=0, num_specs=2, append=False):
-    """Generates and saves test cases from a user story."""
-    user_story = read_user_story(file_path)
+@profiled()
+def generate_and_save_test_cases_from_story(file_path, start_index=0, num_specs=2, append=False, controller=None,
+                                            sink=None):
+    """Generates and saves test cases from a user story; returns the indices of specs that failed."""
+    if STREAMING_ANALYSIS:
+        nlp_doc = analyze_user_story_streaming(file_path)
+    else:
+        user_story = read_user_story(file_path)
+        nlp_doc = analyze_user_story(user_story) if user_story else None
 
-    if user_story:
-        nlp_doc = analyze_user_story(user_story)
+    if nlp_doc is not None:
+        if router:
+            router.set_story(nlp_doc)
         test_case_specs = generate_test_case_specifications(nlp_doc, start_index, num_specs)
 
         if test_case_specs:
-            test_cases = generate_test_cases_from_specifications(test_case_specs)
+            results = generate_test_cases_from_specifications(test_case_specs, controller)
+            failed = [start_index + i for i, test_case in enumerate(results) if test_case is None]
+            test_cases = [test_case for test_case in results if test_case is not None]
 
             if test_cases:
-                save_test_cases(test_cases, "test_cases_from_user_story_nlp_llm.txt", append)
-            else:
-                print("Failed to generate test cases.")
+                save_test_cases(test_cases, "test_cases_from_user_story_nlp_llm.txt", append, sink)
+            if failed:
+                print(f"Failed to generate test cases for specifications "
+                      f"{', '.join(str(index + 1) for index in failed)}.")
+            return failed
         else:
             print("No test case specifications generated.")
     else:
         print("Failed to read user story.")
+        return list(range(start_index, start_index + (num_specs or 0)))
+    return []
 
 
-if __name__ == "__main__":
-    # Define the total number of test case specifications
-    total_specs = 15 # updated total specs as 15.
+def index_test_cases(output_path, story_path):
+    """Adds the cases in a finished output file to the case store; unchanged cases are skipped."""
+    if not CASE_STORE_PATH or not os.path.exists(output_path):
+        return
+    store = CaseStore(CASE_STORE_PATH)
+    try:
+        store.ingest_file(output_path, story=os.path.basename(story_path), model=model_name(model),
+                          models=case_models)
+    finally:
+        store.close()
 
-    # Define the batch size
-    batch_size = 2
 
-    # Iterate through the test case specifications in batches
-    start_index = 0
-    while start_index < total_specs:
-        print(f"Generating test cases from index {start_index} to {start_index + batch_size}")
-        append = start_index > 0  # Append to the file after the first batch
-        generate_and_save_test_cases_from_story(USER_STORY_PATH, start_index, batch_size, append)
-        start_index += batch_size
+def generate_test_cases_incremental(file_path, filename="test_cases_from_user_story_nlp_llm.txt"):
+    """
+    Regenerates only the test cases whose story paragraphs changed since the last run and
+    reuses the rest from the manifest stored next to the output file.
+    """
+    user_story = read_user_story(file_path)
+    if not user_story:
+        print("Failed to read user story.")
+        return
+
+    test_case_specs = generate_test_case_specifications(analyze_user_story(user_story), 0, None)
+    manifest = StoryManifest(os.path.join(OUTPUT_DIR, f"{os.path.splitext(filename)[0]}.manifest.json"))
+    plan, paragraphs, changed = plan_regeneration(user_story, test_case_specs, manifest)
+    stale = [item for item in plan if item["stale"]]
+    print(f"{changed} story paragraphs changed; regenerating {len(stale)} of {len(plan)} test cases.")
 
+    shared_context = None
+    if CONTEXT_CACHE and stale:
+        shared_context = SharedContext(model, STORY_CACHE_INSTRUCTIONS, f"User story:\n\n{user_story}",
+                                       CONTEXT_CACHE_MODEL)
+        if not shared_context.cached:
+            print("Story context was not cached; sending the relevant excerpts with each spec.")
+            shared_context = None
+
+    test_cases = []
+    try:
+        for item in plan:
+            test_case = None
+            if item["stale"]:
+                test_case = generate_test_case(item["spec"], story_context=None if shared_context else item["context"],
+                                               shared_context=shared_context)
+                if test_case:
+                    manifest.update(item["key"], item["deps"], test_case)
+                else:
+                    print(f"Keeping the previous test case for '{item['spec']['description']}'; "
+                          f"it will be retried next run.")
+            test_cases.append(test_case or manifest.cached_test_case(item["key"]))
+    finally:
+        if shared_context:
+            shared_context.log_metrics()
+            shared_context.close()
+
+    manifest.prune({item["key"] for item in plan})
+    manifest.save(paragraphs)
+    with TestCaseSink(os.path.join(OUTPUT_DIR, filename), fsync=OUTPUT_FSYNC) as sink:
+        save_test_cases([test_case for test_case in test_cases if test_case], sink=sink)
+    index_test_cases(os.path.join(OUTPUT_DIR, filename), file_path)
+
+
+def watch_stories(stories_dir=STORIES_DIR):
+    """Regenerates test cases incrementally in the background whenever a story .docx is saved."""
+    def on_story_saved(path):
+        print(f"Detected change in {path}")
+        story_name = os.path.splitext(os.path.basename(path))[0]
+        generate_test_cases_incremental(path, f"test_cases_{story_name}.txt")
+
+    os.makedirs(stories_dir, exist_ok=True)
+    watcher = StoryWatcher(stories_dir, on_story_saved).start()
+    print(f"Watching {stories_dir} for saved .docx user stories. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+def enqueue_story(file_path, queue_path=JOB_QUEUE_PATH):
+    """Producer: turns every spec for a story into a durable job in the shared queue."""
+    user_story = read_user_story(file_path)
+    if not user_story:
+        print("Failed to read user story.")
+        return
+    test_case_specs = generate_test_case_specifications(analyze_user_story(user_story), 0, None)
+    queue = JobQueue(queue_path)
+    added = queue.enqueue(file_path, test_case_specs)
+    print(f"Queued {added} new jobs ({len(test_case_specs) - added} already queued) in {queue_path}")
+    queue.close()
+
+
+def generate_queued_test_case(story_path, spec):
+    """Worker callback: generates the test case for one leased job."""
+    return generate_test_case(spec)
+
+
+def run_generation_worker(queue_path, requests_per_minute, num_workers):
+    """Worker process: generates with its share of the request budget so the workers together stay within it."""
+    rate_limiter.requests_per_minute = requests_per_minute
+    for pool in (key_pool, fast_key_pool):
+        for slot in pool.slots if pool else ():
+            slot.window *= num_workers  # Each worker gets 1/N of every key's quota
+    run_worker(queue_path, generate_queued_test_case)
+
+
+def run_generation_workers(num_workers, queue_path=JOB_QUEUE_PATH):
+    """
+    Starts local worker processes; run the same command on other machines to add more workers.
+    The per-minute budget is divided between the local workers, so set GEMINI_RPM on each
+    machine to that machine's share of the quota.
+    """
+    budgets = split_budget(REQUESTS_PER_MINUTE, num_workers)
+    if len(budgets) < num_workers:
+        print(f"{REQUESTS_PER_MINUTE} requests per minute cannot be shared by {num_workers} workers; "
+              f"starting {len(budgets)}.")
+    workers = [multiprocessing.Process(target=run_generation_worker, args=(queue_path, budget, len(budgets)))
+               for budget in budgets]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    print_queue_report(queue_path)
+
+
+def print_queue_report(queue_path=JOB_QUEUE_PATH):
+    """Prints job counts and the per-worker throughput report."""
+    queue = JobQueue(queue_path)
+    print(f"Jobs: {queue.counts()}")
+    for row in queue.throughput_report():
+        print(f"{row['worker']}: {row['completed']} done, {row['failed']} failed, "
+              f"{row['jobs_per_minute']:.1f} jobs/min, {row['utilization']:.0%} busy")
+    queue.close()
+
+
+def export_queued_test_cases(file_path, queue_path=JOB_QUEUE_PATH):
+    """Writes the finished test cases for a story from the queue to the output file."""
+    queue = JobQueue(queue_path)
+    test_cases = queue.results(file_path)
+    queue.close()
+    output_path = os.path.join(OUTPUT_DIR, "test_cases_from_user_story_nlp_llm.txt")
+    with TestCaseSink(output_path, fsync=OUTPUT_FSYNC) as sink:
+        save_test_cases(test_cases, sink=sink)
+    index_test_cases(output_path, file_path)
+
+
+def generate_test_cases_by_priority(file_path, budget_tokens=None, budget_seconds=None,
+                                    filename="test_cases_from_user_story_nlp_llm.txt"):
+    """
+    Generates the most valuable specs that fit a token and/or time budget, highest priority
+    first, and records the rest as deferred so the next run starts with them.
+    """
+    user_story = read_user_story(file_path)
+    if not user_story:
+        print("Failed to read user story.")
+        return
+
+    nlp_doc = analyze_user_story(user_story)
+    if router:
+        router.set_story(nlp_doc)
+    test_case_specs = generate_test_case_specifications(nlp_doc, 0, None)
+    scheduler = SpecScheduler(os.path.join(OUTPUT_DIR, "spec_schedule.json"), budget_tokens, budget_seconds)
+    previous = list(scheduler.completed.values())
+    scheduled, deferred = scheduler.plan(test_case_specs, build_test_case_prompt)
+    deferred = [spec for spec, _, _, _ in deferred]
+    print(f"Scheduled {len(scheduled)} of {len(test_case_specs) - len(previous)} remaining specs within the budget.")
+
+    done = []
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    scheduler.start()
+    with TestCaseSink(output_path, fsync=OUTPUT_FSYNC) as sink:
+        if previous:
+            save_test_cases(previous, sink=sink)  # Cases from earlier runs of this cycle
+        for spec, priority, tokens, seconds in scheduled:
+            if not scheduler.has_budget_for(tokens, seconds):
+                deferred.append(spec)  # Estimates were optimistic; leave it for the next run
+                continue
+            print(f"Generating [{priority:.0f}] {spec['type']}: {spec['description']}")
+            start = time.monotonic()
+            test_case = generate_test_case(spec)
+            scheduler.record(spec, build_test_case_prompt(spec), test_case, time.monotonic() - start)
+            if test_case:
+                save_test_cases([test_case], sink=sink)
+                done.append(spec)
+            else:
+                deferred.append(spec)
+
+    scheduler.save(deferred)
+    scheduler.report(done, deferred)
+    index_test_cases(output_path, file_path)
+
+
+def generate_combinatorial_test_cases(file_path, strength=2, filename="test_cases_combinatorial.txt"):
+    """
+    Expands browsers x user types x input classes x locales into a covering array, generates
+    one template per input class and fills in every configuration of that class locally.
+    """
+    configurations = covering_array(LOGIN_SPEC_DIMENSIONS, strength)
+    classes = group_by_class(configurations, LOGIN_CLASS_DIMENSIONS)
+    print_plan(LOGIN_SPEC_DIMENSIONS, configurations, classes, strength)
+    placeholders = [name for name in LOGIN_SPEC_DIMENSIONS if name not in LOGIN_CLASS_DIMENSIONS]
+
+    output_path = os.path.join(OUTPUT_DIR, filename)
+    with TestCaseSink(output_path, fsync=OUTPUT_FSYNC) as sink:
+        for key, members in classes.items():
+            class_values = {name: LOGIN_INPUT_CLASSES[value] for name, value in zip(LOGIN_CLASS_DIMENSIONS, key)}
+            print(f"Generating template for {', '.join(key)} ({len(members)} configurations)")
+            template = generate_test_case(template_spec(LOGIN_COMBINATORIAL_BASE_SPEC, class_values, placeholders))
+            if template is None:
+                print(f"Failed to generate the template for {', '.join(key)}; skipping its configurations.")
+                continue
+            save_test_cases([fill_template(template, configuration, placeholders) for configuration in members],
+                            sink=sink)
+    index_test_cases(output_path, file_path)
+
+
+@profiled()
+def generate_test_cases_in_batches(file_path):
+    """Generates test cases for every spec in adaptively sized batches into one output file."""
+    # Size the run from the specs that actually exist instead of a hard-coded count
+    total_specs = len(generate_test_case_specifications(None, 0, None))
+
+    # Batch size and concurrency adapt to latency, 429 responses and remaining quota
+    controller = AdaptiveBatchController(rate_limiter=rate_limiter, daily_quota=DAILY_QUOTA)
+
+    # One sink for the whole run: cases are numbered globally and the file is replaced atomically at the end
+    output_path = os.path.join(OUTPUT_DIR, "test_cases_from_user_story_nlp_llm.txt")
+    with TestCaseSink(output_path, fsync=OUTPUT_FSYNC) as sink:
+        # Iterate through the test case specifications in batches
+        failed = []
+        start_index = 0
+        while start_index < total_specs:
+            batch_size = controller.next_batch_size(total_specs - start_index)
+            if batch_size == 0:
+                print(f"Daily quota exhausted. Stopping before specification {start_index + 1}/{total_specs}.")
+                break
+            print(f"Generating test cases from index {start_index} to {start_index + batch_size} "
+                  f"(concurrency {controller.concurrency})")
+            batch_start = time.monotonic()
+            batch_failed = generate_and_save_test_cases_from_story(file_path, start_index, batch_size,
+                                                                   controller=controller, sink=sink)
+            controller.end_batch(batch_size - len(batch_failed), time.monotonic() - batch_start,
+                                 failed=len(batch_failed))
+            failed.extend(batch_failed)
+            start_index += batch_size
+
+        # Requeue failed specs once, one per batch, after the rest of the run
+        retry, failed = failed, []
+        for position, index in enumerate(retry):
+            if controller.next_batch_size(1) == 0:
+                print("Daily quota exhausted. Not retrying the remaining failed specifications.")
+                failed.extend(retry[position:])
+                break
+            print(f"Retrying specification {index + 1}/{total_specs}")
+            batch_start = time.monotonic()
+            batch_failed = generate_and_save_test_cases_from_story(file_path, index, 1, controller=controller,
+                                                                   sink=sink)
+            controller.end_batch(1 - len(batch_failed), time.monotonic() - batch_start, failed=len(batch_failed))
+            failed.extend(batch_failed)
+    index_test_cases(output_path, file_path)
+
+    if isinstance(model, HedgedModel):
+        model.log_metrics()
+    if key_pool:
+        key_pool.log_utilization()
+    if router:
+        if isinstance(router.models["fast"], HedgedModel):
+            router.models["fast"].log_metrics()
+        if fast_key_pool:
+            fast_key_pool.log_utilization()
+        router.report()
+    section_repairer.report()
+
+    if failed:
+        print(f"Test case generation incomplete. Failed specifications: "
+              f"{', '.join(str(index + 1) for index in failed)}")
+        sys.exit(1)
     print("Test case generation complete.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate test cases from a user story with spaCy and Gemini.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only regenerate test cases whose story paragraphs changed since the last run")
+    parser.add_argument("--watch", action="store_true",
+                        help=f"Regenerate incrementally whenever a .docx under {STORIES_DIR} is saved")
+    parser.add_argument("--enqueue", action="store_true", help=f"Queue one job per spec in {JOB_QUEUE_PATH}")
+    parser.add_argument("--workers", type=int, help="Run N worker processes against the job queue")
+    parser.add_argument("--export", action="store_true", help="Write finished queued test cases to the output file")
+    parser.add_argument("--report", action="store_true", help="Print job counts and per-worker throughput")
+    parser.add_argument("--budget-tokens", type=int, help="Generate the highest-priority specs within this many tokens")
+    parser.add_argument("--budget-seconds", type=float, help="Generate the highest-priority specs within this time")
+    parser.add_argument("--combinatorial", action="store_true",
+                        help="Cover browser/user/input/locale combinations with one LLM call per input class")
+    parser.add_argument("--strength", type=int, default=2, help="Cover all t-way combinations (default: pairs)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write cProfile stats and tracemalloc snapshots to logs/ (same as PROFILE=1)")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+
+    if args.enqueue or args.workers or args.export or args.report:
+        if args.enqueue:
+            enqueue_story(USER_STORY_PATH)
+        if args.workers:
+            run_generation_workers(args.workers)
+        if args.export:
+            export_queued_test_cases(USER_STORY_PATH)
+        if args.report:
+            print_queue_report()
+    elif args.combinatorial:
+        generate_combinatorial_test_cases(USER_STORY_PATH, args.strength)
+    elif args.budget_tokens or args.budget_seconds:
+        generate_test_cases_by_priority(USER_STORY_PATH, args.budget_tokens, args.budget_seconds)
+    elif args.watch:
+        watch_stories()
+    elif args.incremental:
+        generate_test_cases_incremental(USER_STORY_PATH)
+    else:
+        generate_test_cases_in_batches(USER_STORY_PATH)
@@ -1,6 +1,16 @@
+# python tests/test_ai_nlp_llm_model_withtext.py
+# python tests/test_ai_nlp_llm_model_withtext.py --questions questions.txt --output answers.jsonl
+import argparse
+import os
+import sys
 import spacy
 import google.generativeai as genai
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.entity_batch import answer_questions, read_questions
+from utils.rate_limiter import RateLimiter
+from utils.semantic_cache import SemanticCache
+
 # Load spaCy model
 nlp = spacy.load("en_core_web_sm")
 
@@ -8,17 +18,72 @@ nlp = spacy.load("en_core_web_sm")
 genai.configure(api_key="")
 model = genai.GenerativeModel('gemini-1.5-pro')
 
+# Optional semantic cache: set SEMANTIC_CACHE=1 in .env to answer questions with the same entities and intent
+# from earlier answers (kept in SEMANTIC_CACHE_PATH between runs) instead of calling Gemini again
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE") == "1"
+cache = SemanticCache(capacity=int(os.getenv("SEMANTIC_CACHE_SIZE", "1024")),
+                      threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8")),
+                      path=os.getenv("SEMANTIC_CACHE_PATH", os.path.join("documents", "semantic_cache.json"))
+                      ) if SEMANTIC_CACHE else None
+
 # Sample Text
 text = "What are the Apple Inc. sales reported in 3rd quarter.  " \
        "Provide complete detail sales of each apple product in 3rd quarter."
 
-# NLP (spaCy)
-doc = nlp(text)
-entities = [(ent.text, ent.label_) for ent in doc.ents]
-print("Extracted Entities:", entities) # -->  [('Apple Inc.', 'ORG'), ('the 3rd quarter', 'iPhone 16')]
 
-# LLM (Gemini) - Ask a question based on the entities
-prompt = f"Based on the text: '{text}' and the extracted entities: {entities}, summarize the earnings report focusing on key figures. "
-response = model.generate_content(prompt)
-print("\nLLM Summary:")
-print(response.text)
+def summarize_text(text):
+    """Extracts entities from a single question and asks Gemini about them."""
+    # NLP (spaCy)
+    doc = nlp(text)
+    entities = [(ent.text, ent.label_) for ent in doc.ents]
+    print("Extracted Entities:", entities) # -->  [('Apple Inc.', 'ORG'), ('the 3rd quarter', 'iPhone 16')]
+
+    if cache is not None:
+        answer, score = cache.get(text, entities)
+        if answer is not None:
+            print(f"\nCached Summary (similarity {score:.2f}):")
+            print(answer)
+            cache.log_metrics()
+            return
+
+    # LLM (Gemini) - Ask a question based on the entities
+    prompt = f"Based on the text: '{text}' and the extracted entities: {entities}, summarize the earnings report focusing on key figures. "
+    response = model.generate_content(prompt)
+    print("\nLLM Summary:")
+    print(response.text)
+    if cache is not None:
+        cache.put(text, entities, response.text)
+        cache.save()
+
+
+def answer_question_file(questions, output="-", n_process=1, group_size=10):
+    """Answers every question in a file ('-' for stdin), streaming JSON lines to output."""
+    stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    try:
+        stats = answer_questions(nlp, model, read_questions(questions), stream,
+                                 n_process=n_process, group_size=group_size,
+                                 rate_limiter=RateLimiter(int(os.getenv("GEMINI_RPM", "1"))), cache=cache)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    if cache is not None:
+        cache.save()
+        print(f"{stats['cached']} answers came from the semantic cache", file=sys.stderr)
+        cache.log_metrics(file=sys.stderr)
+    print(f"Answered {stats['questions']} questions with {stats['llm_calls']} LLM calls "
+          f"in {stats['seconds']:.1f}s ({stats['questions_per_second']:.1f} questions/s)", file=sys.stderr)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer analyst questions using spaCy entities and Gemini.")
+    parser.add_argument("--questions", help="File with one question per line ('-' for stdin) to run in batch mode")
+    parser.add_argument("--output", default="-", help="Where to stream JSON-lines answers (default: stdout)")
+    parser.add_argument("--n-process", type=int, default=1, help="spaCy worker processes for entity extraction")
+    parser.add_argument("--group-size", type=int, default=10, help="Max questions sharing one LLM call")
+    args = parser.parse_args()
+
+    if args.questions:
+        answer_question_file(args.questions, args.output, args.n_process, args.group_size)
+    else:
+        summarize_text(text)
@@ -8,6 +8,11 @@ import datetime
 import spacy
 import re
 import docx  # Import the docx library
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.profiling import profiled
+from utils.story_stream import analyze_story_streaming, iter_docx_paragraphs, iter_sections
 
 # Load a SpaCy language model
 try:
@@ -18,25 +23,61 @@ except OSError:
     nlp = spacy.load("en_core_web_sm")
 
 
-def extract_test_plan_nlp_docx(user_story_file, output_file="auto_test_plan_nlp.docx"):
+@profiled()
+def extract_test_plan_nlp_docx(user_story_file, output_file="auto_test_plan_nlp.docx", streaming=False):
     """
     Extracts information from a user story file (in .docx format) using SpaCy NLP and generates a draft test plan.
+    With streaming=True the document is analyzed section by section, so very large stories stay within
+    bounded memory and spaCy's max_length.
     """
 
-    try:
-        # Open the .docx file using the docx library
-        doc = docx.Document(user_story_file)
-        # Read all the paragraphs from the document into a single string
-        user_story_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-    except FileNotFoundError:
-        print(f"Error: User story file '{user_story_file}' not found.")
-        return
-    except Exception as e:
-        print(f"Error reading user story file: {e}")
-        return
-
-    # ---  NLP Processing with SpaCy ---
-    doc = nlp(user_story_text)
+    if streaming:
+        try:
+            summary = analyze_story_streaming(nlp, iter_sections(iter_docx_paragraphs(user_story_file)))
+        except FileNotFoundError:
+            print(f"Error: User story file '{user_story_file}' not found.")
+            return
+        except Exception as e:
+            print(f"Error reading user story file: {e}")
+            return
+        user_story_text = summary["user_story"] or ""
+        acceptance_criteria = summary["acceptance_criteria"] or ["No acceptance criteria found.  Please add them!"]
+        scenarios = summary["scenarios"] or ["No scenarios found.  Please add them!"]
+    else:
+        try:
+            # Open the .docx file using the docx library
+            doc = docx.Document(user_story_file)
+            # Read all the paragraphs from the document into a single string
+            user_story_text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        except FileNotFoundError:
+            print(f"Error: User story file '{user_story_file}' not found.")
+            return
+        except Exception as e:
+            print(f"Error reading user story file: {e}")
+            return
+
+        # ---  NLP Processing with SpaCy ---
+        doc = nlp(user_story_text)
+
+        # Extract Acceptance Criteria (Improved with sentence segmentation)
+        try:
+            acceptance_criteria_header = re.search(r"(?i)(Acceptance Criteria:|Acceptance Criteria:)", user_story_text).group(0)
+            acceptance_criteria_text = user_story_text.split(acceptance_criteria_header)[1].strip()
+            # Splitting the text into sentences using SpaCy
+            acceptance_criteria = [sent.text.strip() for sent in nlp(acceptance_criteria_text).sents]
+
+
+        except:
+            acceptance_criteria = ["No acceptance criteria found.  Please add them!"]
+
+        # Extract Scenarios (Improved with sentence segmentation)
+        try:
+            scenarios_header = re.search(r"(?i)(Scenarios Covered:|Test Scenarios:)", user_story_text).group(0)
+            scenarios_text = user_story_text.split(scenarios_header)[1].strip()
+            # Splitting the text into sentences using SpaCy
+            scenarios = [sent.text.strip() for sent in nlp(scenarios_text).sents]
+        except:
+            scenarios = ["No scenarios found.  Please add them!"]
 
     # --- Extraction Logic (Adapt this to your user story format) ---
     # --- This is still format-dependent but more robust due to SpaCy ---
@@ -55,27 +96,6 @@ def extract_test_plan_nlp_docx(user_story_file, output_file="auto_test_plan_nlp.
         so_that = "Could not parse"
 
 
-    # Extract Acceptance Criteria (Improved with sentence segmentation)
-    try:
-        acceptance_criteria_header = re.search(r"(?i)(Acceptance Criteria:|Acceptance Criteria:)", user_story_text).group(0)
-        acceptance_criteria_text = user_story_text.split(acceptance_criteria_header)[1].strip()
-        # Splitting the text into sentences using SpaCy
-        acceptance_criteria = [sent.text.strip() for sent in nlp(acceptance_criteria_text).sents]
-
-
-    except:
-        acceptance_criteria = ["No acceptance criteria found.  Please add them!"]
-
-    # Extract Scenarios (Improved with sentence segmentation)
-    try:
-        scenarios_header = re.search(r"(?i)(Scenarios Covered:|Test Scenarios:)", user_story_text).group(0)
-        scenarios_text = user_story_text.split(scenarios_header)[1].strip()
-        # Splitting the text into sentences using SpaCy
-        scenarios = [sent.text.strip() for sent in nlp(scenarios_text).sents]
-    except:
-        scenarios = ["No scenarios found.  Please add them!"]
-
-
 
     # Current timestamp
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -142,6 +162,7 @@ This section provides a draft of test cases based on the acceptance criteria and
 
 
 # ---  Example Usage ---
-# Replace with the actual path to your .docx file
-user_story_file = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_Model_Driven_TestCases_Automation_Script\Login and Logout Functionality Validation Across Multiple Browsers.docx"
-extract_test_plan_nlp_docx(user_story_file)
\ No newline at end of file
+if __name__ == "__main__":
+    # Replace with the actual path to your .docx file
+    user_story_file = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_Model_Driven_TestCases_Automation_Script\Login and Logout Functionality Validation Across Multiple Browsers.docx"
+    extract_test_plan_nlp_docx(user_story_file)
\ No newline at end of file
@@ -14,13 +14,23 @@ from docx.shared import Pt
 import docx  # Import docx
 import pytest
 import re  # Import the re module
+import sys
 
-def generate_test_plan_docx(user_story_file=None,
-                             user_story_text=None,
-                             output_file="test_plan.docx"):
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.docx_render import DocumentTemplate, render_documents
+from utils.profiling import profiled
+
+# Structured login/logout test cases included in every plan (also compiled into Playwright tests)
+LOGIN_TEST_CASES = [
+    ("TC_LOGIN_001", "Successful Login & Logout Flow (Valid Credentials)", "`Config.USERS` contains valid username and password. App is running.", "1. Navigate to `Config.BASE_URL`. 2. Enter valid credentials. 3. Click login. 4. Verify dashboard. 5. Click logout. 6. Verify login page.", "User logs in, sees dashboard, logs out, sees login page.", "High"),
+    ("TC_LOGIN_002", "Failed Login Attempt (Invalid Credentials)", "`Config.USERS` contains invalid credentials. App is running.", "1. Navigate to `Config.BASE_URL`. 2. Enter invalid credentials. 3. Click login.", "User remains on login page. Error message displayed (if any).", "High"),
+    ("TC_LOGIN_003", "Login with Empty Credentials", "App is running.", "1. Navigate to `Config.BASE_URL`. 2. Attempt login with empty fields. 3. Click login.", "User remains on login page. Error message displayed (if any).", "Medium")
+]
+
+def parse_user_story(user_story_file=None, user_story_text=None):
     """
-    Generates a basic test plan document in .docx format.  It can read the user
-    story from a .docx file, or you can pass in the user story text directly.
+    Extracts the role, goal, benefit, acceptance criteria and scenarios from a user story,
+    read from a .docx file or passed in as text.
     """
 
     as_a = ""
@@ -94,7 +104,17 @@ def generate_test_plan_docx(user_story_file=None,
         acceptance_criteria_list = ["General Parsing Error"]
         scenarios_covered_list = ["General Parsing Error"]
 
-    # Create a new Document
+    return {
+        "as_a": as_a,
+        "i_want_to": i_want_to,
+        "so_that": so_that,
+        "acceptance_criteria": acceptance_criteria_list,
+        "scenarios": scenarios_covered_list,
+    }
+
+
+def create_styled_document():
+    """Creates a blank document with the test plan's paragraph styles."""
     document = Document()
 
     # Styles
@@ -122,6 +142,16 @@ def generate_test_plan_docx(user_story_file=None,
     paragraph_font.name = 'Arial'
     paragraph_font.size = Pt(12)
 
+    return document
+
+
+def build_test_plan(document, story):
+    """Adds every test plan section for a parsed user story to a styled document."""
+    as_a = story["as_a"]
+    i_want_to = story["i_want_to"]
+    so_that = story["so_that"]
+    acceptance_criteria_list = story["acceptance_criteria"]
+    scenarios_covered_list = story["scenarios"]
 
     # Add a heading
     document.add_heading('Test Plan: Login and Logout Functionality', level=1)
@@ -188,13 +218,7 @@ def generate_test_plan_docx(user_story_file=None,
     hdr_cells[5].text = 'Priority'
 
     # Add test cases
-    test_cases = [
-        ("TC_LOGIN_001", "Successful Login & Logout Flow (Valid Credentials)", "`Config.USERS` contains valid username and password. App is running.", "1. Navigate to `Config.BASE_URL`. 2. Enter valid credentials. 3. Click login. 4. Verify dashboard. 5. Click logout. 6. Verify login page.", "User logs in, sees dashboard, logs out, sees login page.", "High"),
-        ("TC_LOGIN_002", "Failed Login Attempt (Invalid Credentials)", "`Config.USERS` contains invalid credentials. App is running.", "1. Navigate to `Config.BASE_URL`. 2. Enter invalid credentials. 3. Click login.", "User remains on login page. Error message displayed (if any).", "High"),
-        ("TC_LOGIN_003", "Login with Empty Credentials", "App is running.", "1. Navigate to `Config.BASE_URL`. 2. Attempt login with empty fields. 3. Click login.", "User remains on login page. Error message displayed (if any).", "Medium")
-    ]
-
-    for test_case_id, test_description, preconditions, test_steps, expected_results, priority in test_cases:
+    for test_case_id, test_description, preconditions, test_steps, expected_results, priority in LOGIN_TEST_CASES:
         row_cells = table.add_row().cells
         row_cells[0].text = test_case_id
         row_cells[1].text = test_description
@@ -298,6 +322,18 @@ def generate_test_plan_docx(user_story_file=None,
         p.paragraph_format.first_line_indent = Inches(-0.25)
 
 
+@profiled()
+def generate_test_plan_docx(user_story_file=None,
+                             user_story_text=None,
+                             output_file="test_plan.docx"):
+    """
+    Generates a basic test plan document in .docx format.  It can read the user
+    story from a .docx file, or you can pass in the user story text directly.
+    """
+    story = parse_user_story(user_story_file, user_story_text)
+    document = create_styled_document()
+    build_test_plan(document, story)
+
     # Ensure the "documents" directory exists
     documents_dir = "documents"
     if not os.path.exists(documents_dir):
@@ -311,23 +347,40 @@ def generate_test_plan_docx(user_story_file=None,
     except Exception as e:
         print(f"Error generating test plan: {e}")
 
-# Example Usage: Provide either the user story file OR the user story text
-user_story_file = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_Model_Driven_TestCases_Automation_Script\Login and Logout Functionality Validation Across Multiple Browsers.docx"  # **COMPLETE PATH HERE**
-# If you don't want to read from a file, comment out the above line and uncomment the lines below
-#user_story_text = """
-#As a Quality Assurance Engineer,
-#I want to verify the login and logout functionality of the application across multiple browsers and user accounts,
-#So that I can ensure consistent user access control, security, and cross-browser compatibility.
-#
-#Acceptance Criteria:
-#1. Cross-Browser Testing: Validate login/logout flow on Chromium, Firefox, and WebKit browsers.
-#2. Multi-User Credential Validation: Test all configured users (valid and invalid credentials) in Config.USERS.
-#3. Post-Login Redirection: After successful login, users must be redirected to the dashboard.
-#4. Logout Functionality: Logout must redirect users to the login page (Config.BASE_URL).
-#
-#Scenarios Covered:
-#1. Successful Login & Logout Flow: Navigate to the login page. Enter valid credentials. Confirm redirection to the dashboard. Log out and verify redirection to the login page.
-#2. Failed Login Handling: Attempt login with invalid credentials (if applicable). Verify the user remains on the login page.
-#"""
-
-generate_test_plan_docx(user_story_file=user_story_file)  # Pass the file
\ No newline at end of file
+
+def render_plan_from_story(document, user_story_file):
+    build_test_plan(document, parse_user_story(user_story_file))
+
+
+def render_test_plans(user_story_files, output_dir=os.path.join("documents", "test_plans"), processes=None):
+    """
+    Renders one test plan per user story file into output_dir, cloning a single pre-styled
+    template instead of rebuilding the styles for every document, across a process pool.
+    """
+    template = DocumentTemplate(create_styled_document)
+    jobs = [(os.path.join(output_dir, f"{os.path.splitext(os.path.basename(path))[0]}_test_plan.docx"), (path,))
+            for path in user_story_files]
+    return render_documents(template, render_plan_from_story, jobs, processes)
+
+
+if __name__ == "__main__":
+    # Example Usage: Provide either the user story file OR the user story text
+    user_story_file = r"C:\Users\dhira\Desktop\Dhiraj HP Laptop\Projects\AI_Model_Driven_TestCases_Automation_Script\Login and Logout Functionality Validation Across Multiple Browsers.docx"  # **COMPLETE PATH HERE**
+    # If you don't want to read from a file, comment out the above line and uncomment the lines below
+    #user_story_text = """
+    #As a Quality Assurance Engineer,
+    #I want to verify the login and logout functionality of the application across multiple browsers and user accounts,
+    #So that I can ensure consistent user access control, security, and cross-browser compatibility.
+    #
+    #Acceptance Criteria:
+    #1. Cross-Browser Testing: Validate login/logout flow on Chromium, Firefox, and WebKit browsers.
+    #2. Multi-User Credential Validation: Test all configured users (valid and invalid credentials) in Config.USERS.
+    #3. Post-Login Redirection: After successful login, users must be redirected to the dashboard.
+    #4. Logout Functionality: Logout must redirect users to the login page (Config.BASE_URL).
+    #
+    #Scenarios Covered:
+    #1. Successful Login & Logout Flow: Navigate to the login page. Enter valid credentials. Confirm redirection to the dashboard. Log out and verify redirection to the login page.
+    #2. Failed Login Handling: Attempt login with invalid credentials (if applicable). Verify the user remains on the login page.
+    #"""
+
+    generate_test_plan_docx(user_story_file=user_story_file)  # Pass the file
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Searches the case store with plain text that looks like FTS5 syntax but does not parse as it.
+"""
+# pytest -s -v tests/test_case_store.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.case_store import CaseStore
+
+CASES = [
+    "**Test Case ID:** TC_LOGIN_002\n**Test Case Type:** Functional - Negative\n"
+    "**Expected Result:** Error: invalid password message is displayed.",
+    "**Test Case ID:** TC_SECURITY_001\n**Test Case Type:** Security - SQL Injection\n"
+    "**Steps:** Enter \"' OR 1=1 --\" as the SQL username.",
+]
+
+
+def open_store(tmp_path):
+    store = CaseStore(str(tmp_path / "cases.db"))
+    store.add_cases(CASES, story="login.docx")
+    return store
+
+
+def test_plain_text_with_fts_syntax_is_searched_as_words(tmp_path):
+    """Queries FTS5 rejects fall back to matching their words instead of raising."""
+    store = open_store(tmp_path)
+    try:
+        assert [row["case_id"] for row in store.search("error: invalid password")] == ["TC_LOGIN_002"]
+        assert [row["case_id"] for row in store.search('"sql')] == ["TC_SECURITY_001"]
+        assert [row["case_id"] for row in store.search("sql OR")] == ["TC_SECURITY_001"]
+        assert store.search('"') == []
+        assert store.export(str(tmp_path / "export.jsonl"), "error: invalid password") == 1
+    finally:
+        store.close()
+
+
+def test_valid_fts_syntax_is_kept(tmp_path):
+    """Column filters and boolean operators that parse are passed to FTS5 unchanged."""
+    store = open_store(tmp_path)
+    try:
+        assert [row["case_id"] for row in store.search('spec_type:security')] == ["TC_SECURITY_001"]
+        assert len(store.search("password OR sql")) == 2
+        assert store.search("password NOT error") == []
+    finally:
+        store.close()
+
+
+def test_cases_record_the_model_that_answered(tmp_path):
+    """Per-case models override the run's default model."""
+    store = CaseStore(str(tmp_path / "cases.db"))
+    try:
+        store.add_cases(CASES, story="login.docx", model="gemini-1.5-pro-latest",
+                        models={CASES[0]: "gemini-1.5-flash"})
+        models = {row["case_id"]: row["model"] for row in store.search("test")}
+        assert models == {"TC_LOGIN_002": "gemini-1.5-flash", "TC_SECURITY_001": "gemini-1.5-pro-latest"}
+    finally:
+        store.close()
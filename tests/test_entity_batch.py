@@ -0,0 +1,49 @@
+"""
+Keeps the batch question flow's stdout a clean JSON-lines stream when groups fail or the rate limit waits.
+"""
+# pytest -s -v tests/test_entity_batch.py
+import json
+import os
+import sys
+
+import spacy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.entity_batch import answer_questions
+from utils.rate_limiter import RateLimiter
+
+QUESTIONS = [
+    "What are the Apple sales in the third quarter?",
+    "What are the Apple sales in the fourth quarter?",
+    "How many Microsoft licenses were sold?",
+]
+
+
+class FailingOnMicrosoft:
+    """Answers every group except the one about Microsoft, which raises like a failed Gemini call."""
+
+    def generate_content(self, prompt):
+        if "Microsoft" in prompt:
+            raise RuntimeError("quota exceeded")
+        return type("Response", (), {"text": "Answer 1: fine\nAnswer 2: fine"})()
+
+
+def entity_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "ORG", "pattern": "Apple"},
+                                               {"label": "ORG", "pattern": "Microsoft"}])
+    return nlp
+
+
+def test_stdout_stays_json_lines(capsys):
+    """Errors and rate-limit waits go to stderr, so every stdout line parses as JSON."""
+    rate_limiter = RateLimiter(1, window=0.05)  # Forces a short wait before the second group
+    stats = answer_questions(entity_nlp(), FailingOnMicrosoft(), QUESTIONS, sys.stdout, rate_limiter=rate_limiter)
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    answers = [json.loads(line) for line in lines]
+    assert stats["llm_calls"] == 2
+    assert [answer["question"] for answer in answers] == QUESTIONS
+    assert answers[2]["answer"] is None
+    assert "Error answering 1 questions" in captured.err
+    assert "Rate limit reached" in captured.err
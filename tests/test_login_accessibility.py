@@ -0,0 +1,95 @@
+"""
+Executes the four "Accessibility" (WCAG 2.1) specs with an offline static analyzer.
+
+The login and dashboard pages of the bundled stand-in app (or saved HTML snapshots and URLs
+given on the command line) are checked for text alternatives, labels, heading order, keyboard
+focus and tab order, page title and language, accessible names and the contrast of every text
+element.
+"""
+# pytest -s -v tests/test_login_accessibility.py
+# python tests/test_login_accessibility.py snapshots/*.html --processes 4
+import argparse
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.accessibility import analyze_html, analyze_pages, evaluate_accessibility_specs, print_accessibility_report
+from utils.login_app import INVALID_USER, USERS, running_login_app
+
+# A login page with one known defect per rule: low contrast, unlabelled field, image without alt, h1 -> h3
+BROKEN_LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><title>Broken login</title></head>
+<body>
+  <h1>Sign in</h1>
+  <img src="logo.png">
+  <h3>Account details</h3>
+  <p style="color: #aaaaaa; background-color: #ffffff">Forgot your password?</p>
+  <form method="post" action="/login">
+    <label for="username">Username</label>
+    <input id="username" name="username" type="text">
+    <input id="password" name="password" type="password">
+    <button type="submit">Log in</button>
+  </form>
+</body>
+</html>
+"""
+
+
+def fetch_login_pages(base_url):
+    """Fetches the login page, the login page with an error and the dashboard: [(name, html)]."""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    pages = [("login", opener.open(f"{base_url}/login").read().decode("utf-8"))]
+    try:
+        invalid = urllib.parse.urlencode(dict(zip(("username", "password"), INVALID_USER))).encode()
+        opener.open(f"{base_url}/login", invalid)
+    except urllib.error.HTTPError as e:
+        pages.append(("login error", e.read().decode("utf-8")))
+    username, password = next(iter(USERS.items()))
+    response = opener.open(f"{base_url}/login", urllib.parse.urlencode({"username": username, "password": password}).encode())
+    pages.append(("dashboard", response.read().decode("utf-8")))
+    return pages
+
+
+def run_accessibility_specs(results):
+    """Prints the report and returns [(spec type, passed, issues)]."""
+    print_accessibility_report(results)
+    return [(spec_type, not issues, issues) for spec_type, issues in evaluate_accessibility_specs(results).items()]
+
+
+def test_login_accessibility_specs():
+    """The stand-in app's pages meet the accessibility specs."""
+    with running_login_app() as app:
+        pages = fetch_login_pages(app.base_url)
+    assert len(pages) == 3
+    results = [analyze_html(page, name) for name, page in pages]
+    failures = [(spec_type, issues) for spec_type, passed, issues in run_accessibility_specs(results) if not passed]
+    assert not failures, f"Accessibility spec(s) failed: {failures}"
+
+
+def test_broken_page_reports_expected_rules():
+    """Each defect in the broken fixture is reported under its rule, and nothing else is."""
+    issues = analyze_html(BROKEN_LOGIN_PAGE, "broken login")["issues"]
+    rules = {(issue["rule"], issue["criterion"], issue["element"]) for issue in issues}
+    assert rules == {
+        ("color-contrast", "1.4.3", "p"),
+        ("label", "1.3.1", "input#password"),
+        ("image-alt", "1.1.1", "img"),
+        ("heading-order", "1.3.1", "h3"),
+    }, issues
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the accessibility specs with an offline WCAG analyzer.")
+    parser.add_argument("pages", nargs="*", help="Saved HTML snapshots or URLs (default: the bundled stand-in app)")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes for large page sets")
+    args = parser.parse_args()
+    if args.pages:
+        run_accessibility_specs(analyze_pages(args.pages, args.processes))
+    else:
+        with running_login_app() as app:
+            run_accessibility_specs([analyze_html(page, name) for name, page in fetch_login_pages(app.base_url)])
@@ -0,0 +1,109 @@
+"""
+Executes the "Performance - Response Time" and "Performance - Concurrent Users" specs.
+
+An asyncio load generator drives the bundled stand-in login app (or any app given with --url)
+with ramped-up virtual users over pooled keep-alive connections, then checks the latency
+percentiles against each spec's expected result.
+"""
+# pytest -s -v tests/test_login_performance.py
+# python tests/test_login_performance.py --users 10 50 100 --duration 30
+import argparse
+import asyncio
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.load_generator import (MAX_CONSECUTIVE_FAILURES, HttpConnectionPool, evaluate_performance_spec,
+                                  print_stage, run_load)
+from utils.login_app import running_login_app
+from utils.test_case_specs import LOGIN_TEST_CASE_SPECS
+
+PERFORMANCE_SPECS = [spec for spec in LOGIN_TEST_CASE_SPECS if spec["type"].startswith("Performance")]
+
+
+def run_performance_specs(base_url, concurrency_levels=(10, 50), duration=5.0, ramp_up=1.0):
+    """Evaluates every performance spec against base_url and returns [(spec, passed, reason)]."""
+    results = []
+    for spec in PERFORMANCE_SPECS:
+        print(f"\n{spec['type']}: {spec['description']}")
+        passed, stages, reason = evaluate_performance_spec(spec, base_url, concurrency_levels, duration, ramp_up)
+        for stage in stages:
+            print_stage(stage)
+        print(f"{'PASS' if passed else 'FAIL'}: {reason}")
+        results.append((spec, passed, reason))
+    return results
+
+
+def test_login_performance_specs():
+    """The stand-in login app meets the response time and concurrent user specs."""
+    with running_login_app() as app:
+        results = run_performance_specs(app.base_url, duration=2.0, ramp_up=0.5)
+    failures = [(spec["type"], reason) for spec, passed, reason in results if not passed]
+    assert not failures, f"Performance spec(s) failed: {failures}"
+
+
+
+def test_rejected_logins_count_once_per_attempt():
+    """Every attempt is rejected, so the error rate is 100% rather than half."""
+    with running_login_app() as app:
+        stage = run_load(app.base_url, concurrency=2, duration=0.5, ramp_up=0, users={"nobody": "wrong"})
+    assert stage["requests"] > 0 and stage["failures"] == 0
+    assert stage["rejected"] == stage["requests"]
+    assert stage["error_rate"] == 1.0
+
+
+def test_refused_port_stops_virtual_users():
+    """Users back off after failed connections and give up instead of spinning until the deadline."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    stage = run_load(f"http://127.0.0.1:{port}", concurrency=2, duration=5.0, ramp_up=0)
+    assert stage["failures"] == 2 * MAX_CONSECUTIVE_FAILURES
+    assert stage["error_rate"] == 1.0
+    assert stage["duration"] < 5.0
+
+
+def test_chunked_responses_keep_the_connection_in_sync():
+    """Two chunked responses on one keep-alive connection are read whole and in order."""
+    async def handle(reader, writer):
+        for body in (b"first", b"second body"):
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass  # The requests carry no body
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for chunk in (body[:3], body[3:]):
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        writer.close()
+
+    async def fetch_twice():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        pool = HttpConnectionPool(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", size=1)
+        async with server:
+            bodies = [(await pool.request("GET", "/"))[2] for _ in range(2)]
+            await pool.close()
+        return bodies, pool.connections_opened
+
+    assert asyncio.run(fetch_twice()) == ([b"first", b"second body"], 1)
+
+
+def test_unsupported_urls_are_rejected():
+    with pytest.raises(ValueError):
+        HttpConnectionPool("ftp://example.com/login")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the performance specs with a built-in load generator.")
+    parser.add_argument("--url", help="Base URL of the app under test (default: the bundled stand-in app)")
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 50], help="Concurrency levels to test")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per load stage")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="Seconds to start all virtual users")
+    args = parser.parse_args()
+    if args.url:
+        run_performance_specs(args.url, args.users, args.duration, args.ramp_up)
+    else:
+        with running_login_app() as app:
+            run_performance_specs(app.base_url, args.users, args.duration, args.ramp_up)
@@ -0,0 +1,67 @@
+"""
+Executes the "Security - SQL Injection" and "Security - Brute Force" specs.
+
+An async fuzzer sends an SQL injection payload corpus and credential-stuffing sequences to the
+bundled stand-in login app (or any app given with --url) over pooled keep-alive connections,
+flags anomalous responses and checks that lockout or rate limiting kicks in.
+"""
+# pytest -s -v tests/test_login_security.py
+# python tests/test_login_security.py --payloads 20000 --concurrency 300 --report documents/security_report.json
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.login_app import running_login_app
+from utils.security_fuzzer import evaluate_security_spec, generate_payloads, print_security_report, save_security_report
+from utils.test_case_specs import LOGIN_TEST_CASE_SPECS
+
+SECURITY_SPECS = [spec for spec in LOGIN_TEST_CASE_SPECS
+                  if spec["type"] in ("Security - SQL Injection", "Security - Brute Force")]
+
+
+def run_security_specs(base_url, payloads=2000, concurrency=100, attempts=30):
+    """Fuzzes the app for every security spec and returns the reports."""
+    reports = []
+    for spec in SECURITY_SPECS:
+        if spec["type"] == "Security - SQL Injection":
+            report = evaluate_security_spec(spec, base_url, payloads=generate_payloads(payloads),
+                                            concurrency=concurrency)
+        else:
+            report = evaluate_security_spec(spec, base_url, attempts=attempts, concurrency=min(concurrency, 10))
+        print_security_report(report)
+        reports.append(report)
+    return reports
+
+
+def test_login_security_specs():
+    """The stand-in login app rejects the injection corpus and locks out brute-force attempts."""
+    with running_login_app() as app:
+        reports = run_security_specs(app.base_url)
+    failures = [(report["spec"]["type"], report["reason"]) for report in reports if not report["passed"]]
+    assert not failures, f"Security spec(s) failed: {failures}"
+
+
+def test_brute_force_without_protection_fails():
+    """Without lockout or rate limiting, the brute force spec is reported as failed."""
+    spec = next(spec for spec in SECURITY_SPECS if spec["type"] == "Security - Brute Force")
+    with running_login_app(max_failed_attempts=10 ** 6) as app:
+        report = evaluate_security_spec(spec, app.base_url, attempts=20)
+    assert not report["passed"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the security specs with a concurrent payload fuzzer.")
+    parser.add_argument("--url", help="Base URL of the app under test (default: the bundled stand-in app)")
+    parser.add_argument("--payloads", type=int, default=10000, help="Injection payloads to send")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent workers")
+    parser.add_argument("--attempts", type=int, default=50, help="Failed logins in the brute-force sequence")
+    parser.add_argument("--report", help="Save the reports as JSON to this path")
+    args = parser.parse_args()
+    if args.url:
+        reports = run_security_specs(args.url, args.payloads, args.concurrency, args.attempts)
+    else:
+        with running_login_app() as app:
+            reports = run_security_specs(app.base_url, args.payloads, args.concurrency, args.attempts)
+    if args.report:
+        save_security_report(reports, args.report)
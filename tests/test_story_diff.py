@@ -0,0 +1,53 @@
+"""
+Checks that editing one paragraph of the bundled user story only invalidates the specs that depend on it.
+"""
+# pytest -s -v tests/test_story_diff.py
+import os
+import sys
+
+import docx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Make the project root importable
+from utils.story_diff import StoryManifest, fingerprint, plan_regeneration
+from utils.test_case_specs import LOGIN_TEST_CASE_SPECS
+
+STORY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "Login and Logout Functionality Validation Across Multiple Browsers.docx")
+EDITED_PARAGRAPH = "Capture a failure screenshot."
+
+
+def read_story():
+    document = docx.Document(STORY_PATH)
+    return "\n".join(paragraph.text for paragraph in document.paragraphs if paragraph.text.strip())
+
+
+def generated_manifest(tmp_path, story):
+    """A manifest as left by a full run over `story`."""
+    manifest = StoryManifest(str(tmp_path / "manifest.json"))
+    plan, paragraphs, _ = plan_regeneration(story, LOGIN_TEST_CASE_SPECS, manifest)
+    for item in plan:
+        manifest.update(item["key"], item["deps"], f"Test case for {item['spec']['description']}")
+    manifest.save(paragraphs)
+    return manifest, plan
+
+
+def test_unchanged_story_regenerates_nothing(tmp_path):
+    story = read_story()
+    manifest, _ = generated_manifest(tmp_path, story)
+    plan, _, changed = plan_regeneration(story, LOGIN_TEST_CASE_SPECS, manifest)
+    assert changed == 0
+    assert not any(item["stale"] for item in plan)
+
+
+def test_single_paragraph_edit_invalidates_only_its_dependents(tmp_path):
+    story = read_story()
+    assert EDITED_PARAGRAPH in story.splitlines()
+    manifest, before = generated_manifest(tmp_path, story)
+    dependents = {item["key"] for item in before if fingerprint(EDITED_PARAGRAPH) in item["deps"]}
+
+    edited = story.replace(EDITED_PARAGRAPH, "Capture a failure screenshot and keep it with the run's logs.")
+    plan, _, changed = plan_regeneration(edited, LOGIN_TEST_CASE_SPECS, manifest)
+    stale = {item["key"] for item in plan if item["stale"]}
+    assert changed == 2  # The old paragraph went away and the new one appeared
+    assert stale == dependents
+    assert 0 < len(stale) <= len(LOGIN_TEST_CASE_SPECS) // 3
@@ -0,0 +1,357 @@
+"""
+Offline static accessibility checks for HTML pages (WCAG 2.1 level A/AA subset).
+
+Pages are parsed with lxml and checked for:
+
+    1.1.1  Non-text content       images, image inputs and image maps need a text alternative
+    1.3.1  Info and relationships form controls need an associated label; heading levels
+                                  only go down one step at a time
+    1.4.3  Contrast (minimum)     every text element's color against its background, 4.5:1
+                                  (3:1 for large text), computed for all elements at once
+    2.1.1  Keyboard               click handlers only on focusable elements
+    2.4.2  Page titled            a non-empty <title>
+    2.4.3  Focus order            no positive tabindex; interactive elements not removed from it
+    3.1.1  Language of page       <html lang>
+    4.1.2  Name, role, value      buttons and links need an accessible name
+
+Colors come from inline styles and simple <style> rules (type, .class, #id and compound
+selectors), inherited down the tree.  Large page sets are analyzed across a process pool.
+"""
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.request import urlopen
+
+import numpy as np
+from lxml import html as lxml_html
+
+WCAG_TITLES = {
+    "1.1.1": "Non-text Content",
+    "1.3.1": "Info and Relationships",
+    "1.4.3": "Contrast (Minimum)",
+    "2.1.1": "Keyboard",
+    "2.4.2": "Page Titled",
+    "2.4.3": "Focus Order",
+    "3.1.1": "Language of Page",
+    "4.1.2": "Name, Role, Value",
+}
+
+# Which checks back each accessibility spec from utils.test_case_specs
+SPEC_CRITERIA = {
+    "Accessibility - Perceivable": ["1.1.1", "1.3.1"],
+    "Accessibility - Operable": ["2.1.1", "2.4.2", "2.4.3"],
+    "Accessibility - Understandable": ["1.4.3", "3.1.1"],
+    "Accessibility - Robust": ["4.1.2"],
+}
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+    "blue": (0, 0, 255), "yellow": (255, 255, 0), "gray": (128, 128, 128), "grey": (128, 128, 128),
+    "silver": (192, 192, 192), "maroon": (128, 0, 0), "navy": (0, 0, 128), "orange": (255, 165, 0),
+    "purple": (128, 0, 128), "teal": (0, 128, 128), "lightgray": (211, 211, 211), "lightgrey": (211, 211, 211),
+    "darkgray": (169, 169, 169), "darkgrey": (169, 169, 169),
+}
+DEFAULT_STYLE = {"color": (0, 0, 0), "background-color": (255, 255, 255), "font-size": 16.0, "font-weight": 400}
+INHERITED = ("color", "font-size", "font-weight")
+
+FOCUSABLE_TAGS = {"button", "select", "textarea", "summary"}
+LABELABLE_INPUT_TYPES_EXCLUDED = {"hidden", "submit", "button", "reset", "image"}
+SKIPPED_TAGS = {"script", "style", "head", "title", "meta", "link", "noscript", "template"}
+
+
+def parse_color(value):
+    value = value.strip().lower()
+    if value in NAMED_COLORS:
+        return NAMED_COLORS[value]
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) in (3, 4):
+            return tuple(int(digit * 2, 16) for digit in digits[:3])
+        if len(digits) in (6, 8):
+            return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+    match = re.match(r"rgba?\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)", value)
+    if match:
+        return tuple(min(255, int(float(channel))) for channel in match.groups())
+    return None  # transparent, inherit, currentColor, gradients...
+
+
+def parse_declarations(text):
+    declarations = {}
+    for part in text.split(";"):
+        name, _, value = part.partition(":")
+        name, value = name.strip().lower(), value.replace("!important", "").strip()
+        if not name or not value:
+            continue
+        if name in ("color", "background-color", "background"):
+            color = parse_color(value.split()[0] if name == "background" else value)
+            if color is not None:
+                declarations["background-color" if name == "background" else name] = color
+        elif name == "font-size":
+            match = re.match(r"([\d.]+)\s*(px|pt|em|rem)?", value)
+            if match:
+                size = float(match.group(1))
+                unit = match.group(2) or "px"
+                declarations[name] = size * {"px": 1.0, "pt": 4 / 3, "em": 16.0, "rem": 16.0}[unit]
+        elif name == "font-weight":
+            declarations[name] = 700 if value == "bold" else (int(value) if value.isdigit() else 400)
+    return declarations
+
+
+def parse_stylesheet(css):
+    """Returns [(specificity, order, (tag, id, classes), declarations)] for simple selectors."""
+    rules = []
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    for order, (selectors, body) in enumerate(re.findall(r"([^{}]+)\{([^{}]*)\}", css)):
+        declarations = parse_declarations(body)
+        if not declarations:
+            continue
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            # Only the last compound of descendant selectors is matched (a deliberate approximation)
+            compound = selector.split()[-1] if selector else ""
+            match = re.fullmatch(r"([a-zA-Z][\w-]*|\*)?((?:[#.][\w-]+)*)", compound)
+            if not match:
+                continue
+            tag = match.group(1) if match.group(1) and match.group(1) != "*" else None
+            ids = re.findall(r"#([\w-]+)", match.group(2))
+            classes = set(re.findall(r"\.([\w-]+)", match.group(2)))
+            specificity = (len(ids), len(classes), 1 if tag else 0)
+            rules.append((specificity, order, (tag, ids[0] if ids else None, classes), declarations))
+    rules.sort(key=lambda rule: (rule[0], rule[1]))
+    return rules
+
+
+def _matches(element, selector):
+    tag, element_id, classes = selector
+    if tag and element.tag != tag.lower():
+        return False
+    if element_id and element.get("id") != element_id:
+        return False
+    return not classes or classes <= set((element.get("class") or "").split())
+
+
+def _describe(element):
+    description = element.tag
+    if element.get("id"):
+        description += f"#{element.get('id')}"
+    elif element.get("class"):
+        description += "." + ".".join(element.get("class").split())
+    return description
+
+
+def _own_text(element):
+    return " ".join(((element.text or "") + "".join(child.tail or "" for child in element)).split())
+
+
+def _accessible_name(element, root):
+    if element.get("aria-label", "").strip():
+        return element.get("aria-label").strip()
+    labelledby = element.get("aria-labelledby")
+    if labelledby:
+        names = [" ".join(node.text_content().split()) for node_id in labelledby.split()
+                 for node in root.xpath("//*[@id=$id]", id=node_id)]
+        if any(names):
+            return " ".join(names)
+    text = " ".join(element.text_content().split())
+    if text:
+        return text
+    alts = [img.get("alt", "").strip() for img in element.iter("img")]
+    if any(alts):
+        return " ".join(alts)
+    return (element.get("value") or element.get("title") or "").strip()
+
+
+def contrast_ratios(foreground, background):
+    """WCAG contrast ratios for arrays of sRGB colors shaped (n, 3)."""
+    def luminance(colors):
+        channels = np.asarray(colors, dtype=np.float64) / 255.0
+        linear = np.where(channels <= 0.03928, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+        return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+    fg, bg = luminance(foreground), luminance(background)
+    return (np.maximum(fg, bg) + 0.05) / (np.minimum(fg, bg) + 0.05)
+
+
+def _issue(criterion, rule, element, message):
+    return {"criterion": criterion, "title": WCAG_TITLES[criterion], "rule": rule, "element": _describe(element),
+            "message": message}
+
+
+def analyze_html(page, source=None):
+    """Runs every check on one HTML page and returns its issues, tab order and timing."""
+    start = time.perf_counter()
+    root = lxml_html.document_fromstring(page)
+    issues = []
+
+    rules = []
+    for style in root.iter("style"):
+        rules.extend(parse_stylesheet(style.text or ""))
+    rules.sort(key=lambda rule: (rule[0], rule[1]))
+
+    # Computed styles, inherited down the tree
+    computed = {}
+    text_elements = []
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        parent = element.getparent()
+        inherited = computed.get(parent, DEFAULT_STYLE)
+        style = {name: inherited[name] for name in INHERITED}
+        style["background-color"] = inherited["background-color"]  # Backgrounds show through
+        for _, _, selector, declarations in rules:
+            if _matches(element, selector):
+                style.update(declarations)
+        if element.get("style"):
+            style.update(parse_declarations(element.get("style")))
+        computed[element] = style
+        if element.tag not in SKIPPED_TAGS and _own_text(element) and not _hidden(element):
+            text_elements.append(element)
+
+    # 1.4.3 Contrast for every text element in one vectorized pass
+    if text_elements:
+        foreground = [computed[element]["color"] for element in text_elements]
+        background = [computed[element]["background-color"] for element in text_elements]
+        ratios = contrast_ratios(foreground, background)
+        sizes = np.array([computed[element]["font-size"] for element in text_elements])
+        bold = np.array([computed[element]["font-weight"] >= 700 for element in text_elements])
+        large = (sizes >= 24) | (bold & (sizes >= 18.66))
+        required = np.where(large, 3.0, 4.5)
+        for index in np.flatnonzero(ratios < required):
+            element = text_elements[index]
+            issues.append(_issue("1.4.3", "color-contrast", element,
+                                 f"Contrast {ratios[index]:.2f}:1 is below {required[index]}:1 "
+                                 f"for '{_own_text(element)[:40]}'"))
+
+    # 1.1.1 Text alternatives
+    for element in root.iter("img", "area"):
+        if element.get("alt") is None and element.get("role") != "presentation":
+            issues.append(_issue("1.1.1", "image-alt", element,
+                                 f"Missing alt attribute ({element.get('src', 'no src')})"))
+    for element in root.xpath("//input[@type='image']"):
+        if not _accessible_name(element, root) and not element.get("alt", "").strip():
+            issues.append(_issue("1.1.1", "input-image-alt", element, "Image button has no text alternative"))
+    for element in root.xpath("//svg[@role='img']"):
+        if not element.get("aria-label") and not element.xpath("./title"):
+            issues.append(_issue("1.1.1", "svg-img-alt", element, "SVG image has no title or aria-label"))
+
+    # 1.3.1 Labels for form controls
+    label_targets = {label.get("for") for label in root.iter("label") if label.get("for")}
+    for element in root.iter("input", "select", "textarea"):
+        if element.tag == "input" and (element.get("type") or "text").lower() in LABELABLE_INPUT_TYPES_EXCLUDED:
+            continue
+        labelled = (element.get("id") in label_targets
+                    or any(ancestor.tag == "label" for ancestor in element.iterancestors())
+                    or element.get("aria-label", "").strip() or element.get("aria-labelledby")
+                    or element.get("title", "").strip())
+        if not labelled:
+            issues.append(_issue("1.3.1", "label", element, "Form control has no associated label"))
+
+    # 1.3.1 Heading levels may not skip (h2 straight to h4)
+    previous_level = None
+    for element in root.iter("h1", "h2", "h3", "h4", "h5", "h6"):
+        level = int(element.tag[1])
+        if previous_level is not None and level > previous_level + 1:
+            issues.append(_issue("1.3.1", "heading-order", element,
+                                 f"Heading level jumps from h{previous_level} to h{level}"))
+        previous_level = level
+
+    # 2.1.1 Keyboard and 2.4.3 Focus order
+    tab_order = []
+    for position, element in enumerate(root.iter()):
+        if not isinstance(element.tag, str):
+            continue
+        tabindex = element.get("tabindex")
+        index = int(tabindex) if tabindex and re.fullmatch(r"-?\d+", tabindex.strip()) else None
+        natively_focusable = (element.tag in FOCUSABLE_TAGS
+                              or (element.tag == "a" and element.get("href") is not None)
+                              or (element.tag == "input" and (element.get("type") or "").lower() != "hidden"))
+        if element.get("disabled") is not None:
+            continue
+        if element.get("onclick") is not None and not natively_focusable and (index is None or index < 0):
+            issues.append(_issue("2.1.1", "keyboard", element,
+                                 "Click handler on an element that cannot receive keyboard focus"))
+        if index is not None and index > 0:
+            issues.append(_issue("2.4.3", "tabindex", element,
+                                 f"Positive tabindex={index} overrides the document focus order"))
+        if natively_focusable and index is not None and index < 0:
+            issues.append(_issue("2.4.3", "focus-order", element,
+                                 "Interactive element removed from the tab order (tabindex=-1)"))
+        if (natively_focusable and (index is None or index >= 0)) or (index is not None and index >= 0):
+            tab_order.append((index if index and index > 0 else 0, position, _describe(element)))
+    tab_order = [description for _, _, description in
+                 sorted(tab_order, key=lambda item: (item[0] == 0, item[0], item[1]))]
+
+    # 2.4.2 Page title, 3.1.1 Language
+    title = root.find(".//title")
+    if title is None or not (title.text or "").strip():
+        issues.append(_issue("2.4.2", "document-title", root, "Page has no title"))
+    if not (root.get("lang") or "").strip():
+        issues.append(_issue("3.1.1", "html-has-lang", root, "The html element has no lang attribute"))
+
+    # 4.1.2 Accessible names
+    for element in root.xpath("//button | //a[@href] | //input[@type='submit' or @type='button' or @type='reset']"):
+        if not _accessible_name(element, root):
+            issues.append(_issue("4.1.2", "control-name", element, "Control has no accessible name"))
+
+    return {
+        "source": source,
+        "issues": issues,
+        "tab_order": tab_order,
+        "text_elements": len(text_elements),
+        "milliseconds": (time.perf_counter() - start) * 1000,
+    }
+
+
+def _hidden(element):
+    for node in [element, *element.iterancestors()]:
+        if node.get("hidden") is not None or node.get("aria-hidden") == "true":
+            return True
+        if re.search(r"display\s*:\s*none|visibility\s*:\s*hidden", node.get("style") or ""):
+            return True
+    return False
+
+
+def analyze_source(source):
+    """Analyzes a saved HTML file or a URL."""
+    if re.match(r"https?://", source):
+        with urlopen(source, timeout=30) as response:
+            page = response.read().decode(response.headers.get_content_charset() or "utf-8", errors="replace")
+    else:
+        with open(source, encoding="utf-8", errors="replace") as file:
+            page = file.read()
+    return analyze_html(page, source)
+
+
+def analyze_pages(sources, processes=None, chunksize=8):
+    """Analyzes many pages across a process pool and prints pages per second."""
+    sources = list(sources)
+    start = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(sources) < 2:
+        results = [analyze_source(source) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(analyze_source, sources, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {len(results)} pages in {elapsed:.2f} seconds "
+          f"({len(results) / elapsed if elapsed else 0:.0f} pages/s, {processes} processes)")
+    return results
+
+
+def evaluate_accessibility_specs(results):
+    """Maps page results to the accessibility specs: {spec type: [issues]} (empty means passed)."""
+    return {spec_type: [dict(issue, source=result["source"]) for result in results for issue in result["issues"]
+                        if issue["criterion"] in criteria]
+            for spec_type, criteria in SPEC_CRITERIA.items()}
+
+
+def print_accessibility_report(results):
+    for result in results:
+        print(f"{result['source']}: {len(result['issues'])} issue(s), {result['text_elements']} text elements, "
+              f"{result['milliseconds']:.1f} ms")
+        for issue in result["issues"]:
+            print(f"  WCAG {issue['criterion']} {issue['title']} [{issue['rule']}]: {issue['element']} - "
+                  f"{issue['message']}")
+    for spec_type, issues in evaluate_accessibility_specs(results).items():
+        print(f"{'PASS' if not issues else 'FAIL'}: {spec_type} ({len(issues)} issue(s))")
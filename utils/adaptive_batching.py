@@ -0,0 +1,110 @@
+"""
+Runtime sizing of the spec batch loop.
+
+The controller follows an additive-increase / multiplicative-decrease policy: while batches
+complete without 429 responses and latency stays near its running baseline, the batch size
+and concurrency grow by one; as soon as throttling appears they are halved.  Concurrency is
+never allowed above the per-minute request budget, and batches shrink to fit the remaining
+daily quota so a run stops cleanly instead of failing mid-batch.
+"""
+import logging
+import statistics
+import threading
+
+
+class AdaptiveBatchController:
+    """Chooses the next batch size and concurrency from observed latency, 429s and quota."""
+
+    def __init__(self, rate_limiter=None, daily_quota=None, batch_size=2, concurrency=1,
+                 max_batch_size=16, max_concurrency=8, latency_tolerance=1.5):
+        self.rate_limiter = rate_limiter
+        self.daily_quota = daily_quota
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.baseline_latency = None
+        self.requests_made = 0
+        self.history = []
+        self._latencies = []
+        self._throttled = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, throttled=False):
+        """Records the outcome of one LLM request made during the current batch."""
+        with self._lock:
+            self.requests_made += 1
+            if throttled:
+                self._throttled += 1
+            else:
+                self._latencies.append(latency)
+
+    def remaining_quota(self):
+        if self.daily_quota is None:
+            return None
+        return max(0, self.daily_quota - self.requests_made)
+
+    def _concurrency_cap(self):
+        cap = min(self.max_concurrency, self.batch_size)
+        if self.rate_limiter is not None:
+            cap = min(cap, self.rate_limiter.requests_per_minute)
+        return max(1, cap)
+
+    def next_batch_size(self, remaining_specs):
+        """Returns how many specs the next batch should hold; 0 once the quota is spent."""
+        size = min(self.batch_size, remaining_specs)
+        quota = self.remaining_quota()
+        if quota is not None:
+            size = min(size, quota)
+        return size
+
+    def end_batch(self, specs_done, elapsed, failed=0):
+        """
+        Adjusts batch size and concurrency after a batch finishes with `specs_done` specs
+        generated and `failed` specs lost.  A batch with failures never grows the limits or
+        moves the latency baseline.
+        """
+        with self._lock:
+            latencies, throttled = self._latencies, self._throttled
+            self._latencies, self._throttled = [], 0
+
+        median_latency = statistics.median(latencies) if latencies else None
+        if throttled:
+            action = "back off"
+            self.batch_size = max(1, self.batch_size // 2)
+            self.concurrency = max(1, self.concurrency // 2)
+        elif failed:
+            action = "hold"
+            self.concurrency = max(1, self.concurrency - 1)
+        elif (median_latency is not None and self.baseline_latency is not None
+              and median_latency > self.baseline_latency * self.latency_tolerance):
+            action = "hold"
+            self.concurrency = max(1, self.concurrency - 1)
+        else:
+            action = "grow"
+            self.batch_size = min(self.max_batch_size, self.batch_size + 1)
+            self.concurrency = min(self._concurrency_cap(), self.concurrency + 1)
+
+        if median_latency is not None and not throttled and not failed:
+            # Exponentially weighted baseline so one slow batch does not reset it
+            if self.baseline_latency is None:
+                self.baseline_latency = median_latency
+            else:
+                self.baseline_latency = 0.8 * self.baseline_latency + 0.2 * median_latency
+
+        entry = {
+            "specs": specs_done,
+            "failed": failed,
+            "elapsed": elapsed,
+            "throughput": specs_done / elapsed if elapsed > 0 else None,
+            "median_latency": median_latency,
+            "throttled": throttled,
+            "action": action,
+            "next_batch_size": self.batch_size,
+            "next_concurrency": self.concurrency,
+            "remaining_quota": self.remaining_quota(),
+        }
+        self.history.append(entry)
+        logging.info(f"Adaptive batching: {entry}")
+        return entry
@@ -0,0 +1,209 @@
+"""
+Searchable store of every generated test case across runs.
+
+Cases are kept in a local SQLite database with their metadata (story, spec type, test case
+ID, model, source file, timestamp) and an FTS5 full-text index kept in sync by triggers.
+Search is ranked with BM25 and can be filtered by any metadata column; export streams the
+matching rows, so neither needs the whole store in memory.
+
+Ingestion is incremental: a case is keyed by a hash of its story and text, so re-ingesting an
+output file only adds the cases that are new, and files whose size and modification time are
+unchanged since the last ingest are skipped without being read.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from utils.section_repair import parse_sections
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY,
+    case_key TEXT UNIQUE NOT NULL,
+    story TEXT,
+    spec_type TEXT,
+    case_id TEXT,
+    model TEXT,
+    source TEXT,
+    created REAL NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cases_by_type ON cases (spec_type);
+CREATE INDEX IF NOT EXISTS cases_by_story ON cases (story);
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5 (
+    content, spec_type, case_id, content='cases', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS cases_ai AFTER INSERT ON cases BEGIN
+    INSERT INTO cases_fts (rowid, content, spec_type, case_id) VALUES (new.id, new.content, new.spec_type, new.case_id);
+END;
+CREATE TRIGGER IF NOT EXISTS cases_ad AFTER DELETE ON cases BEGIN
+    INSERT INTO cases_fts (cases_fts, rowid, content, spec_type, case_id)
+    VALUES ('delete', old.id, old.content, old.spec_type, old.case_id);
+END;
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    cases INTEGER NOT NULL
+);
+"""
+
+FILTER_COLUMNS = ("story", "spec_type", "case_id", "model", "source")
+
+_SEPARATOR_LINE = re.compile(r"^-{20,}\s*$", re.MULTILINE)
+_CASE_NUMBER_HEADING = re.compile(r"^\s*#*\s*Test Case \d+\s*$", re.MULTILINE)
+_CASE_ID_HEADING = re.compile(r"^[\s#*|]*Test Case ID\b", re.MULTILINE | re.IGNORECASE)
+_FTS_SYNTAX = re.compile(r'"|\*|\b(?:AND|OR|NOT|NEAR)\b|\w+:')
+
+
+def split_test_cases(text):
+    """Splits a generated output file into individual test case texts."""
+    cases = []
+    for chunk in _SEPARATOR_LINE.split(text):
+        chunk = _CASE_NUMBER_HEADING.sub("", chunk).strip()
+        if not chunk:
+            continue
+        # Files written straight from one model response hold several cases without separators
+        starts = [match.start() for match in _CASE_ID_HEADING.finditer(chunk)]
+        if len(starts) > 1:
+            bounds = [0] + starts[1:] + [len(chunk)]
+            cases.extend(chunk[start:end].strip() for start, end in zip(bounds, bounds[1:]))
+        else:
+            cases.append(chunk)
+    return [case for case in cases if case]
+
+
+def plain_fts_query(text):
+    """Matches every word of the text, ignoring any FTS5 syntax in it."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def fts_query(text):
+    """Passes FTS5 syntax through; otherwise matches every word of plain text like "SQL-injection login"."""
+    if _FTS_SYNTAX.search(text):
+        return text
+    return plain_fts_query(text)
+
+
+class CaseStore:
+    """SQLite store of generated test cases with an FTS5 index."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")  # Local file: readers are not blocked while ingesting
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def add_cases(self, test_cases, story=None, model=None, source=None, spec_type=None, created=None, models=None):
+        """
+        Adds test case texts in one transaction and returns how many were new.  `models` maps
+        case texts to the model that generated each one; other cases are recorded under `model`.
+        """
+        created = created or time.time()
+        rows = []
+        for content in test_cases:
+            sections = parse_sections(content)
+            case_type = spec_type or (sections["Test Case Type"][2].splitlines()[0].strip(" *")
+                                      if "Test Case Type" in sections else None)
+            case_id = sections["Test Case ID"][2].splitlines()[0].strip(" *") if "Test Case ID" in sections else None
+            key = hashlib.sha1(f"{story}\0{content}".encode("utf-8")).hexdigest()
+            case_model = (models or {}).get(content.strip(), model)
+            rows.append((key, story, case_type or None, case_id or None, case_model, source, created, content))
+        with self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO cases (case_key, story, spec_type, case_id, model, source, created, content) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            return max(cursor.rowcount, 0)
+
+    def ingest_file(self, path, story=None, model=None, models=None):
+        """Ingests an output file unless it is unchanged since the last ingest; returns the new case count."""
+        stat = os.stat(path)
+        source = os.path.abspath(path)
+        seen = self._conn.execute("SELECT size, mtime FROM ingested_files WHERE path = ?", (source,)).fetchone()
+        if seen and seen["size"] == stat.st_size and seen["mtime"] == stat.st_mtime:
+            return 0
+        with open(path, encoding="utf-8", errors="replace") as file:
+            test_cases = split_test_cases(file.read())
+        added = self.add_cases(test_cases, story=story, model=model, source=source, created=stat.st_mtime,
+                               models=models)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO ingested_files (path, size, mtime, cases) VALUES (?, ?, ?, ?)",
+                               (source, stat.st_size, stat.st_mtime, len(test_cases)))
+        print(f"Indexed {added} new of {len(test_cases)} test cases from {path}")
+        return added
+
+    def match_expression(self, query):
+        """
+        The FTS5 expression for a query: the query's own syntax when FTS5 accepts it, otherwise
+        its words, so text like 'error: invalid password' or '"sql' is searched instead of failing.
+        """
+        expression = fts_query(query)
+        if expression != plain_fts_query(query):
+            try:
+                self._conn.execute("SELECT rowid FROM cases_fts WHERE cases_fts MATCH ? LIMIT 1",
+                                   (expression,)).fetchall()
+            except sqlite3.OperationalError:
+                expression = plain_fts_query(query)
+        return expression
+
+    def _select(self, columns, query=None, limit=None, **filters):
+        sql = f"SELECT {columns} FROM cases"
+        params = []
+        conditions = []
+        if query:
+            sql += " JOIN cases_fts ON cases_fts.rowid = cases.id"
+            expression = self.match_expression(query)
+            if expression:
+                conditions.append("cases_fts MATCH ?")
+                params.append(expression)
+            else:
+                conditions.append("0")  # Nothing searchable in the query, e.g. only punctuation
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Unknown filter: {column}")
+            if value is not None:
+                conditions.append(f"cases.{column} = ?")
+                params.append(value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY bm25(cases_fts)" if query else " ORDER BY cases.id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._conn.execute(sql, params)
+
+    def search(self, query, limit=20, **filters):
+        """Returns the best matching cases with a highlighted snippet, most relevant first."""
+        columns = ("cases.id, cases.story, cases.spec_type, cases.case_id, cases.model, cases.created, "
+                   "snippet(cases_fts, 0, '[', ']', ' ... ', 16) AS snippet, bm25(cases_fts) AS score")
+        return [dict(row) for row in self._select(columns, query, limit, **filters)]
+
+    def export(self, output_path, query=None, **filters):
+        """Streams the matching cases to a .jsonl file (one JSON object per case) or a text file."""
+        columns = "cases.id, cases.story, cases.spec_type, cases.case_id, cases.model, cases.created, cases.content"
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as file:
+            for row in self._select(columns, query, **filters):
+                if output_path.endswith(".jsonl"):
+                    file.write(json.dumps(dict(row)) + "\n")
+                else:
+                    file.write(f"## {row['case_id'] or 'Test Case ' + str(row['id'])} ({row['spec_type']})\n\n")
+                    file.write(row["content"] + "\n\n" + "-" * 80 + "\n\n")
+                count += 1
+        print(f"Exported {count} test cases to {output_path}")
+        return count
+
+    def counts(self):
+        """Number of stored cases per spec type."""
+        rows = self._conn.execute("SELECT COALESCE(spec_type, 'Unknown') AS spec_type, COUNT(*) AS cases "
+                                  "FROM cases GROUP BY 1 ORDER BY 2 DESC")
+        return {row["spec_type"]: row["cases"] for row in rows}
@@ -0,0 +1,143 @@
+"""
+Covering arrays for expanding spec dimensions (browser, user type, input class, locale...).
+
+`covering_array` builds a small set of configurations in which every combination of values
+for any `strength` dimensions appears at least once (all pairs for strength 2), using the
+in-parameter-order (IPOG) strategy: start from all combinations of the first dimensions, then
+add one dimension at a time, extending existing rows greedily and appending rows only for the
+combinations still uncovered.
+
+Generation then needs one LLM call per equivalence class rather than per configuration: the
+class is the values of the dimensions that change a test's behaviour (the input class), and
+the others (browser, locale, user type) are left as {placeholders} in a template that is
+filled in locally for every configuration of that class.
+"""
+import itertools
+import math
+
+
+def combination_count(dimensions):
+    """Number of configurations in the full cartesian product."""
+    return math.prod(len(values) for values in dimensions.values())
+
+
+def _tuples(sizes, strength, new):
+    """Every (dimensions, values) t-tuple that involves dimension `new` and t-1 earlier ones."""
+    for others in itertools.combinations(range(new), strength - 1):
+        dims = others + (new,)
+        for values in itertools.product(*(range(sizes[d]) for d in dims)):
+            yield dims, values
+
+
+def covering_array(dimensions, strength=2):
+    """
+    Returns configurations (dicts of dimension -> value) covering every `strength`-way
+    combination of values.  Dimensions are a dict of name -> list of values.
+    """
+    names = list(dimensions)
+    if not names:
+        return []
+    strength = max(1, min(strength, len(names)))
+    # IPOG works best with the largest dimensions first; rows are mapped back to the given order
+    order = sorted(range(len(names)), key=lambda i: -len(dimensions[names[i]]))
+    sizes = [len(dimensions[names[i]]) for i in order]
+    if 0 in sizes:
+        return []
+
+    rows = [list(values) for values in itertools.product(*(range(size) for size in sizes[:strength]))]
+    rows = [row + [None] * (len(sizes) - strength) for row in rows]
+
+    for new in range(strength, len(sizes)):
+        uncovered = set(_tuples(sizes, strength, new))
+        by_dims = {}
+        for dims, values in uncovered:
+            by_dims.setdefault(dims, set()).add(values)
+
+        # Horizontal growth: give each existing row the value covering the most new tuples
+        for row in rows:
+            best_value, best_gain = 0, -1
+            for value in range(sizes[new]):
+                gain = 0
+                for dims, remaining in by_dims.items():
+                    key = tuple(row[d] for d in dims[:-1])
+                    if None not in key and key + (value,) in remaining:
+                        gain += 1
+                if gain > best_gain:
+                    best_value, best_gain = value, gain
+            row[new] = best_value
+            for dims, remaining in by_dims.items():
+                key = tuple(row[d] for d in dims[:-1])
+                if None not in key:
+                    remaining.discard(key + (best_value,))
+
+        # Vertical growth: fit each uncovered tuple into a row with matching or free cells
+        for dims, remaining in by_dims.items():
+            for values in sorted(remaining):
+                for row in rows:
+                    if all(row[d] is None or row[d] == v for d, v in zip(dims, values)):
+                        for d, v in zip(dims, values):
+                            row[d] = v
+                        break
+                else:
+                    row = [None] * len(sizes)
+                    for d, v in zip(dims, values):
+                        row[d] = v
+                    rows.append(row)
+
+    configurations = []
+    for row in rows:
+        configuration = {}
+        for position, index in enumerate(row):
+            name = names[order[position]]
+            configuration[name] = dimensions[name][index if index is not None else 0]  # Free cells: any value
+        configurations.append({name: configuration[name] for name in names})
+    return configurations
+
+
+def uncovered_combinations(configurations, dimensions, strength=2):
+    """The `strength`-way value combinations missing from `configurations` (empty when covered)."""
+    missing = []
+    for dims in itertools.combinations(list(dimensions), strength):
+        seen = {tuple(configuration[d] for d in dims) for configuration in configurations}
+        missing.extend((dims, values) for values in itertools.product(*(dimensions[d] for d in dims))
+                       if values not in seen)
+    return missing
+
+
+def group_by_class(configurations, class_dimensions):
+    """Groups configurations by their values for the behaviour-changing dimensions, in first-seen order."""
+    classes = {}
+    for configuration in configurations:
+        key = tuple(configuration[d] for d in class_dimensions)
+        classes.setdefault(key, []).append(configuration)
+    return classes
+
+
+def template_spec(base_spec, class_values, placeholders):
+    """
+    Builds the spec sent to the LLM for one equivalence class: `class_values` (dimension ->
+    dict of spec fields) override the base spec, and {placeholder} markers stand in for the
+    dimensions filled in locally.
+    """
+    spec = dict(base_spec)
+    for fields in class_values.values():
+        spec.update(fields)
+    markers = ", ".join("{" + name + "}" for name in placeholders)
+    spec["preconditions"] = (f"{spec['preconditions']}  Keep these placeholders verbatim wherever the value "
+                             f"applies, they are filled in per configuration: {markers}.")
+    return spec
+
+
+def fill_template(template, configuration, placeholders):
+    """Fills a generated template for one configuration and prefixes the configuration it covers."""
+    filled = template
+    for name in placeholders:
+        filled = filled.replace("{" + name + "}", str(configuration[name]))
+    header = ", ".join(f"{name.replace('_', ' ').title()}: {configuration[name]}" for name in configuration)
+    return f"**Configuration:** {header}\n\n{filled}"
+
+
+def print_plan(dimensions, configurations, classes, strength):
+    print(f"{len(dimensions)} dimensions, {combination_count(dimensions)} full combinations -> "
+          f"{len(configurations)} configurations covering all {strength}-way combinations -> "
+          f"{len(classes)} LLM calls (one per equivalence class)")
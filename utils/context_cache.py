@@ -0,0 +1,117 @@
+"""
+Shared-context prompt caching for runs that send the same story with every request.
+
+A SharedContext registers the fixed QA instructions and the user story once.  With Gemini
+this creates a CachedContent resource and a model bound to it, so each request carries only
+its per-spec delta and the cached prefix is billed at the cached rate.
+
+Gemini only caches contexts of at least MIN_CACHE_TOKENS (32768 tokens, roughly 130 KB of
+story text), so typical stories are not cached.  When the context is below that minimum,
+caching is switched off, or cache creation fails, the local stand-in is used instead: the
+prefix is prepended to each delta so the calling code is the same, but every request then
+carries the whole prefix and nothing is saved.  Callers should check `cached` and keep their
+cheaper path (one combined prompt, or retrieved excerpts per spec) when it is False.  Prefix
+bytes and tokens not re-sent are tracked per run.
+"""
+import datetime
+import threading
+
+from utils.retrieval import estimate_tokens
+
+# Gemini 1.5 models reject cached contents below this many tokens
+MIN_CACHE_TOKENS = 32768
+
+
+class SharedContext:
+    """Sends instructions + story once, then only the per-request delta."""
+
+    def __init__(self, model, instructions, story, cache_model=None, ttl_seconds=3600, min_tokens=MIN_CACHE_TOKENS):
+        self.model = model
+        self.prefix = f"{instructions.strip()}\n\n{story.strip()}\n\n"
+        self.prefix_bytes = len(self.prefix.encode("utf-8"))
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        self.requests = 0
+        self.delta_bytes = 0
+        self.saved_bytes = 0
+        self.saved_tokens = 0
+        self.backend = "local"
+        self._cache = None
+        self._cached_model = None
+        self._lock = threading.Lock()
+
+        if cache_model and self.prefix_tokens >= min_tokens:
+            try:
+                import google.generativeai as genai
+                from google.generativeai import caching
+                self._cache = caching.CachedContent.create(
+                    model=cache_model,
+                    display_name="user-story-context",
+                    system_instruction=instructions.strip(),
+                    contents=[story.strip()],
+                    ttl=datetime.timedelta(seconds=ttl_seconds),
+                )
+                self._cached_model = genai.GenerativeModel.from_cached_content(cached_content=self._cache)
+                self.backend = "gemini"
+                print(f"Cached ~{self.prefix_tokens} tokens of story context as {self._cache.name}")
+            except Exception as e:
+                print(f"Context caching unavailable: {e}")
+        elif cache_model:
+            print(f"Story context (~{self.prefix_tokens} tokens) is below the {min_tokens}-token cache minimum; "
+                  f"not caching it.")
+
+    @property
+    def cached(self):
+        """Whether the prefix lives in a Gemini cache (False means it is re-sent with every request)."""
+        return self._cached_model is not None
+
+    def generate_content(self, delta):
+        """Generates from the shared context plus `delta` (the per-spec part of the prompt)."""
+        with self._lock:
+            self.requests += 1
+            self.delta_bytes += len(delta.encode("utf-8"))
+        if self._cached_model is None:
+            return self.model.generate_content(self.prefix + delta)
+
+        response = self._cached_model.generate_content(delta)
+        usage = getattr(response, "usage_metadata", None)
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or self.prefix_tokens
+        with self._lock:
+            self.saved_bytes += self.prefix_bytes
+            self.saved_tokens += cached_tokens
+        return response
+
+    def metrics(self):
+        sent_bytes = self.delta_bytes + (self.prefix_bytes if self.backend == "gemini" else
+                                         self.prefix_bytes * self.requests)
+        return {
+            "backend": self.backend,
+            "requests": self.requests,
+            "prefix_bytes": self.prefix_bytes,
+            "prefix_tokens": self.prefix_tokens,
+            "sent_bytes": sent_bytes,
+            "saved_bytes": self.saved_bytes,
+            "saved_tokens": self.saved_tokens,
+        }
+
+    def log_metrics(self):
+        metrics = self.metrics()
+        print(f"Shared context ({metrics['backend']}): {metrics['requests']} requests, "
+              f"{metrics['sent_bytes']} prompt bytes sent, {metrics['saved_bytes']} prefix bytes "
+              f"(~{metrics['saved_tokens']} tokens) not re-sent")
+        return metrics
+
+    def close(self):
+        """Deletes the Gemini cache now instead of waiting for its TTL."""
+        if self._cache is not None:
+            try:
+                self._cache.delete()
+            except Exception as e:
+                print(f"Error deleting cached context: {e}")
+            self._cache = None
+            self._cached_model = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
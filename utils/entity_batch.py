@@ -0,0 +1,136 @@
+"""
+Batch mode for the entity-driven question flow.
+
+Questions are streamed from a file or stdin, run through spaCy's `nlp.pipe` with every
+component except NER disabled (optionally across several processes), and grouped by their
+extracted entity set.  Each group is answered with a single Gemini call and the answers are
+written out as JSON lines as soon as the group completes.  With a semantic cache, questions
+close enough to one answered before are written out straight away and never reach a group.
+"""
+import json
+import re
+import sys
+import time
+
+ANSWER_PATTERN = re.compile(r"^\W*Answer\s+(\d+)\W*", re.IGNORECASE | re.MULTILINE)
+
+
+def read_questions(source):
+    """Yields non-empty questions, one per line, from a path, "-" for stdin, or an open file."""
+    if source == "-":
+        stream = sys.stdin
+    elif isinstance(source, str):
+        stream = open(source, encoding="utf-8")
+    else:
+        stream = source
+    try:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if isinstance(source, str) and source != "-":
+            stream.close()
+
+
+def extract_entities(nlp, questions, n_process=1, batch_size=256):
+    """Yields (question, entities) pairs using nlp.pipe with only the NER path enabled."""
+    keep = {"tok2vec", "ner", "entity_ruler"}  # NER may listen to the shared tok2vec layer
+    disable = [name for name in nlp.pipe_names if name not in keep]
+    for doc in nlp.pipe(questions, n_process=n_process, batch_size=batch_size, disable=disable):
+        yield doc.text, [(ent.text, ent.label_) for ent in doc.ents]
+
+
+def group_by_entities(pairs, group_size=10, window=1000):
+    """
+    Yields (entities, questions) groups of questions sharing the same entity set.
+
+    At most `window` questions are held back while waiting for groups to fill up, so memory
+    stays bounded on arbitrarily long streams.
+    """
+    pending = {}
+    held = 0
+    for question, entities in pairs:
+        key = tuple(sorted(set(entities)))
+        pending.setdefault(key, []).append(question)
+        held += 1
+        if len(pending[key]) >= group_size:
+            held -= len(pending[key])
+            yield list(key), pending.pop(key)
+        elif held >= window:
+            # Flush the largest group to make room
+            key = max(pending, key=lambda k: len(pending[k]))
+            held -= len(pending[key])
+            yield list(key), pending.pop(key)
+    for key, questions in pending.items():
+        yield list(key), questions
+
+
+def build_group_prompt(entities, questions):
+    """Builds one prompt answering every question of a group that shares `entities`."""
+    numbered = "\n".join(f"Question {i + 1}: {question}" for i, question in enumerate(questions))
+    return (f"Based on the extracted entities: {entities}, answer each of the following questions, "
+            f"focusing on key figures.\n\n{numbered}\n\n"
+            f"Start each answer on its own line with 'Answer <number>:' matching the question number.")
+
+
+def parse_group_answers(text, count):
+    """Splits a grouped response into `count` answers; missing answers come back as None."""
+    answers = [None] * count
+    matches = list(ANSWER_PATTERN.finditer(text))
+    for i, match in enumerate(matches):
+        index = int(match.group(1)) - 1
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        if 0 <= index < count:
+            answers[index] = text[match.end():end].strip()
+    if count == 1 and answers[0] is None:
+        answers[0] = text.strip()
+    return answers
+
+
+def _uncached(pairs, cache, output, counts):
+    """Writes cached answers straight to `output` and yields the (question, entities) pairs left to ask."""
+    for question, entities in pairs:
+        answer, score = cache.get(question, entities)
+        if answer is None:
+            yield question, entities
+            continue
+        output.write(json.dumps({"question": question, "entities": entities, "answer": answer,
+                                 "cached": True, "similarity": round(score, 3)}) + "\n")
+        counts["cached"] += 1
+
+
+def answer_questions(nlp, model, questions, output, n_process=1, group_size=10, rate_limiter=None, cache=None):
+    """Extracts entities, answers grouped questions and streams JSON lines to `output`."""
+    start = time.monotonic()
+    answered = 0
+    llm_calls = 0
+    counts = {"cached": 0}
+    pairs = extract_entities(nlp, questions, n_process)
+    if cache is not None:
+        pairs = _uncached(pairs, cache, output, counts)
+    for entities, group in group_by_entities(pairs, group_size):
+        if rate_limiter:
+            rate_limiter.acquire()
+        try:
+            response = model.generate_content(build_group_prompt(entities, group))
+            answers = parse_group_answers(response.text, len(group))
+        except Exception as e:
+            print(f"Error answering {len(group)} questions: {type(e).__name__} - {e}", file=sys.stderr)
+            answers = [None] * len(group)
+        llm_calls += 1
+        for question, answer in zip(group, answers):
+            output.write(json.dumps({"question": question, "entities": entities, "answer": answer}) + "\n")
+            if cache is not None:
+                cache.put(question, entities, answer)
+        output.flush()
+        answered += len(group)
+        elapsed = time.monotonic() - start
+        print(f"Answered {answered + counts['cached']} questions in {llm_calls} LLM calls "
+              f"({(answered + counts['cached']) / elapsed:.1f} questions/s)", file=sys.stderr)
+
+    output.flush()
+    elapsed = time.monotonic() - start
+    answered += counts["cached"]
+    return {"questions": answered, "llm_calls": llm_calls, "cached": counts["cached"], "seconds": elapsed,
+            "questions_per_second": answered / elapsed if elapsed > 0 else 0.0}
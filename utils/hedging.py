@@ -0,0 +1,141 @@
+"""
+Request hedging for slow LLM responses.
+
+A hedged request is sent to the primary model as usual.  If it has not finished once the
+configured latency percentile of recent requests has elapsed, a duplicate is sent to the
+same or an alternate model and whichever answer arrives first is returned.  Duplicates are
+only sent when the shared rate limiter still has budget, so hedging never pushes a run
+over its quota.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.model_names import model_name, tag_response
+
+
+class LatencyTracker:
+    """Keeps the most recent request latencies and answers percentile queries over them."""
+
+    def __init__(self, history=100):
+        self._samples = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """Returns the nearest-rank percentile of the recorded latencies, or None if empty."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[rank]
+
+
+class HedgedModel:
+    """
+    Drop-in wrapper around a model exposing `generate_content(prompt)`.
+
+    The hedge delay is the `percentile` of the last `history` primary latencies; no hedges
+    are sent until `min_samples` requests have completed.  The losing request cannot be
+    interrupted once its HTTP call is in flight, so it is cancelled if it has not started
+    and otherwise left to finish with its result discarded.
+    """
+
+    def __init__(self, model, alternate=None, rate_limiter=None, percentile=95,
+                 min_samples=5, history=100, max_workers=8):
+        self.model = model
+        self.alternate = alternate or model
+        self.rate_limiter = rate_limiter
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.primary_latencies = LatencyTracker(history)    # What every request would take unhedged
+        self.effective_latencies = LatencyTracker(history)  # What callers actually waited
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "hedges_denied": 0}
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+
+    @property
+    def model_name(self):
+        return model_name(self.model)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _timed_call(model, prompt, kwargs):
+        start = time.monotonic()
+        response = model.generate_content(prompt, **kwargs)
+        return response, time.monotonic() - start
+
+    def _record_primary(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self.primary_latencies.record(future.result()[1])
+
+    def hedge_delay(self):
+        """Seconds to wait for the primary before hedging, or None while still learning."""
+        if len(self.primary_latencies) < self.min_samples:
+            return None
+        return self.primary_latencies.percentile(self.percentile)
+
+    def generate_content(self, prompt, **kwargs):
+        self._count("requests")
+        start = time.monotonic()
+        primary = self._executor.submit(self._timed_call, self.model, prompt, kwargs)
+        primary.add_done_callback(self._record_primary)
+        pending = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None and not wait(pending, timeout=delay).done:
+            if self.rate_limiter is None or self.rate_limiter.try_acquire():
+                print(f"No response after {delay:.2f}s. Sending hedged request...")
+                self._count("hedged")
+                pending.add(self._executor.submit(self._timed_call, self.alternate, prompt, kwargs))
+            else:
+                self._count("hedges_denied")
+
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if future is not primary:
+                    self._count("hedge_wins")
+                self.effective_latencies.record(time.monotonic() - start)
+                return tag_response(future.result()[0], model_name(self.model if future is primary else self.alternate))
+        raise error
+
+    def metrics(self):
+        """Returns hedge counters and unhedged vs. hedged latency percentiles."""
+        metrics = dict(self.stats)
+        for pct in (50, 99):
+            unhedged = self.primary_latencies.percentile(pct)
+            hedged = self.effective_latencies.percentile(pct)
+            metrics[f"p{pct}_unhedged"] = unhedged
+            metrics[f"p{pct}_hedged"] = hedged
+        if metrics["p99_unhedged"] and metrics["p99_hedged"] is not None:
+            metrics["p99_improvement"] = 1 - metrics["p99_hedged"] / metrics["p99_unhedged"]
+        return metrics
+
+    def log_metrics(self):
+        metrics = self.metrics()
+        logging.info(f"Hedging metrics: {metrics}")
+        print(f"Hedged {metrics['hedged']}/{metrics['requests']} requests "
+              f"({metrics['hedge_wins']} hedges won, {metrics['hedges_denied']} denied by rate limit)")
+        if "p99_improvement" in metrics:
+            print(f"p99 latency: {metrics['p99_unhedged']:.2f}s unhedged -> {metrics['p99_hedged']:.2f}s hedged "
+                  f"({metrics['p99_improvement']:.0%} better)")
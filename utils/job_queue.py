@@ -0,0 +1,251 @@
+"""
+Durable generation queue shared by any number of worker processes.
+
+Jobs (one per story/spec pair) live in a SQLite database, which may sit on a filesystem
+shared between machines.  Workers lease a job for a fixed time, keep the lease alive while
+they work and commit the result.  A job whose lease expires is handed to another worker, so
+delivery is at-least-once; results are keyed by job, so a duplicate completion is ignored
+instead of written twice.
+
+The database uses the rollback journal rather than WAL because WAL needs shared memory and
+does not work over network filesystems.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT UNIQUE NOT NULL,
+    story_path TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    job_key TEXT PRIMARY KEY,
+    test_case TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    completed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """SQLite-backed job store with leases, retries and idempotent results."""
+
+    def __init__(self, path, lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()  # One connection shared with the lease heartbeat thread
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _transaction(self, statements):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, story_path, specs):
+        """Adds one job per spec; specs already queued for this story are skipped. Returns the number added."""
+        now = time.time()
+        rows = []
+        for spec in specs:
+            spec_json = json.dumps(spec, sort_keys=True)
+            job_key = hashlib.sha1(f"{story_path}\n{spec_json}".encode("utf-8")).hexdigest()
+            rows.append((job_key, story_path, spec_json, now))
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO jobs (job_key, story_path, spec, updated) VALUES (?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    def lease(self, worker):
+        """Leases the oldest available job to `worker`, or returns None if nothing is ready."""
+        def take(conn):
+            now = time.time()
+            # Expired leases that have used up their attempts will never succeed
+            conn.execute("UPDATE jobs SET status = 'failed', updated = ? "
+                         "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                         (now, now, self.max_attempts))
+            row = conn.execute("SELECT * FROM jobs WHERE status = 'pending' "
+                               "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                         "attempts = attempts + 1, updated = ? WHERE id = ?",
+                         (worker, now + self.lease_seconds, now, row["id"]))
+            job = dict(row)
+            job["spec"] = json.loads(job["spec"])
+            job["attempts"] += 1
+            return job
+        return self._transaction(take)
+
+    def extend_lease(self, job, worker):
+        """Renews the lease; returns False if the job was handed to someone else."""
+        def extend(conn):
+            now = time.time()
+            cursor = conn.execute("UPDATE jobs SET lease_expires = ?, updated = ? "
+                                  "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                                  (now + self.lease_seconds, now, job["id"], worker))
+            return cursor.rowcount == 1
+        return self._transaction(extend)
+
+    def complete(self, job, worker, test_case, busy_seconds=0.0):
+        """Stores the result (first write wins) and marks the job done; returns False if the lease was lost."""
+        def finish(conn):
+            now = time.time()
+            cursor = conn.execute("UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, "
+                                  "updated = ? WHERE id = ? AND lease_owner = ?", (now, job["id"], worker))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("INSERT OR IGNORE INTO results (job_key, test_case, worker, completed) VALUES (?, ?, ?, ?)",
+                         (job["job_key"], test_case, worker, now))
+            self._touch_worker(conn, worker, now, completed=1, busy_seconds=busy_seconds)
+            return True
+        return self._transaction(finish)
+
+    def fail(self, job, worker, error, busy_seconds=0.0):
+        """Returns the job to the queue, or marks it failed once it has used all its attempts."""
+        def release(conn):
+            now = time.time()
+            status = "failed" if job["attempts"] >= self.max_attempts else "pending"
+            cursor = conn.execute("UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                                  "last_error = ?, updated = ? WHERE id = ? AND lease_owner = ?",
+                                  (status, str(error), now, job["id"], worker))
+            if cursor.rowcount == 0:
+                return False
+            self._touch_worker(conn, worker, now, failed=1, busy_seconds=busy_seconds)
+            return True
+        return self._transaction(release)
+
+    @staticmethod
+    def _touch_worker(conn, worker, now, completed=0, failed=0, busy_seconds=0.0):
+        conn.execute("INSERT INTO workers (worker, started, last_seen) VALUES (?, ?, ?) "
+                     "ON CONFLICT (worker) DO NOTHING", (worker, now, now))
+        conn.execute("UPDATE workers SET last_seen = ?, completed = completed + ?, failed = failed + ?, "
+                     "busy_seconds = busy_seconds + ? WHERE worker = ?",
+                     (now, completed, failed, busy_seconds, worker))
+
+    def register_worker(self, worker):
+        self._transaction(lambda conn: self._touch_worker(conn, worker, time.time()))
+
+    def counts(self):
+        """Returns the number of jobs in each status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def has_unfinished_jobs(self):
+        counts = self.counts()
+        return counts.get("pending", 0) + counts.get("leased", 0) > 0
+
+    def results(self, story_path):
+        """Returns the finished test cases for a story, in enqueue order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT r.test_case FROM jobs j JOIN results r ON r.job_key = j.job_key "
+                                      "WHERE j.story_path = ? ORDER BY j.id", (story_path,)).fetchall()
+        return [row[0] for row in rows]
+
+    def throughput_report(self):
+        """Returns one dict per worker with completed/failed jobs, jobs per minute and utilization."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM workers ORDER BY worker").fetchall()
+        report = []
+        for row in rows:
+            elapsed = max(row["last_seen"] - row["started"], 1e-9)
+            report.append({
+                "worker": row["worker"],
+                "completed": row["completed"],
+                "failed": row["failed"],
+                "elapsed_seconds": elapsed,
+                "jobs_per_minute": row["completed"] / elapsed * 60,
+                "utilization": min(1.0, row["busy_seconds"] / elapsed),
+            })
+        return report
+
+
+def run_worker(queue_path, generate, worker=None, poll_interval=2.0, exit_when_idle=True, lease_seconds=300):
+    """
+    Leases and processes jobs until the queue is drained (or forever if `exit_when_idle` is
+    False).  `generate(story_path, spec)` returns the test case text, or None on failure.
+    The lease is renewed in the background while `generate` runs.
+    """
+    worker = worker or default_worker_id()
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds)
+    queue.register_worker(worker)
+    print(f"Worker {worker} started on {queue_path}")
+    try:
+        while True:
+            job = queue.lease(worker)
+            if job is None:
+                if exit_when_idle and not queue.has_unfinished_jobs():
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            stop_heartbeat = threading.Event()
+
+            def heartbeat(job=job):
+                while not stop_heartbeat.wait(queue.lease_seconds / 3):
+                    if not queue.extend_lease(job, worker):
+                        return
+
+            heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+            heartbeat_thread.start()
+            start = time.monotonic()
+            try:
+                test_case = generate(job["story_path"], job["spec"])
+                error = None if test_case else "generation returned no test case"
+            except Exception as e:
+                test_case, error = None, f"{type(e).__name__}: {e}"
+            finally:
+                stop_heartbeat.set()
+                heartbeat_thread.join()
+            busy = time.monotonic() - start
+
+            if error:
+                print(f"Worker {worker} failed job {job['id']} (attempt {job['attempts']}): {error}")
+                queue.fail(job, worker, error, busy)
+            elif not queue.complete(job, worker, test_case, busy):
+                print(f"Worker {worker} lost the lease on job {job['id']}; its result was discarded")
+    finally:
+        queue.close()
+    print(f"Worker {worker} finished: queue is drained")
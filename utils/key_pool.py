@@ -0,0 +1,228 @@
+"""
+Pool of Gemini API keys and models with per-key quota tracking.
+
+Each (key, model) pair is a slot with its own requests-per-minute and tokens-per-minute
+windows.  Every request goes to the slot with the largest share of its budget left; a slot
+that answers 429 "Resource has been exhausted" is cooled down (doubling on repeated 429s)
+and the request moves to another slot.  Throughput therefore scales with the number of keys
+listed in GEMINI_API_KEYS.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
+
+from utils.model_names import tag_response
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+class PoolSlot:
+    """Quota windows, cooldown state and throughput counters for one key/model pair."""
+
+    def __init__(self, api_key, model_name, requests_per_minute, tokens_per_minute, window=60.0):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.label = f"...{api_key[-4:]}/{model_name}"
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self.cooldown_until = 0.0
+        self.consecutive_throttles = 0
+        self.stats = {"requests": 0, "tokens": 0, "throttled": 0, "errors": 0, "busy_seconds": 0.0}
+        self._requests = deque()
+        self._tokens = deque()
+        self._client = None
+
+    def _prune(self, now):
+        while self._requests and now - self._requests[0] >= self.window:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= self.window:
+            self._tokens.popleft()
+
+    def headroom(self, now, tokens):
+        """Fraction of the tighter of the two budgets left after this request, or None if it does not fit."""
+        if now < self.cooldown_until:
+            return None
+        self._prune(now)
+        request_room = self.requests_per_minute - len(self._requests) - 1
+        token_room = self.tokens_per_minute - sum(count for _, count in self._tokens) - tokens
+        if request_room < 0 or token_room < 0:
+            return None
+        return min(request_room / self.requests_per_minute, token_room / self.tokens_per_minute)
+
+    def next_available(self, now):
+        """Earliest time the oldest reservation expires or the cooldown ends."""
+        expiries = []
+        if self._requests:
+            expiries.append(self._requests[0] + self.window)
+        if self._tokens:
+            expiries.append(self._tokens[0][0] + self.window)
+        return max(self.cooldown_until, min(expiries) if expiries else now)
+
+    def reserve(self, now, tokens):
+        self._requests.append(now)
+        self._tokens.append((now, tokens))
+
+    def client(self):
+        if self._client is None:
+            # GenerativeModel always uses the globally configured key, so each slot talks to the API directly
+            self._client = glm.GenerativeServiceClient(client_options={"api_key": self.api_key})
+        return self._client
+
+    def request(self, prompt, generation_config=None):
+        name = self.model_name if self.model_name.startswith("models/") else f"models/{self.model_name}"
+        request = genai.protos.GenerateContentRequest(
+            model=name, contents=[genai.protos.Content(role="user", parts=[genai.protos.Part(text=prompt)])])
+        if generation_config is not None:
+            request.generation_config = generation_config
+        return request
+
+    def generate_content(self, prompt, generation_config=None):
+        """Sends one text prompt with this slot's key; returns the same response type as GenerativeModel."""
+        response = self.client().generate_content(self.request(prompt, generation_config))
+        return genai.types.GenerateContentResponse.from_response(response)
+
+
+class KeyPool:
+    """Chooses the slot with the most remaining budget and cools down throttled keys."""
+
+    def __init__(self, api_keys, model_names, requests_per_minute=2, tokens_per_minute=32000,
+                 cooldown_seconds=60.0, max_cooldown_seconds=900.0):
+        self.slots = [PoolSlot(key, name, requests_per_minute, tokens_per_minute)
+                      for key in api_keys for name in model_names]
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, model_names=None):
+        """
+        Builds a pool from GEMINI_API_KEYS / GEMINI_MODELS (or the given `model_names`), or
+        returns None if no keys are listed.
+        """
+        keys = [key.strip() for key in os.getenv("GEMINI_API_KEYS", "").split(",") if key.strip()]
+        if not keys:
+            return None
+        models = model_names or [name.strip() for name in os.getenv("GEMINI_MODELS", "gemini-1.5-pro-latest").split(",")
+                                 if name.strip()]
+        return cls(keys, models,
+                   requests_per_minute=int(os.getenv("GEMINI_RPM", "2")),
+                   tokens_per_minute=int(os.getenv("GEMINI_TPM", "32000")))
+
+    @property
+    def requests_per_minute(self):
+        return sum(slot.requests_per_minute for slot in self.slots)
+
+    def acquire(self, tokens, exclude=()):
+        """
+        Reserves budget for a request of `tokens` on the best slot, waiting if every slot is spent.
+        Raises ValueError if the request is larger than any slot's tokens-per-minute limit.
+        """
+        if not any(tokens <= slot.tokens_per_minute for slot in self.slots):
+            raise ValueError(f"A request of ~{tokens} tokens exceeds the tokens-per-minute limit of every key "
+                             f"({max(slot.tokens_per_minute for slot in self.slots)})")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [slot for slot in self.slots if slot not in exclude and tokens <= slot.tokens_per_minute]
+                candidates = candidates or [slot for slot in self.slots if tokens <= slot.tokens_per_minute]
+                scored = [(slot.headroom(now, tokens), slot) for slot in candidates]
+                scored = [(room, slot) for room, slot in scored if room is not None]
+                if scored:
+                    _, slot = max(scored, key=lambda item: item[0])
+                    slot.reserve(now, tokens)
+                    return slot
+                wait = min(slot.next_available(now) for slot in candidates) - now
+            print(f"All API keys are at their quota.  Sleeping for {max(wait, 0.1):.0f} seconds...")
+            time.sleep(max(wait, 0.1))
+
+    def report_success(self, slot, tokens, seconds):
+        with self._lock:
+            slot.consecutive_throttles = 0
+            slot.stats["requests"] += 1
+            slot.stats["tokens"] += tokens
+            slot.stats["busy_seconds"] += seconds
+
+    def report_throttled(self, slot):
+        with self._lock:
+            slot.consecutive_throttles += 1
+            slot.stats["throttled"] += 1
+            cooldown = min(self.max_cooldown_seconds, self.cooldown_seconds * 2 ** (slot.consecutive_throttles - 1))
+            slot.cooldown_until = time.monotonic() + cooldown
+        logging.warning(f"API key {slot.label} throttled; cooling down for {cooldown:.0f}s")
+
+    def report_error(self, slot):
+        with self._lock:
+            slot.stats["errors"] += 1
+
+    def utilization(self):
+        """Per-slot throughput and busy share, plus pool totals."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        now = time.monotonic()
+        with self._lock:
+            slots = [{
+                "slot": slot.label,
+                **slot.stats,
+                "requests_per_minute": slot.stats["requests"] / elapsed * 60,
+                "utilization": slot.stats["requests"] / (slot.requests_per_minute * elapsed / 60),
+                "cooling_down": now < slot.cooldown_until,
+            } for slot in self.slots]
+        total = sum(slot["requests"] for slot in slots)
+        return {
+            "slots": slots,
+            "requests": total,
+            "requests_per_minute": total / elapsed * 60,
+            "utilization": total / (self.requests_per_minute * elapsed / 60),
+        }
+
+    def log_utilization(self):
+        report = self.utilization()
+        logging.info(f"Key pool utilization: {report}")
+        print(f"Key pool: {report['requests']} requests, {report['requests_per_minute']:.1f}/min, "
+              f"{report['utilization']:.0%} of pooled quota")
+        for slot in report["slots"]:
+            print(f"  {slot['slot']}: {slot['requests']} requests, {slot['throttled']} throttled, "
+                  f"{slot['requests_per_minute']:.1f}/min")
+
+
+class PooledModel:
+    """Drop-in replacement for GenerativeModel, for text prompts, that spreads requests over a KeyPool."""
+
+    def __init__(self, pool, expected_output_tokens=1024):
+        self.pool = pool
+        self.expected_output_tokens = expected_output_tokens
+
+    @property
+    def model_name(self):
+        return ", ".join(sorted({slot.model_name for slot in self.pool.slots}))
+
+    def generate_content(self, prompt, **kwargs):
+        tokens = estimate_tokens(prompt) + self.expected_output_tokens
+        tried = []
+        while True:
+            slot = self.pool.acquire(tokens, exclude=tried)
+            start = time.monotonic()
+            try:
+                response = slot.generate_content(prompt, **kwargs)
+            except google_exceptions.ResourceExhausted:
+                self.pool.report_throttled(slot)
+                tried.append(slot)
+                if len(tried) < len(self.pool.slots):
+                    continue  # Try the next key
+                raise
+            except Exception:
+                self.pool.report_error(slot)
+                raise
+            usage = getattr(response, "usage_metadata", None)
+            used = getattr(usage, "total_token_count", None) or tokens
+            self.pool.report_success(slot, used, time.monotonic() - start)
+            return tag_response(response, slot.model_name)
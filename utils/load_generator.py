@@ -0,0 +1,244 @@
+"""
+Asynchronous load generator for the performance specs.
+
+Virtual users are started gradually over a ramp-up period and each repeatedly logs in to the
+stand-in app over a shared pool of keep-alive HTTP/1.1 connections (plain asyncio streams, so
+no extra dependency; http and https, fixed-length and chunked bodies).  Latencies go into a
+histogram with percentile queries, and each performance spec is turned into a pass/fail
+verdict from its expected result, such as "< 2 seconds" for "Performance - Response Time".
+A virtual user backs off after a failed request and stops after repeated failures.
+"""
+import asyncio
+import bisect
+import itertools
+import re
+import ssl
+import time
+from urllib.parse import urlencode, urlsplit
+
+from utils.login_app import USERS
+
+# A virtual user whose requests fail this many times in a row (refused port, dead server) stops
+MAX_CONSECUTIVE_FAILURES = 5
+FAILURE_BACKOFF = 0.05  # Seconds before the first retry after a failure, doubled per failure
+
+
+class HttpConnectionPool:
+    """Bounded pool of keep-alive connections to one host."""
+
+    def __init__(self, base_url, size=100):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL {base_url!r}: expected http://host[:port] or https://host[:port]")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.size = size
+        self._idle = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+
+    async def _connection(self):
+        while not self._idle.empty():
+            reader, writer = self._idle.get_nowait()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+        self.connections_opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def request(self, method, path, body=b"", headers=None):
+        """Sends one request and returns (status, headers, body)."""
+        async with self._slots:
+            reader, writer = await self._connection()
+            try:
+                lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                         f"Content-Length: {len(body)}", "Connection: keep-alive"]
+                lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+
+                status_line = await reader.readline()
+                if not status_line:
+                    raise ConnectionError("Connection closed by server")
+                status = int(status_line.split()[1])
+                response_headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    response_headers[name.strip().lower()] = value.strip()
+                payload = await _read_body(reader, status, response_headers)
+            except Exception:
+                writer.close()
+                raise
+            if response_headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._idle.put_nowait((reader, writer))
+            return status, response_headers, payload
+
+    async def close(self):
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
+
+
+async def _read_body(reader, status, headers):
+    """Reads a fixed-length, chunked or read-until-close response body."""
+    if status < 200 or status in (204, 304):
+        return b""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise ConnectionError("Connection closed inside a chunked body")
+            size = int(size_line.split(b";")[0].strip(), 16)
+            if size == 0:
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF after each chunk
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # Trailer headers
+        return b"".join(chunks)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    headers["connection"] = "close"  # The body ends when the server closes the connection
+    return await reader.read()
+
+
+class LatencyHistogram:
+    """Log-spaced latency buckets from 1 ms to about 60 s, plus the raw samples for exact percentiles."""
+
+    def __init__(self, buckets_per_decade=5):
+        self.bounds = [10 ** (-3 + i / buckets_per_decade) for i in range(int(4.8 * buckets_per_decade) + 1)]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.samples = []
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, pct):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+    def render(self, width=40):
+        """ASCII histogram of the non-empty buckets."""
+        peak = max(self.counts) or 1
+        lines = []
+        for i, count in enumerate(self.counts):
+            if not count:
+                continue
+            upper = f"<{self.bounds[i] * 1000:.1f}ms" if i < len(self.bounds) else f">={self.bounds[-1]:.0f}s"
+            lines.append(f"{upper:>12} {'#' * max(1, round(count / peak * width))} {count}")
+        return "\n".join(lines)
+
+
+async def _virtual_user(pool, credentials, deadline, start_delay, histogram, stats):
+    await asyncio.sleep(start_delay)
+    consecutive_failures = 0
+    while time.monotonic() < deadline:
+        username, password = next(credentials)
+        body = urlencode({"username": username, "password": password}).encode()
+        start = time.monotonic()
+        try:
+            status, _, _ = await pool.request("POST", "/login", body,
+                                              {"Content-Type": "application/x-www-form-urlencoded"})
+        except Exception:
+            stats["failures"] += 1
+            consecutive_failures += 1
+            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                return
+            await asyncio.sleep(FAILURE_BACKOFF * 2 ** (consecutive_failures - 1))
+            continue
+        consecutive_failures = 0
+        histogram.record(time.monotonic() - start)
+        stats["requests"] += 1
+        if status != 303:  # A successful login redirects to the dashboard
+            stats["rejected"] += 1
+
+
+async def run_load_async(base_url, concurrency=10, duration=10.0, ramp_up=2.0, pool_size=None, users=None):
+    pool = HttpConnectionPool(base_url, pool_size or concurrency)
+    credentials = itertools.cycle(list((users or USERS).items()))
+    histogram = LatencyHistogram()
+    stats = {"requests": 0, "rejected": 0, "failures": 0}
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    await asyncio.gather(*(
+        _virtual_user(pool, credentials, deadline, ramp_up * i / concurrency, histogram, stats)
+        for i in range(concurrency)
+    ))
+    elapsed = time.monotonic() - start
+    await pool.close()
+    return {
+        "concurrency": concurrency,
+        "duration": elapsed,
+        "requests": stats["requests"],
+        "rejected": stats["rejected"],
+        "failures": stats["failures"],
+        "errors": stats["rejected"] + stats["failures"],
+        # Every attempt counts once: a response with the wrong status or no response at all
+        "error_rate": (stats["rejected"] + stats["failures"]) / max(1, stats["requests"] + stats["failures"]),
+        "throughput": stats["requests"] / elapsed if elapsed else 0.0,
+        "connections_opened": pool.connections_opened,
+        **{f"p{pct}": histogram.percentile(pct) for pct in (50, 90, 95, 99)},
+        "max": max(histogram.samples) if histogram.samples else None,
+        "histogram": histogram,
+    }
+
+
+def run_load(base_url, concurrency=10, duration=10.0, ramp_up=2.0, pool_size=None, users=None):
+    """Runs one load stage and returns latency percentiles, throughput and the histogram."""
+    return asyncio.run(run_load_async(base_url, concurrency, duration, ramp_up, pool_size, users))
+
+
+def response_time_limit(spec, default=2.0):
+    """Reads the limit from an expected result like "... (e.g., < 2 seconds)"."""
+    match = re.search(r"<\s*(\d+(?:\.\d+)?)\s*(ms|milliseconds?|s|seconds?)", spec.get("expected_result", ""))
+    if not match:
+        return default
+    value = float(match.group(1))
+    return value / 1000 if match.group(2).startswith("m") else value
+
+
+def evaluate_performance_spec(spec, base_url, concurrency_levels=(10, 50), duration=10.0, ramp_up=2.0,
+                              max_degradation=3.0, max_error_rate=0.01):
+    """
+    Runs the load stages a performance spec calls for and returns (passed, stages, reason).
+
+    "Performance - Response Time" measures a single user against the spec's time limit.
+    "Performance - Concurrent Users" compares each concurrency level with that single-user
+    baseline: p95 may grow at most `max_degradation` times and must stay under the limit.
+    """
+    limit = response_time_limit(spec)
+    baseline = run_load(base_url, concurrency=1, duration=duration, ramp_up=0)
+    stages = [baseline]
+    if baseline["requests"] == 0:
+        return False, stages, "No successful requests"
+    if spec["type"] == "Performance - Response Time":
+        passed = baseline["p95"] < limit and baseline["error_rate"] <= max_error_rate
+        return passed, stages, f"p95 {baseline['p95'] * 1000:.1f} ms vs limit {limit * 1000:.0f} ms"
+
+    reasons = []
+    for level in concurrency_levels:
+        stage = run_load(base_url, concurrency=level, duration=duration, ramp_up=ramp_up)
+        stages.append(stage)
+        if stage["error_rate"] > max_error_rate:
+            reasons.append(f"{level} users: error rate {stage['error_rate']:.1%}")
+        elif stage["p95"] >= limit:
+            reasons.append(f"{level} users: p95 {stage['p95'] * 1000:.0f} ms over {limit * 1000:.0f} ms")
+        elif stage["p95"] > baseline["p95"] * max_degradation and stage["p95"] > 0.05:
+            reasons.append(f"{level} users: p95 degraded {stage['p95'] / baseline['p95']:.1f}x")
+    return not reasons, stages, "; ".join(reasons) or "No significant degradation"
+
+
+def print_stage(stage):
+    print(f"{stage['concurrency']:>4} users: {stage['requests']} requests, {stage['throughput']:.0f} req/s, "
+          f"p50 {stage['p50'] * 1000:.1f} ms, p95 {stage['p95'] * 1000:.1f} ms, p99 {stage['p99'] * 1000:.1f} ms, "
+          f"errors {stage['error_rate']:.1%}, {stage['connections_opened']} connections")
+    print(stage["histogram"].render())
@@ -0,0 +1,242 @@
+"""
+Local stand-in for the application under test.
+
+A small login/logout web app built on the standard library's threading HTTP server.  It
+serves an accessible login page, redirects to a dashboard on success, locks an account after
+repeated failures and can optionally rate-limit clients and add artificial latency, so the
+generated Playwright, load, accessibility and security tests have something real to run
+against without network access.
+
+    python -m utils.login_app --port 8000
+"""
+import argparse
+import html
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Stand-in for Config.USERS: username -> password
+USERS = {
+    "standard_user": "Secret#123",
+    "qa_engineer": "Passw0rd!",
+}
+INVALID_USER = ("invalid_user", "wrong_password")
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Login</title>
+<style>
+body {{ color: #1a1a1a; background-color: #ffffff; font-family: Arial, sans-serif; font-size: 16px; }}
+.error {{ color: #a4000f; background-color: #ffffff; }}
+button {{ color: #ffffff; background-color: #0b5394; font-size: 16px; }}
+</style>
+</head>
+<body>
+<header><img src="/logo.png" alt="Stand-in application logo" width="120" height="40"></header>
+<main>
+<h1>Sign in</h1>
+{error}
+<form id="login-form" method="post" action="/login">
+<label for="username">Username</label>
+<input id="username" name="username" type="text" autocomplete="username" required>
+<label for="password">Password</label>
+<input id="password" name="password" type="password" autocomplete="current-password" required>
+<button id="login-button" type="submit">Log in</button>
+</form>
+</main>
+</body>
+</html>
+"""
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Dashboard</title></head>
+<body>
+<main>
+<h1>Dashboard</h1>
+<p id="welcome">Welcome, {username}!</p>
+<form method="post" action="/logout"><button id="logout-button" type="submit">Log out</button></form>
+</main>
+</body>
+</html>
+"""
+
+
+class LoginApp(ThreadingHTTPServer):
+    """HTTP server holding the app state: users, sessions, failed attempts and lockouts."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, users=None, latency=0.0, max_failed_attempts=5, lockout_seconds=300,
+                 rate_limit_per_second=None):
+        super().__init__(address, LoginAppHandler)
+        self.users = dict(users or USERS)
+        self.latency = latency
+        self.max_failed_attempts = max_failed_attempts
+        self.lockout_seconds = lockout_seconds
+        self.rate_limit_per_second = rate_limit_per_second
+        self.sessions = {}
+        self.failed_attempts = {}
+        self.locked_until = {}
+        self.client_requests = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rate_limited(self, client):
+        """Fixed one-second window per client address."""
+        if not self.rate_limit_per_second:
+            return False
+        window = int(time.monotonic())
+        with self.lock:
+            start, count = self.client_requests.get(client, (window, 0))
+            count = count + 1 if start == window else 1
+            self.client_requests[client] = (window, count)
+        return count > self.rate_limit_per_second
+
+    def authenticate(self, username, password):
+        """Returns "ok", "locked" or "invalid"; credentials are compared as plain values, never interpolated."""
+        now = time.monotonic()
+        with self.lock:
+            if self.locked_until.get(username, 0) > now:
+                return "locked"
+            if username in self.users and secrets.compare_digest(self.users[username], password):
+                self.failed_attempts.pop(username, None)
+                return "ok"
+            failures = self.failed_attempts.get(username, 0) + 1
+            self.failed_attempts[username] = failures
+            if failures >= self.max_failed_attempts:
+                self.locked_until[username] = now + self.lockout_seconds
+                self.failed_attempts.pop(username, None)
+            return "invalid"
+
+
+class LoginAppHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can pool connections
+    server_version = "StandInLogin/1.0"
+
+    def log_message(self, format, *args):
+        pass  # Keep test output quiet
+
+    def _send(self, status, body="", headers=None, content_type="text/html; charset=utf-8"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _redirect(self, location, headers=None):
+        self._send(303, "", {"Location": location, **(headers or {})})
+
+    def _session_user(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "session":
+                with self.server.lock:
+                    return self.server.sessions.get(value)
+        return None
+
+    def _login_page(self, status=200, error=None):
+        error_html = f'<p class="error" role="alert" id="error">{html.escape(error)}</p>' if error else ""
+        self._send(status, LOGIN_PAGE.format(error=error_html))
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        path = self.path.split("?")[0]
+        if path in ("/", "/login"):
+            self._login_page()
+        elif path == "/dashboard":
+            username = self._session_user()
+            if username is None:
+                self._redirect("/login")
+            else:
+                self._send(200, DASHBOARD_PAGE.format(username=html.escape(username)))
+        elif path == "/logo.png":
+            self._send(200, "", content_type="image/png")
+        elif path == "/logout":
+            self._logout()
+        else:
+            self._send(404, "Not found", content_type="text/plain")
+
+    def do_POST(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8", "replace"), keep_blank_values=True)
+        path = self.path.split("?")[0]
+        if path == "/login":
+            self._login(form.get("username", [""])[0], form.get("password", [""])[0])
+        elif path == "/logout":
+            self._logout()
+        else:
+            self._send(404, "Not found", content_type="text/plain")
+
+    def _login(self, username, password):
+        if self.server.rate_limited(self.client_address[0]):
+            self._send(429, "Too many requests", {"Retry-After": "1"}, content_type="text/plain")
+            return
+        if not username or not password:
+            self._login_page(400, "Username and password are required.")
+            return
+        result = self.server.authenticate(username, password)
+        if result == "locked":
+            self._login_page(423, "Account locked after too many failed attempts. Try again later.")
+        elif result == "invalid":
+            self._login_page(401, "Invalid username or password.")
+        else:
+            token = secrets.token_hex(16)
+            with self.server.lock:
+                self.server.sessions[token] = username
+            self._redirect("/dashboard", {"Set-Cookie": f"session={token}; HttpOnly; Path=/"})
+
+    def _logout(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            name, _, value = cookie.strip().partition("=")
+            if name == "session":
+                with self.server.lock:
+                    self.server.sessions.pop(value, None)
+        self._redirect("/login", {"Set-Cookie": "session=; Max-Age=0; Path=/"})
+
+
+def start_login_app(host="127.0.0.1", port=0, **options):
+    """Starts the app in a background thread and returns the running server (see `base_url`)."""
+    app = LoginApp((host, port), **options)
+    threading.Thread(target=app.serve_forever, name="login-app", daemon=True).start()
+    return app
+
+
+@contextmanager
+def running_login_app(**options):
+    app = start_login_app(**options)
+    try:
+        yield app
+    finally:
+        app.shutdown()
+        app.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the stand-in login app.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial delay per request in seconds")
+    args = parser.parse_args()
+    server = LoginApp((args.host, args.port), latency=args.latency)
+    print(f"Stand-in login app running at {server.base_url}/login")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
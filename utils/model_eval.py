@@ -0,0 +1,228 @@
+"""
+Side-by-side comparison of model backends on the same spec set.
+
+Every backend runs the same prompts at the same time (one thread per backend, each with its
+own worker pool and optional rate limit) and is measured on:
+
+    throughput     test cases per minute of wall time
+    latency        p50 / p90 / p99 / max per request
+    tokens         prompt and output tokens (from usage metadata, else estimated)
+    cost           from per-million-token prices in MODEL_PRICES
+    completeness   share of the eleven required sections present (utils.section_repair)
+    duplicates     share of outputs that near-duplicate an earlier output for another spec
+    errors         failed or empty responses
+
+Backends are "gemini-..." model names or "ollama:<model>" for a local Ollama server
+(OLLAMA_URL, default http://localhost:11434); anything with generate_content(prompt) works.
+"""
+import csv
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+
+from utils.rate_limiter import RateLimiter
+from utils.retrieval import estimate_tokens, tokenize
+from utils.section_repair import SECTIONS, find_missing_sections
+
+# USD per million (input, output) tokens; local models cost nothing per token
+MODEL_PRICES = {
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-pro-latest": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-flash-latest": (0.075, 0.30),
+    "gemini-1.5-flash-8b": (0.0375, 0.15),
+}
+
+# Outputs at least this similar (Jaccard over word sets) to an earlier one count as duplicates
+DUPLICATE_SIMILARITY = 0.9
+
+
+class GeneratedText:
+    """Minimal response object for local backends: `.text` like a Gemini response."""
+
+    def __init__(self, text, prompt_tokens=None, output_tokens=None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+
+
+class OllamaModel:
+    """Local model served by Ollama, with the same generate_content(prompt) interface as Gemini."""
+
+    def __init__(self, model_name, url=None, timeout=600):
+        self.model_name = model_name
+        self.url = (url or os.getenv("OLLAMA_URL", "http://localhost:11434")).rstrip("/")
+        self.timeout = timeout
+
+    def generate_content(self, prompt, **kwargs):
+        body = json.dumps({"model": self.model_name, "prompt": prompt, "stream": False}).encode("utf-8")
+        request = Request(f"{self.url}/api/generate", body, {"Content-Type": "application/json"})
+        with urlopen(request, timeout=self.timeout) as response:
+            result = json.load(response)
+        return GeneratedText(result.get("response", ""), result.get("prompt_eval_count"), result.get("eval_count"))
+
+
+def load_backend(name):
+    """Builds a model from a backend name: "ollama:<model>" or a Gemini model name."""
+    if name.startswith("ollama:"):
+        return OllamaModel(name.split(":", 1)[1])
+    import google.generativeai as genai
+    return genai.GenerativeModel(name)
+
+
+def _token_counts(response, prompt, text):
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or getattr(response, "prompt_tokens", None)
+    output_tokens = getattr(usage, "candidates_token_count", None) or getattr(response, "output_tokens", None)
+    return prompt_tokens or estimate_tokens(prompt), output_tokens or estimate_tokens(text)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def duplicate_rate(texts, keys=None, threshold=DUPLICATE_SIMILARITY):
+    """
+    Share of texts whose word set is at least `threshold` Jaccard-similar to an earlier text.
+    With `keys` (e.g. the prompts), only texts with a different key are compared, so repeated
+    runs of the same spec do not count as duplicates.
+    """
+    keys = keys or list(range(len(texts)))
+    seen = []
+    duplicates = 0
+    for text, key in zip(texts, keys):
+        words = set(tokenize(re.sub(r"TC_[A-Z_]*\d+", "", text)))  # Case IDs differ even between copies
+        if any(other_key != key and len(words & other) / max(1, len(words | other)) >= threshold
+               for other, other_key in seen):
+            duplicates += 1
+        seen.append((words, key))
+    return duplicates / len(texts) if texts else 0.0
+
+
+def evaluate_backend(name, model, prompts, concurrency=2, requests_per_minute=None, price=None):
+    """Runs every prompt through one backend and returns its metrics and outputs."""
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    lock = threading.Lock()
+    latencies, outputs = [], [None] * len(prompts)
+    tokens = {"prompt": 0, "output": 0}
+    errors = []
+
+    def run(index):
+        if limiter:
+            limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = model.generate_content(prompts[index])
+            text = (response.text or "").strip()
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        seconds = time.monotonic() - start
+        prompt_tokens, output_tokens = _token_counts(response, prompts[index], text)
+        with lock:
+            latencies.append(seconds)
+            tokens["prompt"] += prompt_tokens
+            tokens["output"] += output_tokens
+            if text:
+                outputs[index] = text
+            else:
+                errors.append("Empty response")
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, range(len(prompts))))
+    elapsed = time.monotonic() - start
+
+    texts = [text for text in outputs if text]
+    text_prompts = [prompt for prompt, text in zip(prompts, outputs) if text]
+    completeness = (sum(1 - len(find_missing_sections(text)) / len(SECTIONS) for text in texts) / len(texts)
+                    if texts else 0.0)
+    input_price, output_price = price or MODEL_PRICES.get(getattr(model, "model_name", name).split("/")[-1],
+                                                          MODEL_PRICES.get(name, (0.0, 0.0)))
+    return {
+        "backend": name,
+        "requests": len(prompts),
+        "succeeded": len(texts),
+        "error_rate": 1 - len(texts) / len(prompts) if prompts else 0.0,
+        "seconds": elapsed,
+        "cases_per_minute": len(texts) / elapsed * 60 if elapsed else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies) if latencies else None,
+        "prompt_tokens": tokens["prompt"],
+        "output_tokens": tokens["output"],
+        "cost_usd": (tokens["prompt"] * input_price + tokens["output"] * output_price) / 1_000_000,
+        "completeness": completeness,
+        "duplicate_rate": duplicate_rate(texts, text_prompts),
+        "errors": errors[:5],
+        "outputs": outputs,
+    }
+
+
+def compare_models(backends, specs, build_prompt, concurrency=2, requests_per_minute=None, repeats=1):
+    """
+    Runs the specs through every backend at once.  `backends` maps names to models;
+    `requests_per_minute` is one limit for all backends or a dict per backend name.
+    """
+    prompts = [build_prompt(spec) for spec in specs] * repeats
+    print(f"Comparing {len(backends)} backends on {len(prompts)} prompts...")
+    with ThreadPoolExecutor(max_workers=len(backends)) as executor:
+        futures = {
+            name: executor.submit(evaluate_backend, name, model, prompts, concurrency,
+                                  requests_per_minute.get(name) if isinstance(requests_per_minute, dict)
+                                  else requests_per_minute)
+            for name, model in backends.items()
+        }
+        return [future.result() for future in futures.values()]
+
+
+def recommend(results, min_completeness=0.9, max_error_rate=0.05):
+    """The backend with the best throughput among those with acceptable quality, or None."""
+    acceptable = [result for result in results
+                  if result["completeness"] >= min_completeness and result["error_rate"] <= max_error_rate]
+    return max(acceptable, key=lambda result: (result["cases_per_minute"], -result["cost_usd"]), default=None)
+
+
+def _format(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_comparison_table(results, min_completeness=0.9, max_error_rate=0.05):
+    columns = [("Backend", "backend", "s"), ("Cases/min", "cases_per_minute", ".1f"), ("p50 s", "p50", ".2f"),
+               ("p90 s", "p90", ".2f"), ("p99 s", "p99", ".2f"), ("Tokens in", "prompt_tokens", "d"),
+               ("Tokens out", "output_tokens", "d"), ("Cost $", "cost_usd", ".4f"),
+               ("Complete", "completeness", ".0%"), ("Dupes", "duplicate_rate", ".0%"), ("Errors", "error_rate", ".0%")]
+    rows = [[_format(result[key], spec) for _, key, spec in columns] for result in results]
+    widths = [max(len(title), *(len(row[i]) for row in rows)) for i, (title, _, _) in enumerate(columns)]
+    print("  ".join(title.ljust(width) for (title, _, _), width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+    for result in results:
+        for error in result["errors"]:
+            print(f"  {result['backend']}: {error}")
+    best = recommend(results, min_completeness, max_error_rate)
+    if best:
+        print(f"Recommended: {best['backend']} ({best['cases_per_minute']:.1f} cases/min at "
+              f"{best['completeness']:.0%} section completeness)")
+    else:
+        print(f"No backend reached {min_completeness:.0%} completeness with at most {max_error_rate:.0%} errors.")
+
+
+def save_comparison_csv(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    keys = [key for key in results[0] if key not in ("outputs", "errors")] if results else []
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=keys, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Model comparison saved to {path}")
@@ -0,0 +1,28 @@
+"""
+Which model actually answered a request.
+
+The key pool, hedging and routing wrappers tag each response with the name of the model that
+produced it, so metadata such as the case store's model column records "gemini-1.5-flash"
+rather than "PooledModel" or "HedgedModel", or the strong model for a fast-tier answer.
+"""
+
+
+def model_name(model):
+    """Plain name of a model object, e.g. "gemini-1.5-pro-latest" for models/gemini-1.5-pro-latest."""
+    name = getattr(model, "model_name", None) or type(model).__name__
+    return name.split("/")[-1]
+
+
+def tag_response(response, name):
+    """Records `name` on the response unless an inner wrapper already recorded a more specific one."""
+    if getattr(response, "answered_by", None) is None:
+        try:
+            response.answered_by = name
+        except AttributeError:
+            pass  # Responses that do not take attributes fall back to the wrapper's name
+    return response
+
+
+def answered_by(response, model):
+    """Name of the model that produced `response`, falling back to the name of `model`."""
+    return getattr(response, "answered_by", None) or model_name(model)
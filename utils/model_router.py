@@ -0,0 +1,127 @@
+"""
+Complexity-based routing of specs between a fast model and a strong model.
+
+Each spec gets a complexity score in [0, 1] from its type (security and accessibility cases
+need the most reasoning, cross-browser variants the least), the number of steps it asks for
+and how many distinct entities the analysed story contains.  Specs below the threshold go to
+the fast tier, the rest to the strong tier.  A fast-tier answer that fails validation (more
+than `max_missing` of the required sections absent) is escalated to the strong model once.
+Per tier the router tracks requests, latency, escalations and section completeness, and
+estimates the throughput gained over sending everything to the strong model.
+"""
+import re
+import threading
+import time
+
+from utils.model_names import model_name, tag_response
+from utils.section_repair import SECTIONS, find_missing_sections
+
+# Base complexity by spec type prefix (first match wins)
+TYPE_COMPLEXITY = [
+    ("Security", 0.8),
+    ("Accessibility", 0.7),
+    ("Performance", 0.5),
+    ("Edge Case", 0.4),
+    ("Functional - Negative", 0.35),
+    ("Functional", 0.25),
+    ("Cross-Browser", 0.1),
+]
+DEFAULT_COMPLEXITY = 0.5
+STEP_WEIGHT = 0.05  # Per step beyond the first, capped at MAX_STEP_BONUS
+MAX_STEP_BONUS = 0.2
+ENTITY_WEIGHT = 0.005  # Per distinct story entity, capped at MAX_ENTITY_BONUS
+MAX_ENTITY_BONUS = 0.15
+
+
+def count_steps(steps):
+    """Counts numbered items, or sentences when the steps are written as prose."""
+    numbered = re.findall(r"(?m)^\s*\d+[.)]\s", steps)
+    if numbered:
+        return len(numbered)
+    return len([sentence for sentence in re.split(r"[.;]\s+|\n", steps) if sentence.strip(" .")])
+
+
+def story_entity_count(nlp_doc):
+    """Distinct entities in a spaCy Doc or in a streaming summary ({"entities": [((text, label), count)]})."""
+    if nlp_doc is None:
+        return 0
+    if isinstance(nlp_doc, dict):
+        return len({entity for entity, _ in nlp_doc.get("entities", [])})
+    return len({(ent.text.lower(), ent.label_) for ent in getattr(nlp_doc, "ents", ())})
+
+
+def complexity_score(spec, story_entities=0):
+    base = DEFAULT_COMPLEXITY
+    for prefix, score in TYPE_COMPLEXITY:
+        if spec["type"].startswith(prefix):
+            base = score
+            break
+    steps = count_steps(spec.get("steps", ""))
+    return min(1.0, base + min(MAX_STEP_BONUS, STEP_WEIGHT * max(0, steps - 1))
+               + min(MAX_ENTITY_BONUS, ENTITY_WEIGHT * story_entities))
+
+
+class ModelRouter:
+    """Sends simple specs to `fast_model` and complex ones to `strong_model`, escalating failed validations."""
+
+    def __init__(self, fast_model, strong_model, threshold=0.5, max_missing=2, rate_limiter=None):
+        self.models = {"fast": fast_model, "strong": strong_model}
+        self.threshold = threshold
+        self.max_missing = max_missing
+        self.rate_limiter = rate_limiter
+        self.story_entities = 0
+        self._lock = threading.Lock()
+        self.stats = {tier: {"requests": 0, "seconds": 0.0, "specs": 0, "complete": 0.0, "escalated": 0}
+                      for tier in self.models}
+
+    def set_story(self, nlp_doc):
+        self.story_entities = story_entity_count(nlp_doc)
+
+    def route(self, spec):
+        """Returns (tier, score) for a spec."""
+        score = complexity_score(spec, self.story_entities)
+        return ("strong" if score >= self.threshold else "fast"), score
+
+    def _call(self, tier, prompt):
+        start = time.monotonic()
+        response = self.models[tier].generate_content(prompt)
+        with self._lock:
+            self.stats[tier]["requests"] += 1
+            self.stats[tier]["seconds"] += time.monotonic() - start
+        return tag_response(response, model_name(self.models[tier]))
+
+    def generate_content(self, spec, prompt):
+        """Generates with the spec's tier; an invalid fast-tier answer is retried on the strong model."""
+        tier, score = self.route(spec)
+        print(f"Routing {spec['type']} (complexity {score:.2f}) to the {tier} model")
+        response = self._call(tier, prompt)
+        missing = find_missing_sections(response.text or "")
+        if tier == "fast" and len(missing) > self.max_missing:
+            print(f"Fast model answer is missing {len(missing)} sections; escalating to the strong model")
+            with self._lock:
+                self.stats["fast"]["escalated"] += 1
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            tier = "strong"
+            response = self._call(tier, prompt)
+            missing = find_missing_sections(response.text or "")
+        with self._lock:
+            self.stats[tier]["specs"] += 1
+            self.stats[tier]["complete"] += 1 - len(missing) / len(SECTIONS)
+        return response
+
+    def report(self):
+        """Prints quality per tier and the throughput gain over routing everything to the strong model."""
+        for tier, stats in self.stats.items():
+            latency = stats["seconds"] / stats["requests"] if stats["requests"] else 0.0
+            completeness = stats["complete"] / stats["specs"] if stats["specs"] else 0.0
+            escalated = f", {stats['escalated']} escalated" if tier == "fast" else ""
+            print(f"Routing {tier}: {stats['specs']} specs, {stats['requests']} requests, "
+                  f"{latency:.1f}s mean latency, {completeness:.0%} section completeness{escalated}")
+        strong = self.stats["strong"]
+        specs = sum(stats["specs"] for stats in self.stats.values())
+        spent = sum(stats["seconds"] for stats in self.stats.values())
+        if strong["requests"] and spent:
+            all_strong = specs * strong["seconds"] / strong["requests"]
+            print(f"Estimated throughput gain over the strong model alone: {all_strong / spent:.2f}x "
+                  f"({spent:.0f}s instead of ~{all_strong:.0f}s of model time)")
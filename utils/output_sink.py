@@ -0,0 +1,125 @@
+"""
+Single-writer output sink for generated test cases.
+
+One sink stays open for the whole run.  Generators hand it lists of test cases from any
+thread; a dedicated writer thread appends them in order to a temporary file in the target
+directory through a large write buffer, numbering cases globally.  Closing the sink flushes,
+optionally fsyncs, and atomically renames the temporary file over the final path, so a crash
+mid-run never leaves a truncated file behind.
+"""
+import os
+import queue
+import tempfile
+import threading
+
+from utils.profiling import stage_timer
+
+FSYNC_POLICIES = ("never", "close", "batch")
+SEPARATOR = "\n\n" + "-" * 80 + "\n\n"
+
+
+class TestCaseSink:
+    """Buffered, thread-safe writer that finalizes `filepath` atomically on close."""
+
+    __test__ = False  # Not a pytest test class despite the name
+
+    def __init__(self, filepath, buffer_size=1024 * 1024, fsync="close"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.filepath = filepath
+        self.fsync = fsync
+        self.count = 0
+        directory = os.path.dirname(filepath) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.", suffix=".tmp",
+                                               dir=directory)
+        os.chmod(self._temp_path, 0o644)  # mkstemp creates owner-only files
+        self._file = os.fdopen(fd, "w", encoding="utf-8", buffering=buffer_size)
+        self._queue = queue.Queue()
+        self._error = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="test-case-sink", daemon=True)
+        self._writer.start()
+
+    def write(self, test_cases):
+        """Queues a batch of test cases; each batch is written contiguously, in arrival order."""
+        if self._closed:
+            raise ValueError("Cannot write to a closed TestCaseSink")
+        self._queue.put(list(test_cases))
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error:
+                continue  # Keep draining so producers never block on a failed sink
+            try:
+                with stage_timer("write"):
+                    for test_case in batch:
+                        self.count += 1
+                        self._file.write(f"## Test Case {self.count}\n\n")
+                        self._file.write(test_case)
+                        self._file.write(SEPARATOR)
+                    if self.fsync == "batch":
+                        self._sync()
+            except Exception as e:
+                self._error = e
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _stop_writer(self):
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def close(self):
+        """Flushes pending batches and atomically replaces `filepath` with the new output."""
+        if self._closed:
+            return
+        self._stop_writer()
+        if self._error:
+            self._discard()
+            raise self._error
+        if self.fsync != "never":
+            self._sync()
+        self._file.close()
+        os.replace(self._temp_path, self.filepath)
+        if self.fsync != "never":
+            self._sync_directory()
+        print(f"Test cases saved to {self.filepath} ({self.count} test cases)")
+
+    def abort(self):
+        """Stops writing and removes the temporary file, leaving any previous output untouched."""
+        if not self._closed:
+            self._stop_writer()
+        self._discard()
+
+    def _discard(self):
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def _sync_directory(self):
+        # Persist the rename itself; not supported on every platform (e.g. Windows)
+        try:
+            fd = os.open(os.path.dirname(self.filepath) or ".", os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,171 @@
+"""
+Compiles structured login/logout test cases into Playwright test functions and runs them
+sharded across browsers and worker processes.
+
+Each numbered step of a case ("1. Navigate to `Config.BASE_URL`. 2. Enter valid
+credentials. ...") is mapped to a Playwright call, and the whole case becomes the source of a
+pytest-playwright style `test_*(page, base_url)` function.  The same source is written to disk
+for pytest and executed directly by the runner: every worker launches its browser once and
+reuses one browser context for all of its cases, clearing cookies between them.
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.login_app import INVALID_USER, USERS
+
+BROWSERS = ("chromium", "firefox", "webkit")
+
+# (step pattern, source lines); checked in order, first match wins
+STEP_TEMPLATES = [
+    (r"navigate", ['page.goto(f"{{base_url}}/login")']),
+    (r"invalid credentials", ['page.fill("#username", {invalid_username!r})',
+                              'page.fill("#password", {invalid_password!r})']),
+    (r"empty", ['page.fill("#username", "")', 'page.fill("#password", "")']),
+    (r"valid credentials", ['page.fill("#username", {valid_username!r})',
+                            'page.fill("#password", {valid_password!r})']),
+    (r"click login", ['page.click("#login-button")', 'page.wait_for_load_state()']),
+    (r"verify dashboard", ['expect(page).to_have_url(re.compile(r"/dashboard$"))']),
+    (r"click logout", ['page.click("#logout-button")', 'page.wait_for_load_state()']),
+    (r"login page", ['expect(page).to_have_url(re.compile(r"/login$"))']),
+]
+
+
+def split_steps(steps):
+    """Splits "1. Do this. 2. Do that." into individual steps."""
+    return [step.strip() for step in re.split(r"(?:^|\s)\d+\.\s+", steps) if step.strip()]
+
+
+def function_name(case_id):
+    return "test_" + re.sub(r"\W+", "_", case_id).strip("_").lower()
+
+
+def compile_case(case_id, description, steps, expected_result, credentials=None):
+    """Returns the Python source of one Playwright test function for a structured case."""
+    credentials = credentials or {
+        "valid_username": next(iter(USERS)),
+        "valid_password": USERS[next(iter(USERS))],
+        "invalid_username": INVALID_USER[0],
+        "invalid_password": INVALID_USER[1],
+    }
+    body = []
+    for step in split_steps(steps):
+        for pattern, lines in STEP_TEMPLATES:
+            if re.search(pattern, step, re.IGNORECASE):
+                body.append(f"# {step}")
+                body.extend(line.format(**credentials) for line in lines)
+                break
+        else:
+            body.append(f"# Not automated: {step}")
+
+    # Check the final page from the expected result unless the steps already ended on a check
+    if not body or not body[-1].startswith("expect("):
+        final_page = re.findall(r"dashboard|login page", expected_result, re.IGNORECASE)
+        if final_page:
+            path = "/dashboard" if final_page[-1].lower() == "dashboard" else "/login"
+            body.append(f"# Expected: {expected_result}")
+            body.append(f'expect(page).to_have_url(re.compile(r"{path}$"))')
+
+    lines = [f"def {function_name(case_id)}(page, base_url):", f'    """{description}"""']
+    lines.extend(f"    {line}" for line in body)
+    return "\n".join(lines) + "\n"
+
+
+def compile_cases(cases, credentials=None):
+    """
+    Compiles (case_id, description, preconditions, steps, expected_result, priority) tuples
+    into one importable test module and returns its source.
+    """
+    header = ['"""',
+              "Generated from the structured login/logout test cases. Do not edit by hand.",
+              "",
+              "Run with pytest-playwright, passing the app under test: pytest <this file> --base-url http://host:port",
+              '"""',
+              "import re", "", "from playwright.sync_api import expect", "", "", ""]
+    functions = [compile_case(case[0], case[1], case[3], case[4], credentials) for case in cases]
+    return "\n".join(header) + "\n\n".join(functions)
+
+
+def write_test_module(source, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    return path
+
+
+def _run_shard(browser_name, source, case_names, base_url, headless=True):
+    """Worker process: one browser launch and one reused context for every case in the shard."""
+    from playwright.sync_api import sync_playwright
+
+    namespace = {}
+    exec(compile(source, "<generated login tests>", "exec"), namespace)
+    results = []
+    with sync_playwright() as playwright:
+        launch_start = time.monotonic()
+        browser = getattr(playwright, browser_name).launch(headless=headless)
+        context = browser.new_context()
+        page = context.new_page()
+        launch_seconds = time.monotonic() - launch_start
+        for name in case_names:
+            context.clear_cookies()
+            start = time.monotonic()
+            try:
+                namespace[name](page, base_url)
+                passed, error = True, None
+            except Exception as e:
+                passed, error = False, f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            results.append({"browser": browser_name, "case": name, "passed": passed, "error": error,
+                            "seconds": time.monotonic() - start})
+        context.close()
+        browser.close()
+    return {"browser": browser_name, "launch_seconds": launch_seconds, "results": results}
+
+
+def run_cases(source, base_url, browsers=BROWSERS, workers_per_browser=2, headless=True):
+    """Runs every compiled test function on every browser, sharded over worker processes."""
+    names = re.findall(r"^def (test_\w+)\(", source, re.MULTILINE)
+    shards = []
+    for browser_name in browsers:
+        for worker in range(min(workers_per_browser, len(names))):
+            shard = names[worker::workers_per_browser]
+            if shard:
+                shards.append((browser_name, source, shard, base_url, headless))
+
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        shard_results = list(executor.map(_run_shard, *zip(*shards)))
+    return summarize(shard_results, time.monotonic() - start)
+
+
+def summarize(shard_results, wall_seconds):
+    """Aggregates shard results into per-browser pass/fail counts and timings."""
+    browsers = {}
+    for shard in shard_results:
+        summary = browsers.setdefault(shard["browser"], {"passed": 0, "failed": 0, "case_seconds": 0.0,
+                                                         "launch_seconds": 0.0, "results": []})
+        summary["launch_seconds"] = max(summary["launch_seconds"], shard["launch_seconds"])
+        for result in shard["results"]:
+            summary["passed" if result["passed"] else "failed"] += 1
+            summary["case_seconds"] += result["seconds"]
+            summary["results"].append(result)
+    return {"wall_seconds": wall_seconds, "browsers": browsers}
+
+
+def save_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_report(report):
+    print(f"{'Browser':<10} {'Passed':>6} {'Failed':>6} {'Launch s':>9} {'Cases s':>8}")
+    for name, summary in report["browsers"].items():
+        print(f"{name:<10} {summary['passed']:>6} {summary['failed']:>6} "
+              f"{summary['launch_seconds']:>9.2f} {summary['case_seconds']:>8.2f}")
+        for result in summary["results"]:
+            if not result["passed"]:
+                print(f"  FAILED {result['case']}: {result['error']}")
+    print(f"Wall time: {report['wall_seconds']:.2f}s")
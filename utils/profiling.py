@@ -0,0 +1,183 @@
+"""
+Opt-in cProfile and tracemalloc hooks for the pipeline entry points.
+
+Set PROFILE=1 (or pass --profile where a script offers it) and every function decorated with
+@profiled writes, per call, into logs/:
+
+    <stage>_<run>.prof       cProfile stats (snakeviz, flameprof, gprof2dot)
+    <stage>_<run>.collapsed  folded stacks in microseconds (flamegraph.pl, speedscope, inferno)
+    <stage>_<run>_memory.txt peak traced memory and the allocation sites still live at the end
+    <stage>_<run>_stages.txt per-stage wall time from `stage_timer` blocks, on every thread
+
+where <run> is the timestamp, process id and a per-process call number.
+
+cProfile only sees the calling thread, so work handed to thread pools (the Gemini requests)
+shows up as time spent waiting on their futures.  Wrapping the pipeline steps in
+`with stage_timer("..."):` times them on whichever thread runs them, and the totals are
+reported next to the cProfile output.  A profiled stage called from inside another one is
+covered by the outer profile instead of starting its own.
+"""
+import contextlib
+import cProfile
+import functools
+import itertools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+LOGS_DIR = "logs"
+
+_active = threading.local()
+_run_numbers = itertools.count(1)  # Keeps calls in the same second (and process) from sharing a file
+_stage_lock = threading.Lock()
+_stage_times = {}  # Pipeline stage -> [calls, seconds], summed over every thread
+
+
+def profiling_enabled():
+    return os.getenv("PROFILE") == "1"
+
+
+def enable_profiling():
+    """Turns profiling on for the rest of the run (what --profile does)."""
+    os.environ["PROFILE"] = "1"
+
+
+@contextlib.contextmanager
+def stage_timer(stage):
+    """Times one pipeline step on whichever thread runs it; totals are reported with the profile."""
+    if not profiling_enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stage_lock:
+            totals = _stage_times.setdefault(stage, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+
+
+def _take_stage_times():
+    with _stage_lock:
+        stage_times = dict(_stage_times)
+        _stage_times.clear()
+    return stage_times
+
+
+def write_stage_report(stage_times, elapsed, path):
+    """
+    Writes calls, total and mean time per stage.  Stages on concurrent threads overlap, so
+    their shares of the wall time can add up to more than 100%.
+    """
+    lines = [f"{'Stage':<20} {'Calls':>6} {'Total s':>9} {'Mean ms':>9} {'Of wall':>8}"]
+    for stage, (calls, seconds) in sorted(stage_times.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{stage:<20} {calls:>6} {seconds:>9.2f} {seconds / calls * 1000:>9.1f} "
+                     f"{seconds / elapsed if elapsed else 0:>8.0%}")
+    report = "\n".join(lines)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"Wall time {elapsed:.2f} seconds\n{report}\n")
+    return report
+
+
+def _label(func):
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})" if line else name
+
+
+def write_collapsed_stacks(stats, path, max_depth=64):
+    """
+    Writes cProfile stats as folded stacks.  cProfile only records caller/callee pairs, so a
+    callee's time is split between its callers in proportion to the time each call edge took.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+    roots = [func for func, entry in stats.stats.items() if not entry[4]]
+
+    lines = []
+
+    def walk(func, stack, share):
+        _, _, own_time, total_time, _ = stats.stats[func]
+        stack = stack + [_label(func).replace(";", ":")]
+        micros = int(own_time * share * 1_000_000)
+        if micros:
+            lines.append(f"{';'.join(stack)} {micros}")
+        if len(stack) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            callee_total = stats.stats[callee][3]
+            if callee_total <= 0 or _label(callee).replace(";", ":") in stack:
+                continue
+            child_share = share * min(1.0, edge_time / callee_total)
+            if stats.stats[callee][3] * child_share >= 1e-6:
+                walk(callee, stack, child_share)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+
+
+def write_memory_report(snapshot, peak, path, top=25):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+        file.write(f"Top {top} allocation sites by size:\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            file.write(f"{stat}\n")
+
+
+def profiled(stage=None, top=25):
+    """Decorator that profiles each call of the wrapped function when profiling is enabled."""
+
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled() or getattr(_active, "stage", None):
+                return func(*args, **kwargs)
+
+            os.makedirs(LOGS_DIR, exist_ok=True)
+            base = os.path.join(LOGS_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_run_numbers)}")
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            _take_stage_times()  # Drop anything timed outside a profile
+            profiler = cProfile.Profile()
+            _active.stage = name
+            start = time.perf_counter()
+            try:
+                return profiler.runcall(func, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _active.stage = None
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+
+                stats = pstats.Stats(profiler)
+                stats.dump_stats(base + ".prof")
+                write_collapsed_stacks(stats, base + ".collapsed")
+                write_memory_report(snapshot, peak, base + "_memory.txt", top)
+                stage_times = _take_stage_times()
+                print(f"Profiled {name} in {elapsed:.2f} seconds (peak memory {peak / 1024 / 1024:.1f} MiB). "
+                      f"Stats written to {base}.prof, .collapsed, _memory.txt"
+                      f"{' and _stages.txt' if stage_times else ''}")
+                if stage_times:
+                    print(write_stage_report(stage_times, elapsed, base + "_stages.txt"))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,64 @@
+"""
+Sliding-window rate limiter shared by every Gemini request made during a run.
+
+The Gemini free tier is metered per minute, so the limiter keeps the timestamps of the
+requests made in the last window and blocks (or refuses, for optional extra requests such
+as hedges) once the budget for that window is spent.
+"""
+import sys
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Allows at most `requests_per_minute` requests in any rolling `window` seconds."""
+
+    def __init__(self, requests_per_minute=1, window=60.0):
+        self.requests_per_minute = requests_per_minute
+        self.window = window
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._calls and now - self._calls[0] >= self.window:
+            self._calls.popleft()
+
+    def remaining(self):
+        """Returns how many requests can still be made in the current window."""
+        with self._lock:
+            self._prune(time.monotonic())
+            return max(0, self.requests_per_minute - len(self._calls))
+
+    def try_acquire(self):
+        """Spends one request from the budget if available, without waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._calls) < self.requests_per_minute:
+                self._calls.append(now)
+                return True
+            return False
+
+    def acquire(self):
+        """Spends one request from the budget, sleeping until the window has room."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+                if len(self._calls) < self.requests_per_minute:
+                    self._calls.append(now)
+                    return
+                wait = self._calls[0] + self.window - now
+            print(f"Rate limit reached.  Sleeping for {wait:.0f} seconds...", file=sys.stderr)
+            time.sleep(wait)
+
+
+def split_budget(requests_per_minute, parts):
+    """
+    Splits a per-minute budget into whole shares for up to `parts` processes that never add up
+    to more than the budget.  Returns fewer shares when the budget cannot give each one a request.
+    """
+    parts = max(1, min(parts, requests_per_minute))
+    share, extra = divmod(requests_per_minute, parts)
+    return [share + (1 if i < extra else 0) for i in range(parts)]
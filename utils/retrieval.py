@@ -0,0 +1,93 @@
+"""
+Offline retrieval over user-story text.
+
+The story is split into chunks at section headers (short lines ending in a colon, such as
+"Acceptance Criteria:" or "Cross-Browser Testing:") and indexed with BM25.  The BM25 weights
+are precomputed as a NumPy matrix, so scoring a query is a single column gather and sum.
+Prompts can then carry only the few chunks relevant to a spec instead of the whole story.
+"""
+import re
+
+import numpy as np
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOP_WORDS]
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def is_section_header(line):
+    line = line.strip()
+    return line.endswith(":") and len(line) <= 80
+
+
+def chunk_story(text, max_chars=1200):
+    """Splits a story into section-sized chunks, each starting with its header line."""
+    chunks = []
+    current = []
+    size = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if current and (is_section_header(line) or size + len(line) > max_chars):
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class BM25Index:
+    """In-memory BM25 index over a list of text chunks."""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = list(chunks)
+        self.vocabulary = {}
+        tokenized = [tokenize(chunk) for chunk in self.chunks]
+        for tokens in tokenized:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        tf = np.zeros((len(self.chunks), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(tokenized):
+            if tokens:
+                np.add.at(tf[row], [self.vocabulary[token] for token in tokens], 1.0)
+
+        lengths = tf.sum(axis=1, keepdims=True)
+        average_length = lengths.mean() if len(self.chunks) else 0.0
+        document_frequency = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(self.chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = k1 * (1 - b + b * lengths / max(average_length, 1e-9))
+        self.weights = (idf * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+
+    def scores(self, query):
+        """Returns the BM25 score of every chunk for `query`."""
+        ids = [self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary]
+        if not ids:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.weights[:, ids].sum(axis=1)
+
+    def top_k(self, query, k=3):
+        """Returns the indices of the k best-matching chunks, best first, skipping zero scores."""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [int(i) for i in best if scores[i] > 0]
+
+    def context_for(self, query, k=3):
+        """Joins the top-k chunks for `query` back together in story order."""
+        selected = sorted(self.top_k(query, k)) or list(range(min(k, len(self.chunks))))
+        return "\n\n".join(self.chunks[i] for i in selected)
@@ -0,0 +1,168 @@
+"""
+Section-level validation and repair of generated test cases.
+
+Each response is parsed into the eleven sections the prompt asks for.  When some are missing
+or empty, only those sections are requested in a short follow-up prompt (the spec plus the
+case's description and steps, not the whole story or case), and the answer is merged back in
+at the right position.  Repairs therefore cost a fraction of regenerating the case.
+"""
+import re
+import threading
+
+from utils.retrieval import estimate_tokens
+
+SECTIONS = [
+    "Test Case ID",
+    "Test Case Type",
+    "Description",
+    "Feature",
+    "Preconditions",
+    "Test Data",
+    "Steps",
+    "Expected Result",
+    "Postconditions",
+    "Pass/Fail Criteria",
+    "Notes",
+]
+
+# Heading spellings the model uses for some sections
+ALIASES = {
+    "type": "Test Case Type",
+    "test type": "Test Case Type",
+    "test steps": "Steps",
+    "expected results": "Expected Result",
+    "post-conditions": "Postconditions",
+    "pre-conditions": "Preconditions",
+    "pass / fail criteria": "Pass/Fail Criteria",
+    "pass/fail criterion": "Pass/Fail Criteria",
+    "additional notes": "Notes",
+}
+
+_NAMES = {name.lower(): name for name in SECTIONS}
+_NAMES.update(ALIASES)
+_HEADING = re.compile(
+    r"^[\s>*#|\-]*(?:\d+\.\s*)?(?:\*\*|__)?\s*("
+    + "|".join(re.escape(name) for name in sorted(_NAMES, key=len, reverse=True))
+    + r")(?:\s*(?:\*\*|__)\s*:?|\s*:|\s*\||\s*$)\s*(?:\*\*|__)?\s*\|?(.*)$",
+    re.IGNORECASE,
+)
+_EMPTY_CONTENT = re.compile(r"^[\s*_|:\-#.]*(?:tbd|todo|\.\.\.)?[\s*_|:\-#.]*$", re.IGNORECASE)
+
+
+def parse_sections(text):
+    """Returns {section: (first_line, end_line, content)} for every section heading found in text."""
+    lines = text.splitlines()
+    headings = []
+    for index, line in enumerate(lines):
+        match = _HEADING.match(line)
+        if match:
+            headings.append((index, _NAMES[match.group(1).lower()], match.group(2)))
+
+    sections = {}
+    for position, (start, name, inline) in enumerate(headings):
+        end = headings[position + 1][0] if position + 1 < len(headings) else len(lines)
+        content = "\n".join([inline.strip(" |")] + lines[start + 1:end]).strip()
+        sections.setdefault(name, (start, end, content))
+    return sections
+
+
+def find_missing_sections(text):
+    """Lists the sections that are absent or have no content, in prompt order."""
+    sections = parse_sections(text)
+    return [name for name in SECTIONS
+            if name not in sections or _EMPTY_CONTENT.match(sections[name][2])]
+
+
+def build_repair_prompt(spec, test_case, missing):
+    """A short prompt asking only for the missing sections of an existing test case."""
+    sections = parse_sections(test_case)
+    known = "\n".join(f"**{name}:** {sections[name][2]}" for name in ("Test Case ID", "Description", "Steps")
+                      if name in sections and name not in missing)
+    wanted = "\n".join(f"**{name}:**" for name in missing)
+    return f"""
+        A test case generated for the specification below is missing some sections.
+        Specification: {spec['type']} - {spec['description']}
+        Preconditions: {spec['preconditions']}
+        Expected result: {spec['expected_result']}
+
+        {known}
+
+        Write only these sections, each starting with its bold heading exactly as shown, and nothing else:
+        {wanted}
+    """
+
+
+def merge_sections(test_case, repair_text, missing):
+    """Inserts the repaired sections into the test case, replacing empty headings in place."""
+    repaired = parse_sections(repair_text)
+    lines = test_case.splitlines()
+    filled = []
+    # Work bottom-up so earlier line numbers stay valid
+    for name in reversed(missing):
+        if name not in repaired or _EMPTY_CONTENT.match(repaired[name][2]):
+            continue
+        block = [f"**{name}:** {repaired[name][2]}"] + [""]
+        sections = parse_sections("\n".join(lines))
+        if name in sections:
+            start, end, _ = sections[name]
+        else:
+            later = [sections[other][0] for other in SECTIONS[SECTIONS.index(name) + 1:] if other in sections]
+            start = end = min(later) if later else len(lines)
+            if start == len(lines):
+                block = [""] + block[:-1]
+        lines[start:end] = block
+        filled.append(name)
+    return "\n".join(lines).strip(), list(reversed(filled))
+
+
+class SectionRepairer:
+    """Validates generated test cases, repairs missing sections and tallies the tokens involved."""
+
+    def __init__(self, max_rounds=1):
+        self.max_rounds = max_rounds
+        self.cases = 0
+        self.cases_repaired = 0
+        self.sections_repaired = 0
+        self.sections_unrepaired = 0
+        self.generation_tokens = 0
+        self.repair_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_generation(self, prompt, response):
+        with self._lock:
+            self.cases += 1
+            self.generation_tokens += estimate_tokens(prompt) + estimate_tokens(response)
+
+    def repair(self, spec, test_case, generate):
+        """
+        Returns the test case with missing sections filled in.  `generate(prompt)` sends one
+        follow-up request and returns its text (or None on failure).
+        """
+        missing = find_missing_sections(test_case)
+        repaired_any = False
+        for _ in range(self.max_rounds):
+            if not missing:
+                break
+            print(f"Test case is missing {len(missing)} section(s): {', '.join(missing)}. Requesting only those...")
+            prompt = build_repair_prompt(spec, test_case, missing)
+            response = generate(prompt)
+            with self._lock:
+                self.repair_tokens += estimate_tokens(prompt) + estimate_tokens(response or "")
+            if not response:
+                break
+            test_case, filled = merge_sections(test_case, response, missing)
+            repaired_any = repaired_any or bool(filled)
+            with self._lock:
+                self.sections_repaired += len(filled)
+            missing = find_missing_sections(test_case)
+
+        with self._lock:
+            self.cases_repaired += repaired_any
+            self.sections_unrepaired += len(missing)
+        return test_case
+
+    def report(self):
+        share = self.repair_tokens / self.generation_tokens if self.generation_tokens else 0.0
+        print(f"Section repair: {self.sections_repaired} section(s) repaired in {self.cases_repaired} of "
+              f"{self.cases} test case(s), {self.sections_unrepaired} still missing. Repairs used about "
+              f"{self.repair_tokens} tokens ({share:.1%} of the {self.generation_tokens} spent on full generations).")
@@ -0,0 +1,273 @@
+"""
+Concurrent security fuzzing for the "Security - SQL Injection" and "Security - Brute Force" specs.
+
+Payloads are sent by a fixed number of async workers over the keep-alive connection pool from
+utils.load_generator.  Every response is classified, and anything a secure login must never do
+counts as an anomaly:
+
+    bypass          a payload logged in (303 to the dashboard)
+    server error    a 5xx status
+    error leakage   a database or stack-trace signature in the body
+    reflected       the raw payload echoed back unescaped
+    timing          a response far slower than the run's median (time-based injection)
+    unexpected      any other status than a normal rejection
+
+The brute-force run replays credential-stuffing sequences against one account, then records
+when lockout (423) or rate limiting (429) starts and whether the correct password is still
+refused afterwards.  Each run produces a report dict carrying the spec it was run for.
+"""
+import asyncio
+import itertools
+import json
+import os
+import re
+import statistics
+import time
+from urllib.parse import quote, urlencode
+
+from utils.load_generator import HttpConnectionPool, LatencyHistogram
+from utils.login_app import USERS
+
+SQL_INJECTION_PAYLOADS = [
+    "' OR '1'='1", "' OR '1'='1' --", "' OR '1'='1' /*", "' OR 1=1--", "\" OR \"1\"=\"1", "\" OR 1=1--",
+    "admin' --", "admin' #", "admin'/*", "') OR ('1'='1", "')) OR (('1'='1", "' OR 'x'='x",
+    "1' OR '1'='1' LIMIT 1 --", "' UNION SELECT NULL--", "' UNION SELECT NULL,NULL--",
+    "' UNION SELECT username, password FROM users--", "'; DROP TABLE users; --", "'; EXEC xp_cmdshell('dir'); --",
+    "' AND 1=CONVERT(int, @@version)--", "' AND extractvalue(1, concat(0x7e, version()))--",
+    "' OR SLEEP(5)--", "'; WAITFOR DELAY '0:0:5'--", "' OR pg_sleep(5)--", "1 AND 1=1", "1' AND '1'='2",
+    "' OR ''='", "%27%20OR%201%3D1--", "' || '1'='1", "'; SELECT * FROM information_schema.tables--",
+    "<script>alert(1)</script>' OR 1=1--",
+]
+
+# Successful logins redirect; everything else a secure app may answer with
+EXPECTED_STATUSES = {400, 401, 403, 423, 429}
+ERROR_SIGNATURES = re.compile(
+    r"sql syntax|sqlite|sqlstate|ora-\d{5}|mysql|psycopg|postgresql|odbc|unclosed quotation|"
+    r"traceback \(most recent call last\)|syntax error|exception in thread",
+    re.IGNORECASE,
+)
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+COMMON_PASSWORDS = [
+    "123456", "password", "123456789", "12345678", "qwerty", "abc123", "111111", "letmein", "welcome",
+    "admin", "iloveyou", "monkey", "dragon", "sunshine", "password1", "Password123", "football", "master",
+]
+
+
+def _mutations(payload):
+    yield payload
+    yield payload.upper()
+    yield payload.replace(" ", "/**/")
+    yield payload.replace(" ", "\t")
+    yield payload.replace("--", "#")
+    yield quote(payload)
+    yield payload + " "
+    yield " " + payload
+
+
+def generate_payloads(count=None, base=None, usernames=None):
+    """
+    Expands the base corpus with case, whitespace, comment and encoding mutations, each also
+    prefixed with known usernames.  Returns `count` payloads (cycling if needed) or all of them.
+    """
+    prefixes = [""] + list(usernames if usernames is not None else USERS)
+    payloads = []
+    seen = set()
+    for payload in base or SQL_INJECTION_PAYLOADS:
+        for prefix in prefixes:
+            for mutated in _mutations(prefix + payload):
+                if mutated not in seen:
+                    seen.add(mutated)
+                    payloads.append(mutated)
+    if count is None:
+        return payloads
+    return list(itertools.islice(itertools.cycle(payloads), count))
+
+
+def classify_response(payload, status, body, seconds, timing_limit):
+    """Returns the anomaly kind for one response, or None if it was handled securely."""
+    text = body.decode("utf-8", "replace")
+    if status == 303:
+        return "bypass"
+    if status >= 500:
+        return "server error"
+    if ERROR_SIGNATURES.search(text) and not ERROR_SIGNATURES.search(payload):
+        return "error leakage"
+    if any(c in payload for c in "<>\"'") and len(payload) > 3 and payload in text:
+        return "reflected"
+    if timing_limit is not None and seconds > timing_limit:
+        return "timing"
+    if status not in EXPECTED_STATUSES:
+        return "unexpected"
+    return None
+
+
+async def _run_requests(base_url, forms, concurrency, pool_size=None):
+    """Posts each form to /login with `concurrency` workers; returns [(index, status, body, seconds, error)]."""
+    pool = HttpConnectionPool(base_url, pool_size or concurrency)
+    results = []
+    queue = iter(enumerate(forms))
+
+    async def worker():
+        for index, form in queue:
+            start = time.monotonic()
+            try:
+                status, _, body = await pool.request("POST", "/login", urlencode(form).encode(), FORM_HEADERS)
+                results.append((index, status, body, time.monotonic() - start, None))
+            except Exception as e:
+                results.append((index, None, b"", time.monotonic() - start, str(e)))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await pool.close()
+    return results
+
+
+def _spec_fields(spec):
+    return {key: spec.get(key) for key in ("type", "description", "expected_result")}
+
+
+async def fuzz_sql_injection_async(base_url, spec, payloads=None, concurrency=200, password=None,
+                                   timing_factor=20.0, min_timing_seconds=1.0):
+    payloads = payloads if payloads is not None else generate_payloads()
+    password = password or next(iter(USERS.values()))
+    forms = [{"username": payload, "password": password} for payload in payloads]
+    start = time.monotonic()
+    results = await _run_requests(base_url, forms, concurrency)
+    elapsed = time.monotonic() - start
+
+    histogram = LatencyHistogram()
+    for _, status, _, seconds, error in results:
+        if error is None:
+            histogram.record(seconds)
+    median = statistics.median(histogram.samples) if histogram.samples else 0.0
+    timing_limit = max(min_timing_seconds, median * timing_factor)
+
+    statuses = {}
+    anomalies = []
+    errors = 0
+    for index, status, body, seconds, error in sorted(results, key=lambda result: result[0]):
+        if error is not None:
+            errors += 1
+            continue
+        statuses[status] = statuses.get(status, 0) + 1
+        kind = classify_response(payloads[index], status, body, seconds, timing_limit)
+        if kind:
+            anomalies.append({"kind": kind, "payload": payloads[index], "status": status,
+                              "seconds": round(seconds, 4)})
+
+    passed = not anomalies and errors == 0
+    if passed:
+        reason = f"All {len(payloads)} payloads were rejected securely"
+    else:
+        kinds = sorted({anomaly["kind"] for anomaly in anomalies})
+        reason = f"{len(anomalies)} anomalous responses ({', '.join(kinds) or 'none'}), {errors} connection errors"
+    return {
+        "spec": _spec_fields(spec),
+        "passed": passed,
+        "reason": reason,
+        "requests": len(results),
+        "connection_errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "anomalies": anomalies,
+        "seconds": elapsed,
+        "per_minute": len(results) / elapsed * 60 if elapsed else 0.0,
+        "p50": histogram.percentile(50),
+        "p99": histogram.percentile(99),
+        "timing_limit": timing_limit,
+    }
+
+
+def credential_stuffing_sequence(username, attempts=50, passwords=None, correct_password=None):
+    """Wrong passwords for one account, then its correct password to test that lockout holds."""
+    wrong = [p for p in (passwords or COMMON_PASSWORDS) if p != correct_password]
+    forms = [{"username": username, "password": password}
+             for password in itertools.islice(itertools.cycle(wrong), attempts)]
+    if correct_password is not None:
+        forms.append({"username": username, "password": correct_password})
+    return forms
+
+
+async def fuzz_brute_force_async(base_url, spec, username=None, attempts=50, concurrency=10, passwords=None,
+                                 correct_password=None):
+    username = username or next(iter(USERS))
+    correct_password = correct_password if correct_password is not None else USERS.get(username)
+    forms = credential_stuffing_sequence(username, attempts, passwords, correct_password)
+    start = time.monotonic()
+    # Wrong passwords concurrently, then the correct one after they have all been answered
+    results = await _run_requests(base_url, forms[:attempts], concurrency)
+    if correct_password is not None:
+        final = await _run_requests(base_url, forms[attempts:], 1)
+        results.extend((attempts, status, body, seconds, error) for _, status, body, seconds, error in final)
+    elapsed = time.monotonic() - start
+
+    statuses = {}
+    anomalies = []
+    first_blocked = None
+    for order, (index, status, body, seconds, error) in enumerate(results):
+        if error is not None:
+            continue
+        statuses[status] = statuses.get(status, 0) + 1
+        if status in (423, 429) and first_blocked is None and index < attempts:
+            first_blocked = {"attempt": order + 1, "status": status}
+        if status == 303 and index < attempts:
+            anomalies.append({"kind": "bypass", "payload": forms[index]["password"], "status": status})
+
+    locked = statuses.get(423, 0)
+    rate_limited = statuses.get(429, 0)
+    final_status = results[-1][1] if correct_password is not None else None
+    lockout_holds = final_status in (423, 429) if (locked or rate_limited) and correct_password is not None else None
+    if lockout_holds is False:
+        anomalies.append({"kind": "lockout bypass", "payload": "correct password after lockout",
+                          "status": final_status})
+
+    if anomalies:
+        passed, reason = False, f"{len(anomalies)} anomalies: {', '.join(a['kind'] for a in anomalies)}"
+    elif first_blocked:
+        mechanism = "Account lockout" if first_blocked["status"] == 423 else "Rate limiting"
+        passed, reason = True, f"{mechanism} started at attempt {first_blocked['attempt']} of {attempts}"
+    else:
+        passed, reason = False, f"No lockout or rate limiting after {attempts} failed attempts"
+    return {
+        "spec": _spec_fields(spec),
+        "passed": passed,
+        "reason": reason,
+        "requests": len(results),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "first_blocked": first_blocked,
+        "locked_responses": locked,
+        "rate_limited_responses": rate_limited,
+        "correct_password_status": final_status,
+        "anomalies": anomalies,
+        "seconds": elapsed,
+    }
+
+
+def evaluate_security_spec(spec, base_url, **options):
+    """Runs the fuzzer that matches the spec type and returns its report."""
+    if spec["type"] == "Security - SQL Injection":
+        return asyncio.run(fuzz_sql_injection_async(base_url, spec, **options))
+    if spec["type"] == "Security - Brute Force":
+        return asyncio.run(fuzz_brute_force_async(base_url, spec, **options))
+    raise ValueError(f"No fuzzer for spec type: {spec['type']}")
+
+
+def print_security_report(report):
+    spec = report["spec"]
+    print(f"\n{spec['type']}: {spec['description']}")
+    print(f"  Expected: {spec['expected_result']}")
+    line = f"  {report['requests']} requests in {report['seconds']:.2f} seconds, statuses {report['statuses']}"
+    if "per_minute" in report:
+        line += f", {report['per_minute']:.0f} payloads/minute"
+    print(line)
+    for anomaly in report["anomalies"][:20]:
+        print(f"  ANOMALY {anomaly['kind']} (status {anomaly['status']}): {anomaly['payload']!r}")
+    if len(report["anomalies"]) > 20:
+        print(f"  ... and {len(report['anomalies']) - 20} more")
+    print(f"{'PASS' if report['passed'] else 'FAIL'}: {report['reason']}")
+
+
+def save_security_report(reports, path="documents/security_report.json"):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(reports, f, indent=2)
+    print(f"Security report saved to {path}")
@@ -0,0 +1,188 @@
+"""
+Semantic answer cache for the entity-driven question flow.
+
+Questions are keyed by their normalised entity set (case, articles, punctuation and
+ordinals folded, so "the 3rd quarter" and "third quarter" match) plus intent keywords: the
+remaining content words, lightly stemmed and mapped through a small synonym table.  A lookup
+first tries the exact key, then scores cached entries that share an entity or keyword by a
+weighted Jaccard similarity of the two sets and returns the best one above the threshold.
+Capacity is bounded with LRU eviction, hits and misses are counted, and the cache can be
+saved to and loaded from a JSON file so repeated analyst questions survive between runs.
+"""
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from utils.retrieval import tokenize
+
+ORDINALS = {
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5",
+    "1st": "1", "2nd": "2", "3rd": "3", "4th": "4", "5th": "5", "q1": "1", "q2": "2", "q3": "3", "q4": "4",
+}
+SYNONYMS = {
+    "revenue": "sale", "revenues": "sale", "earning": "sale", "income": "sale", "sold": "sale", "sell": "sale",
+    "detail": "breakdown", "detailed": "breakdown", "itemize": "breakdown", "split": "breakdown",
+    "report": "report", "reported": "report", "summarize": "summary", "summarise": "summary", "overview": "summary",
+    "qtr": "quarter", "quarterly": "quarter",
+}
+ARTICLES = {"the", "a", "an"}
+# Question phrasing that says nothing about what is asked
+FILLER_WORDS = {"what", "which", "how", "who", "when", "where", "provide", "give", "show", "tell", "please",
+                "complete", "each", "all", "me", "us", "can", "could", "would", "about", "much", "many", "did", "do",
+                "does", "is", "are", "was", "were"}
+
+
+def normalize_text(text):
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return " ".join(ORDINALS.get(word, word) for word in words if word not in ARTICLES)
+
+
+def entity_key(entities):
+    """Normalised, order-independent entity set: ((text, label), ...)."""
+    return tuple(sorted({(normalize_text(text), label) for text, label in entities if normalize_text(text)}))
+
+
+def _stem(word):
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def intent_keywords(question, entities=()):
+    """Content words of the question that are not part of an entity, stemmed and synonym-mapped."""
+    entity_words = {word for text, _ in entities for word in normalize_text(text).split()}
+    keywords = set()
+    for word in tokenize(question):
+        word = ORDINALS.get(word, word)
+        if word in entity_words or word in FILLER_WORDS or word.isdigit():
+            continue
+        word = SYNONYMS.get(word) or _stem(word)
+        keywords.add(SYNONYMS.get(word, word))
+    return tuple(sorted(keywords))
+
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class SemanticCache:
+    """LRU cache of answers keyed by entity set and intent keywords, with near-match lookups."""
+
+    def __init__(self, capacity=1024, threshold=0.8, entity_weight=0.6, path=None):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.entity_weight = entity_weight
+        self.path = path
+        self._entries = OrderedDict()  # (entity key, keywords) -> answer
+        self._index = {}  # entity or keyword feature -> set of keys
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.evictions = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def key(question, entities):
+        return entity_key(entities), intent_keywords(question, entities)
+
+    @staticmethod
+    def _features(key):
+        entities, keywords = key
+        return [("entity", entity) for entity in entities] + [("keyword", keyword) for keyword in keywords]
+
+    def similarity(self, a, b):
+        entity_score = _jaccard(set(a[0]), set(b[0]))
+        keyword_score = _jaccard(set(a[1]), set(b[1]))
+        if not a[0] and not b[0]:
+            return keyword_score
+        return self.entity_weight * entity_score + (1 - self.entity_weight) * keyword_score
+
+    def get(self, question, entities):
+        """Returns (answer, score) for the closest cached question above the threshold, else (None, score)."""
+        key = self.key(question, entities)
+        with self._lock:
+            self.lookups += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return self._entries[key], 1.0
+            candidates = set()
+            for feature in self._features(key):
+                candidates |= self._index.get(feature, set())
+            best, best_score = None, 0.0
+            for candidate in candidates:
+                score = self.similarity(key, candidate)
+                if score > best_score:
+                    best, best_score = candidate, score
+            if best is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best)
+                self.near_hits += 1
+                return self._entries[best], best_score
+            return None, best_score
+
+    def put(self, question, entities, answer):
+        if not answer:
+            return
+        self._put(self.key(question, entities), answer)
+
+    def _put(self, key, answer):
+        with self._lock:
+            if key not in self._entries:
+                for feature in self._features(key):
+                    self._index.setdefault(feature, set()).add(key)
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                evicted, _ = self._entries.popitem(last=False)
+                for feature in self._features(evicted):
+                    self._index[feature].discard(evicted)
+                    if not self._index[feature]:
+                        del self._index[feature]
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def metrics(self):
+        hits = self.exact_hits + self.near_hits
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.lookups - hits,
+            "evictions": self.evictions,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0,
+        }
+
+    def log_metrics(self, file=None):
+        """Prints the metrics to `file` (stdout by default) and returns them."""
+        metrics = self.metrics()
+        print(f"Semantic cache: {metrics['lookups']} lookups, {metrics['exact_hits']} exact and "
+              f"{metrics['near_hits']} near hits ({metrics['hit_rate']:.1%}), {metrics['evictions']} evictions, "
+              f"{metrics['entries']} entries", file=file)
+        return metrics
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            entries = [{"entities": [list(entity) for entity in key[0]], "keywords": list(key[1]), "answer": answer}
+                       for key, answer in self._entries.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as f:
+            for entry in json.load(f):
+                key = (tuple(tuple(entity) for entity in entry["entities"]), tuple(entry["keywords"]))
+                self._put(key, entry["answer"])
@@ -0,0 +1,162 @@
+"""
+Priority- and budget-aware ordering of test case specs.
+
+Each spec gets a priority (from its "priority" field, or from its type: functional and
+security cases first, accessibility last) and an estimated cost in tokens and seconds.
+Costs start from the prompt size and defaults and are then learned per spec type from
+earlier runs.  Given a token and/or time budget, the scheduler selects specs greedily by
+priority per unit of budget and runs the selection highest priority first, so a run that
+stops early has already produced the most valuable cases.  Whatever does not fit, or is
+left over when the budget runs out, is saved as deferred and scheduled first next time.
+Cases generated earlier in the same cycle are kept in the state file and not regenerated;
+the cycle restarts once a run finishes with nothing deferred.
+"""
+import json
+import os
+import time
+
+from utils.retrieval import estimate_tokens
+from utils.story_diff import spec_key
+
+# Priority by spec type prefix; a spec's own "priority" field takes precedence
+TYPE_PRIORITIES = [
+    ("Functional - Positive", 10),
+    ("Functional", 9),
+    ("Security", 8),
+    ("Edge Case", 5),
+    ("Performance", 4),
+    ("Cross-Browser", 4),
+    ("Accessibility", 3),
+]
+DEFAULT_PRIORITY = 2
+
+# Deferred specs get this much extra priority so they are not starved run after run
+DEFERRED_BOOST = 1.5
+
+
+def spec_priority(spec):
+    if "priority" in spec:
+        return float(spec["priority"])
+    for prefix, priority in TYPE_PRIORITIES:
+        if spec["type"].startswith(prefix):
+            return float(priority)
+    return float(DEFAULT_PRIORITY)
+
+
+class SpecScheduler:
+    """Plans which specs to run within a budget and learns their costs across runs."""
+
+    def __init__(self, state_path, budget_tokens=None, budget_seconds=None, output_tokens=1024,
+                 seconds_per_request=20.0, smoothing=0.3):
+        self.state_path = state_path
+        self.budget_tokens = budget_tokens
+        self.budget_seconds = budget_seconds
+        self.output_tokens = output_tokens
+        self.seconds_per_request = seconds_per_request
+        self.smoothing = smoothing
+        self.costs = {}  # spec type -> {"output_tokens": ..., "seconds": ...}
+        self.deferred = []
+        self.completed = {}  # spec key -> test case generated earlier in this cycle
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.costs = state.get("costs", {})
+            self.deferred = state.get("deferred", [])
+            self.completed = state.get("completed", {})
+        self.used_tokens = 0
+        self.started = None
+
+    def estimate(self, spec, prompt):
+        """Estimated (tokens, seconds) to generate one spec's test case."""
+        learned = self.costs.get(spec["type"], {})
+        tokens = estimate_tokens(prompt) + learned.get("output_tokens", self.output_tokens)
+        return tokens, learned.get("seconds", self.seconds_per_request)
+
+    def _budget_share(self, tokens, seconds):
+        shares = []
+        if self.budget_tokens:
+            shares.append(tokens / self.budget_tokens)
+        if self.budget_seconds:
+            shares.append(seconds / self.budget_seconds)
+        return max(shares) if shares else 0.0
+
+    def plan(self, specs, build_prompt):
+        """
+        Returns (scheduled, deferred) lists of (spec, priority, tokens, seconds).  Scheduled
+        specs fit the budget together and are ordered highest priority first.  Specs already
+        completed in this cycle are left out of both.
+        """
+        deferred_keys = set(self.deferred)
+        candidates = []
+        for spec in specs:
+            if spec_key(spec) in self.completed:
+                continue
+            priority = spec_priority(spec) * (DEFERRED_BOOST if spec_key(spec) in deferred_keys else 1.0)
+            tokens, seconds = self.estimate(spec, build_prompt(spec))
+            candidates.append((spec, priority, tokens, seconds))
+
+        # Greedy knapsack: best value per share of the tightest budget first
+        by_density = sorted(candidates, key=lambda c: c[1] / max(self._budget_share(c[2], c[3]), 1e-9),
+                            reverse=True)
+        scheduled, deferred = [], []
+        tokens_left, seconds_left = self.budget_tokens, self.budget_seconds
+        for candidate in by_density:
+            _, _, tokens, seconds = candidate
+            fits = (tokens_left is None or tokens <= tokens_left) and (seconds_left is None or seconds <= seconds_left)
+            if fits:
+                scheduled.append(candidate)
+                tokens_left = tokens_left - tokens if tokens_left is not None else None
+                seconds_left = seconds_left - seconds if seconds_left is not None else None
+            else:
+                deferred.append(candidate)
+        scheduled.sort(key=lambda c: c[1], reverse=True)
+        return scheduled, deferred
+
+    def start(self):
+        self.started = time.monotonic()
+        self.used_tokens = 0
+
+    def has_budget_for(self, tokens, seconds):
+        """Whether the remaining budget still covers an estimated cost, given what the run has used."""
+        if self.budget_tokens and self.used_tokens + tokens > self.budget_tokens:
+            return False
+        if self.budget_seconds and self.started is not None:
+            if time.monotonic() - self.started + seconds > self.budget_seconds:
+                return False
+        return True
+
+    def record(self, spec, prompt, response, seconds):
+        """
+        Records the actual cost of a generated spec and updates the learned cost for its type.
+        A failed spec only counts its prompt, and does not teach the scheduler anything.
+        """
+        if not response:
+            self.used_tokens += estimate_tokens(prompt)
+            return
+        output_tokens = estimate_tokens(response)
+        self.used_tokens += estimate_tokens(prompt) + output_tokens
+        learned = self.costs.setdefault(spec["type"], {"output_tokens": output_tokens, "seconds": seconds})
+        learned["output_tokens"] += self.smoothing * (output_tokens - learned["output_tokens"])
+        learned["seconds"] += self.smoothing * (seconds - learned["seconds"])
+        self.completed[spec_key(spec)] = response
+
+    def save(self, deferred_specs):
+        """Persists learned costs, this cycle's test cases and the specs to pick up first next run."""
+        self.deferred = [spec_key(spec) for spec in deferred_specs]
+        if not self.deferred:
+            self.completed = {}  # Every spec is done; the next run starts a new cycle
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump({"costs": self.costs, "deferred": self.deferred, "completed": self.completed}, f, indent=2)
+
+    def report(self, done, deferred):
+        """Prints what was generated, the value delivered and what was deferred."""
+        value_done = sum(spec_priority(spec) for spec in done)
+        value_total = value_done + sum(spec_priority(spec) for spec in deferred)
+        elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        print(f"Generated {len(done)} specs using ~{self.used_tokens} tokens in {elapsed:.0f} seconds, "
+              f"delivering {value_done:.0f} of {value_total:.0f} priority points.")
+        if deferred:
+            print(f"Deferred {len(deferred)} specs to the next run:")
+            for spec in deferred:
+                print(f"  [{spec_priority(spec):.0f}] {spec['type']}: {spec['description']}")
@@ -0,0 +1,167 @@
+"""
+Incremental regeneration support.
+
+Every paragraph of a user story (including each acceptance criterion line) is fingerprinted.
+A spec depends on the paragraphs that mention one of its distinctive terms: words from the
+spec that few other specs use, so "login" or "user" do not tie every spec to every line.
+This keeps the dependencies independent of retrieval ranking, which shifts for every spec
+whenever any paragraph is edited.  The manifest records the fingerprints of those paragraphs
+alongside the test case generated from them.  On a rerun, a spec is regenerated only if it
+is new or its set of dependent paragraph fingerprints changed; everything else is reused
+from the manifest.  The prompt context is still the top retrieved story sections.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from fnmatch import fnmatch
+
+from utils.retrieval import BM25Index, chunk_story, tokenize
+
+
+def fingerprint(text):
+    """Whitespace-insensitive fingerprint of a paragraph."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def spec_key(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def spec_query(spec):
+    return " ".join(str(spec.get(field, "")) for field in ("type", "description", "steps", "expected_result"))
+
+
+def distinctive_terms(specs, max_share=0.2):
+    """Per spec, the query terms used by at most `max_share` of all specs."""
+    spec_terms = [set(tokenize(spec_query(spec))) for spec in specs]
+    spec_counts = Counter(term for terms in spec_terms for term in terms)
+    limit = max(1, max_share * len(specs))
+    return [{term for term in terms if spec_counts[term] <= limit} for terms in spec_terms]
+
+
+class StoryManifest:
+    """JSON manifest mapping each spec to its paragraph dependencies and generated test case."""
+
+    def __init__(self, path):
+        self.path = path
+        self.paragraphs = []
+        self.specs = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.paragraphs = data.get("paragraphs", [])
+            self.specs = data.get("specs", {})
+
+    def is_current(self, key, deps):
+        entry = self.specs.get(key)
+        return entry is not None and entry["deps"] == deps
+
+    def cached_test_case(self, key):
+        entry = self.specs.get(key)
+        return entry["test_case"] if entry else None
+
+    def update(self, key, deps, test_case):
+        self.specs[key] = {"deps": deps, "test_case": test_case}
+
+    def prune(self, keys):
+        """Drops entries for specs that no longer exist."""
+        self.specs = {key: entry for key, entry in self.specs.items() if key in keys}
+
+    def save(self, paragraphs):
+        self.paragraphs = paragraphs
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"paragraphs": paragraphs, "specs": self.specs}, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def plan_regeneration(user_story, specs, manifest, top_k=3, max_share=0.2):
+    """
+    Works out which specs need regenerating.  Returns the plan, one dict per spec with its
+    key, story context, dependency fingerprints and whether it is stale, plus the number of
+    paragraphs added, changed or removed since the manifest was written.
+    """
+    chunks = chunk_story(user_story)
+    index = BM25Index(chunks)
+    lines = [line for line in user_story.splitlines() if line.strip()]
+    paragraphs = [fingerprint(line) for line in lines]
+    line_terms = [set(tokenize(line)) for line in lines]
+    changed = len(set(paragraphs) ^ set(manifest.paragraphs))
+
+    plan = []
+    for spec, terms in zip(specs, distinctive_terms(specs, max_share)):
+        selected = sorted(index.top_k(spec_query(spec), top_k))
+        deps = sorted({paragraphs[i] for i, words in enumerate(line_terms) if words & terms})
+        if not deps and selected:
+            # Nothing in the story names this spec's terms: depend on its best retrieved section
+            best = index.top_k(spec_query(spec), 1)[0]
+            deps = sorted({fingerprint(line) for line in chunks[best].splitlines() if line.strip()})
+        key = spec_key(spec)
+        plan.append({
+            "spec": spec,
+            "key": key,
+            "context": "\n\n".join(chunks[i] for i in selected),
+            "deps": deps,
+            "stale": not manifest.is_current(key, deps),
+        })
+    return plan, paragraphs, changed
+
+
+class StoryWatcher:
+    """
+    Polls a directory in a background thread and calls `callback(path)` once a matching
+    file has been saved and its modification time has settled.  Polling keeps this free of
+    extra dependencies and works on network shares.
+    """
+
+    def __init__(self, directory, callback, pattern="*.docx", interval=2.0):
+        self.directory = directory
+        self.callback = callback
+        self.pattern = pattern
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="story-watcher", daemon=True)
+
+    def _scan(self):
+        mtimes = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                # Skip Word's "~$" lock files
+                if fnmatch(name, self.pattern) and not name.startswith("~$"):
+                    path = os.path.join(root, name)
+                    try:
+                        mtimes[path] = os.path.getmtime(path)
+                    except OSError:
+                        pass  # Deleted between listing and stat
+        return mtimes
+
+    def _run(self):
+        seen = self._scan()
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for path, mtime in current.items():
+                if seen.get(path) == mtime:
+                    continue
+                if time.time() - mtime < self.interval:
+                    continue  # Still being saved; pick it up on the next poll
+                seen[path] = mtime
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    print(f"Error regenerating test cases for {path}: {e}")
+            for path in set(seen) - set(current):
+                del seen[path]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
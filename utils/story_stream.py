@@ -0,0 +1,91 @@
+"""
+Memory-bounded analysis of very large user-story documents.
+
+Paragraphs are streamed straight out of the .docx XML with lxml's iterparse (clearing each
+element after use), grouped into sections no larger than `max_chars`, and fed through
+`nlp.pipe` as a generator.  Only the running summary is kept, so peak memory depends on the
+section size rather than the document size, and no single text ever reaches spaCy's
+`max_length`.
+"""
+import re
+import zipfile
+from collections import Counter
+
+from lxml import etree
+
+from utils.retrieval import is_section_header
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+CRITERIA_HEADER = re.compile(r"(?i)^acceptance criteria:")
+SCENARIOS_HEADER = re.compile(r"(?i)^(scenarios covered:|test scenarios:)")
+
+
+def iter_docx_paragraphs(file_path):
+    """Yields the text of each non-empty paragraph without loading the whole document."""
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+        for _, element in etree.iterparse(xml, events=("end",), tag=f"{WORD_NS}p"):
+            parts = []
+            for node in element.iter(f"{WORD_NS}t", f"{WORD_NS}tab", f"{WORD_NS}br"):
+                if node.tag == f"{WORD_NS}t":
+                    parts.append(node.text or "")
+                else:
+                    parts.append("\t" if node.tag == f"{WORD_NS}tab" else "\n")
+            text = "".join(parts)
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]  # Drop already-processed siblings
+            if text.strip():
+                yield text
+
+
+def iter_sections(paragraphs, max_chars=100_000):
+    """
+    Groups paragraphs into (text, part) sections, starting a new section at each header line
+    and whenever `max_chars` would be exceeded.  `part` is "criteria", "scenarios" or None
+    depending on the enclosing "Acceptance Criteria:" / "Scenarios Covered:" block.
+    """
+    part = None
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        for line in paragraph.splitlines():
+            if not line.strip():
+                continue
+            header = is_section_header(line)
+            if current and (header or size + len(line) > max_chars):
+                yield "\n".join(current), part
+                current, size = [], 0
+            if CRITERIA_HEADER.match(line.strip()):
+                part = "criteria"
+            elif SCENARIOS_HEADER.match(line.strip()):
+                part = "scenarios"
+            # Split pathological single lines so no text exceeds the section budget
+            while len(line) > max_chars:
+                yield line[:max_chars], part
+                line = line[max_chars:]
+            current.append(line)
+            size += len(line) + 1
+    if current:
+        yield "\n".join(current), part
+
+
+def analyze_story_streaming(nlp, sections, batch_size=16, top_entities=50):
+    """Runs nlp.pipe over (text, part) sections and merges them into one story summary."""
+    entities = Counter()
+    summary = {"sections": 0, "characters": 0, "sentences": 0, "user_story": None,
+               "acceptance_criteria": [], "scenarios": []}
+    for doc, part in nlp.pipe(sections, batch_size=batch_size, as_tuples=True):
+        summary["sections"] += 1
+        summary["characters"] += len(doc.text)
+        entities.update((ent.text, ent.label_) for ent in doc.ents)
+        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()] if doc.has_annotation("SENT_START") \
+            else [line.strip() for line in doc.text.splitlines() if line.strip()]
+        summary["sentences"] += len(sentences)
+        if summary["user_story"] is None and re.search(r"As an? .*I want to", doc.text, re.DOTALL):
+            summary["user_story"] = doc.text
+        if part == "criteria":
+            summary["acceptance_criteria"].extend(s for s in sentences if not CRITERIA_HEADER.match(s))
+        elif part == "scenarios":
+            summary["scenarios"].extend(s for s in sentences if not SCENARIOS_HEADER.match(s))
+    summary["entities"] = entities.most_common(top_entities)
+    return summary
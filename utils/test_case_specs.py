@@ -0,0 +1,189 @@
+"""
+Test case specifications for the Login/Logout user story.
+
+Shared by the generation scripts and by the local engines (load, security, accessibility,
+scheduling, routing) that act on the same specs without needing spaCy or Gemini.
+"""
+
+LOGIN_TEST_CASE_SPECS = [
+    # Functional - Positive
+    {
+        "type": "Functional - Positive",
+        "description": "Verify successful login with valid credentials.",
+        "preconditions": "User account exists.",
+        "steps": "Enter valid username and password. Click login button.",
+        "expected_result": "User is logged in successfully."
+    },
+
+    # Functional - Negative
+    {
+        "type": "Functional - Negative",
+        "description": "Verify login failure with invalid credentials.",
+        "preconditions": "None.",
+        "steps": "Enter invalid username and password. Click login button.",
+        "expected_result": "Error message is displayed."
+    },
+
+    # Edge Case - Long Username
+    {
+        "type": "Edge Case",
+        "description": "Verify login with a very long username.",
+        "preconditions": "None.",
+        "steps": "Enter a username exceeding maximum length. Enter valid password. Click login button.",
+        "expected_result": "Appropriate error message is displayed or username is truncated."
+    },
+
+    # Edge Case - Special Characters in Username
+    {
+        "type": "Edge Case",
+        "description": "Verify login with special characters in the username.",
+        "preconditions": "None.",
+        "steps": "Enter a username containing special characters. Enter valid password. Click login button.",
+        "expected_result": "Login is successful or appropriate error message is displayed."
+    },
+
+    # Cross-Browser - Chrome
+    {
+        "type": "Cross-Browser - Chrome",
+        "description": "Verify login functionality on Chrome browser.",
+        "preconditions": "Chrome browser is installed.",
+        "steps": "Open application in Chrome. Enter valid username and password. Click login button.",
+        "expected_result": "User is logged in successfully in Chrome."
+    },
+
+    # Cross-Browser - Firefox
+    {
+        "type": "Cross-Browser - Firefox",
+        "description": "Verify login functionality on Firefox browser.",
+        "preconditions": "Firefox browser is installed.",
+        "steps": "Open application in Firefox. Enter valid username and password. Click login button.",
+        "expected_result": "User is logged in successfully in Firefox."
+    },
+
+    # Cross-Browser - Edge
+    {
+        "type": "Cross-Browser - Edge",
+        "description": "Verify login functionality on Edge browser.",
+        "preconditions": "Edge browser is installed.",
+        "steps": "Open application in Edge. Enter valid username and password. Click login button.",
+        "expected_result": "User is logged in successfully in Edge."
+    },
+
+    # Security - SQL Injection
+    {
+        "type": "Security - SQL Injection",
+        "description": "Attempt SQL injection in username field.",
+        "preconditions": "None.",
+        "steps": "Enter SQL injection string in username field. Enter valid password. Click login.",
+        "expected_result": "Application is not vulnerable to SQL injection. Error message or secure handling."
+    },
+
+    # Security - Brute Force
+    {
+        "type": "Security - Brute Force",
+        "description": "Attempt to brute force the login.",
+        "preconditions": "None.",
+        "steps": "Simulate multiple login attempts with incorrect passwords.",
+        "expected_result": "Account lockout mechanism or rate limiting is in place."
+    },
+
+    # Performance - Response Time
+    {
+        "type": "Performance - Response Time",
+        "description": "Measure login response time.",
+        "preconditions": "Stable network connection.",
+        "steps": "Enter valid credentials and click login. Measure time taken for login to complete.",
+        "expected_result": "Login response time is within acceptable limits (e.g., < 2 seconds)."
+    },
+
+    # Performance - Concurrent Users
+    {
+        "type": "Performance - Concurrent Users",
+        "description": "Verify login performance with concurrent users.",
+        "preconditions": "Test environment that supports concurrent users.",
+        "steps": "Simulate multiple users logging in simultaneously.",
+        "expected_result": "Application handles concurrent logins without significant performance degradation."
+    },
+
+    # Accessibility - WCAG 2.1 Perceivable - Text Alternatives
+    {
+        "type": "Accessibility - Perceivable",
+        "description": "Verify that all non-text content has text alternatives.",
+        "preconditions": "Login page is displayed.",
+        "steps": "Check if all images and icons on the login page have appropriate alt text.",
+        "expected_result": "All non-text content has text alternatives."
+    },
+
+    # Accessibility - WCAG 2.1 Operable - Keyboard Accessibility
+    {
+        "type": "Accessibility - Operable",
+        "description": "Verify that all functionality is available from a keyboard.",
+        "preconditions": "Login page is displayed.",
+        "steps": "Navigate the login page using only the keyboard (Tab, Shift+Tab, Enter).",
+        "expected_result": "All elements, including the login form and buttons, are accessible and operable via keyboard."
+    },
+
+    # Accessibility - WCAG 2.1 Understandable - Readable Text
+    {
+        "type": "Accessibility - Understandable",
+        "description": "Verify that the login page text is readable.",
+        "preconditions": "Login page is displayed.",
+        "steps": "Check the contrast ratio between text and background.  Check font size and readability.",
+        "expected_result": "Text is easily readable with sufficient contrast and appropriate font size."
+    },
+
+    # Accessibility - WCAG 2.1 Robust - Compatibility
+    {
+        "type": "Accessibility - Robust",
+        "description": "Verify that the login page is compatible with assistive technologies.",
+        "preconditions": "Login page is displayed.  Screen reader software is installed and running.",
+        "steps": "Use a screen reader to navigate the login page.",
+        "expected_result": "Screen reader can correctly interpret and announce all elements on the page, including labels, form fields, and buttons."
+    }
+]
+
+# Dimensions expanded with a covering array (utils.combinatorial) instead of one spec per combination.
+# Only the input class changes the behaviour under test; the rest are filled into a shared template.
+LOGIN_SPEC_DIMENSIONS = {
+    "browser": ["Chrome", "Firefox", "Edge", "Safari"],
+    "user_type": ["Standard user", "QA engineer", "Newly registered user"],
+    "input_class": ["Valid credentials", "Invalid password", "Long username", "Special characters", "Empty fields"],
+    "locale": ["en-US", "de-DE", "ja-JP"],
+}
+LOGIN_CLASS_DIMENSIONS = ["input_class"]
+
+LOGIN_COMBINATORIAL_BASE_SPEC = {
+    "type": "Functional - Combinatorial",
+    "description": "Verify login as a {user_type} on {browser} with the {locale} locale.",
+    "preconditions": "{user_type} account exists. Application is open in {browser} with the {locale} locale.",
+    "steps": "Enter the username and password. Click login button.",
+    "expected_result": "Login behaves as expected.",
+}
+
+LOGIN_INPUT_CLASSES = {
+    "Valid credentials": {
+        "type": "Functional - Positive",
+        "steps": "Enter valid username and password. Click login button.",
+        "expected_result": "User is logged in successfully.",
+    },
+    "Invalid password": {
+        "type": "Functional - Negative",
+        "steps": "Enter a valid username and an incorrect password. Click login button.",
+        "expected_result": "A localized error message is displayed and the user stays on the login page.",
+    },
+    "Long username": {
+        "type": "Edge Case",
+        "steps": "Enter a username exceeding maximum length. Enter valid password. Click login button.",
+        "expected_result": "Appropriate error message is displayed or username is truncated.",
+    },
+    "Special characters": {
+        "type": "Edge Case",
+        "steps": "Enter a username with special and non-ASCII characters. Enter valid password. Click login button.",
+        "expected_result": "Input is handled safely and an appropriate message is displayed.",
+    },
+    "Empty fields": {
+        "type": "Functional - Negative",
+        "steps": "Leave username and password empty. Click login button.",
+        "expected_result": "Required field validation messages are displayed.",
+    },
+}
@@ -0,0 +1,203 @@
+"""
+Traceability between a story's acceptance criteria and the generated test cases.
+
+Criteria and cases are turned into L2-normalised TF-IDF vectors held as CSR arrays (indptr,
+indices, data), so cosine similarity is a sparse matrix product.  The product is computed
+with NumPy only: criteria are transposed into per-term postings, and each block of cases is
+expanded against those postings and summed with one bincount, while the few terms common to
+many criteria and cases go through a dense matrix product instead.  Blocks are sized by the
+number of term pairs they produce rather than by row count, so memory stays bounded at 10k
+criteria x 100k cases.  Only pairs above the threshold and each criterion's best match are
+kept; the full dense matrix is never materialised.
+"""
+import csv
+import os
+import time
+
+import numpy as np
+
+from utils.retrieval import tokenize
+
+
+def build_vocabulary(documents, max_df=1.0, min_df=1):
+    """
+    Maps terms to columns and returns (vocabulary, idf).  Terms in more than `max_df` of the
+    documents (a fraction, or a count if an int) are dropped; on large corpora a max_df below
+    1.0 removes words like "login" that say little about coverage.
+    """
+    document_frequency = {}
+    for tokens in documents:
+        for token in set(tokens):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+    count = len(documents)
+    limit = max_df * count if isinstance(max_df, float) else max_df
+    terms = sorted(term for term, df in document_frequency.items() if min_df <= df <= max(limit, 1))
+    vocabulary = {term: column for column, term in enumerate(terms)}
+    frequencies = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+    idf = (np.log((1 + count) / (1 + frequencies)) + 1).astype(np.float32)
+    return vocabulary, idf
+
+
+def tfidf_rows(documents, vocabulary, idf):
+    """Returns the documents as L2-normalised TF-IDF rows in CSR form (indptr, indices, data)."""
+    indptr = [0]
+    indices = []
+    data = []
+    for tokens in documents:
+        counts = {}
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = sorted(counts)
+        indices.extend(columns)
+        data.extend(counts[column] for column in columns)
+        indptr.append(len(indices))
+    indptr = np.array(indptr, dtype=np.int64)
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float32) * idf[indices]
+    row_of = np.repeat(np.arange(len(documents)), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=data.astype(np.float64) ** 2, minlength=len(documents)))
+    data /= np.maximum(norms, 1e-12)[row_of].astype(np.float32)
+    return indptr, indices, data
+
+
+def _postings(rows, vocabulary_size):
+    """Transposes CSR rows into per-term postings: (term_indptr, row_ids, weights)."""
+    indptr, indices, data = rows
+    row_of = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    term_indptr = np.zeros(vocabulary_size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=vocabulary_size), out=term_indptr[1:])
+    return term_indptr, row_of[order], data[order]
+
+
+def similarity_blocks(criteria_rows, case_rows, vocabulary_size, block_size=1024, max_pairs=5_000_000,
+                      dense_terms=512):
+    """
+    Yields (first_case, similarities) with similarities shaped (cases in block, criteria).
+
+    The `dense_terms` terms that would expand into the most pairs (those frequent in both
+    criteria and cases) go through a dense float32 matrix product instead of the postings
+    expansion, which keeps the sparse part proportional to the rare, informative terms.
+    """
+    term_indptr, criterion_ids, criterion_weights = _postings(criteria_rows, vocabulary_size)
+    posting_lengths = np.diff(term_indptr)
+    criteria_count = len(criteria_rows[0]) - 1
+    indptr, indices, data = case_rows
+    case_count = len(indptr) - 1
+
+    expansion = posting_lengths * np.bincount(indices, minlength=vocabulary_size)
+    dense = np.argsort(-expansion, kind="stable")[:dense_terms]
+    dense = dense[expansion[dense] > 0]
+    dense_column = np.full(vocabulary_size, -1, dtype=np.int64)
+    dense_column[dense] = np.arange(len(dense))
+    criteria_dense = np.zeros((len(dense), criteria_count), dtype=np.float32)
+    for column, term in enumerate(dense):
+        postings = slice(term_indptr[term], term_indptr[term + 1])
+        criteria_dense[column, criterion_ids[postings]] = criterion_weights[postings]
+    posting_lengths = posting_lengths.copy()
+    posting_lengths[dense] = 0
+
+    # Term pairs each case produces; cut blocks so no block expands to more than max_pairs
+    case_of = np.repeat(np.arange(case_count), np.diff(indptr))
+    pairs_per_case = np.bincount(case_of, weights=posting_lengths[indices], minlength=case_count)
+    cumulative = np.concatenate(([0], np.cumsum(pairs_per_case)))
+
+    start = 0
+    while start < case_count:
+        end = min(case_count, start + block_size)
+        end = max(start + 1, min(end, int(np.searchsorted(cumulative, cumulative[start] + max_pairs, "right")) - 1))
+        lo, hi = indptr[start], indptr[end]
+        terms = indices[lo:hi]
+        rows = end - start
+        row_of = case_of[lo:hi] - start
+
+        block = np.zeros((rows, criteria_count), dtype=np.float32)
+        if len(dense):
+            columns = dense_column[terms]
+            in_dense = columns >= 0
+            case_dense = np.zeros((rows, len(dense)), dtype=np.float32)
+            case_dense[row_of[in_dense], columns[in_dense]] = data[lo:hi][in_dense]
+            np.matmul(case_dense, criteria_dense, out=block)
+
+        counts = posting_lengths[terms]
+        total = int(counts.sum())
+        if total:
+            entry = np.repeat(np.arange(hi - lo), counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            posting = term_indptr[terms][entry] + offsets
+            values = data[lo:hi][entry] * criterion_weights[posting]
+            flat = row_of[entry] * criteria_count + criterion_ids[posting]
+            block += np.bincount(flat, weights=values, minlength=rows * criteria_count).reshape(rows, criteria_count)
+        yield start, block
+        start = end
+
+
+def traceability_matrix(criteria, test_cases, threshold=0.2, max_df=1.0, block_size=1024):
+    """
+    Links acceptance criteria to test cases.  Returns a dict with the (criterion, case, score)
+    links at or above `threshold`, each criterion's best case and score, how many cases cover
+    each criterion, and the indices of the uncovered criteria.
+    """
+    start = time.perf_counter()
+    criteria_tokens = [tokenize(text) for text in criteria]
+    case_tokens = [tokenize(text) for text in test_cases]
+    vocabulary, idf = build_vocabulary(criteria_tokens + case_tokens, max_df=max_df)
+    criteria_rows = tfidf_rows(criteria_tokens, vocabulary, idf)
+    case_rows = tfidf_rows(case_tokens, vocabulary, idf)
+
+    best_score = np.zeros(len(criteria), dtype=np.float32)
+    best_case = np.full(len(criteria), -1, dtype=np.int64)
+    coverage = np.zeros(len(criteria), dtype=np.int64)
+    links = []
+    for first_case, block in similarity_blocks(criteria_rows, case_rows, len(vocabulary), block_size):
+        block_best = block.argmax(axis=0)
+        block_score = block[block_best, np.arange(block.shape[1])]
+        improved = block_score > best_score
+        best_score[improved] = block_score[improved]
+        best_case[improved] = block_best[improved] + first_case
+        case_index, criterion_index = np.nonzero(block >= threshold)
+        coverage += np.bincount(criterion_index, minlength=len(criteria))
+        links.extend(zip(criterion_index.tolist(), (case_index + first_case).tolist(),
+                         block[case_index, criterion_index].tolist()))
+
+    uncovered = [int(i) for i in np.flatnonzero(coverage == 0)]
+    elapsed = time.perf_counter() - start
+    print(f"Traced {len(criteria)} criteria against {len(test_cases)} test cases in {elapsed:.2f} seconds: "
+          f"{len(criteria) - len(uncovered)} covered, {len(uncovered)} uncovered.")
+    return {
+        "links": sorted(links),
+        "best_case": best_case.tolist(),
+        "best_score": best_score.tolist(),
+        "coverage": coverage.tolist(),
+        "uncovered": uncovered,
+        "seconds": elapsed,
+    }
+
+
+def save_traceability_csv(result, criteria, case_ids, path):
+    """Writes one row per criterion/case link (and one per uncovered criterion, with no case)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["criterion", "acceptance_criterion", "test_case", "score"])
+        linked = set()
+        for criterion, case, score in result["links"]:
+            writer.writerow([criterion + 1, criteria[criterion], case_ids[case], f"{score:.3f}"])
+            linked.add(criterion)
+        for criterion in result["uncovered"]:
+            if criterion not in linked:
+                writer.writerow([criterion + 1, criteria[criterion], "", ""])
+    print(f"Traceability matrix saved to {path}")
+
+
+def print_uncovered(result, criteria, case_ids):
+    if not result["uncovered"]:
+        print("Every acceptance criterion is covered by at least one test case.")
+        return
+    print("Acceptance criteria without a matching test case:")
+    for criterion in result["uncovered"]:
+        best = result["best_case"][criterion]
+        closest = f" (closest: {case_ids[best]}, {result['best_score'][criterion]:.2f})" if best >= 0 else ""
+        print(f"  {criterion + 1}. {' '.join(criteria[criterion].split())}{closest}")